@@ -203,4 +203,131 @@ plt.tight_layout()
 fig.savefig('district_heating_partload.svg')
 
 # 关闭图表
-plt.close()
\ No newline at end of file
+plt.close()
+
+
+# %% 多个相同的用户换热站
+# 20 个相同的用户换热站（用户换热器 + 控制阀）只建立一个换热站模型：
+# 供水管出口经分配点（流量除以 20）进入换热站，换热站出口经汇合点（流量乘以 20）进入回水管，
+# 方程组规模与换热站数量无关。
+from multiplicity import ParallelGroup
+
+substations = ParallelGroup('substations', n=20)
+dh = Network(T_unit='C', p_unit='bar', h_unit='kJ / kg', iterinfo=False)
+
+dh_hs = SimpleHeatExchanger('heat source')
+dh_cc = CycleCloser('cycle closer')
+dh_pu = Pump('feed pump')
+dh_feed = Pipe('feed pipe')
+dh_return = Pipe('return pipe')
+sub_cons = SimpleHeatExchanger('substation consumer')  # 单个换热站的用户换热器
+sub_val = Valve('substation valve')                    # 单个换热站的控制阀
+
+dh.add_conns(
+    Connection(dh_cc, 'out1', dh_hs, 'in1', label='0'),
+    Connection(dh_hs, 'out1', dh_pu, 'in1', label='1'),
+    Connection(dh_pu, 'out1', dh_feed, 'in1', label='2'),
+    Connection(dh_feed, 'out1', substations.distributor, 'in1', label='3'),
+    Connection(substations.distributor, 'out1', sub_cons, 'in1', label='3s'),  # 单个换热站的流量
+    Connection(sub_cons, 'out1', sub_val, 'in1', label='4s'),
+    Connection(sub_val, 'out1', substations.collector, 'in1', label='5s'),
+    Connection(substations.collector, 'out1', dh_return, 'in1', label='5'),
+    Connection(dh_return, 'out1', dh_cc, 'in1', label='6'),
+)
+
+sub_cons.set_attr(Q=-10000, pr=0.98)  # 每个换热站 10 kW
+dh_hs.set_attr(pr=1)
+dh_pu.set_attr(eta_s=0.75)
+dh_feed.set_attr(Q=-250 * substations.n, pr=0.98)
+dh_return.set_attr(Q=-200 * substations.n, pr=0.98)
+dh.get_conn('1').set_attr(T=90, p=10, fluid={'INCOMP::Water': 1})
+dh.get_conn('2').set_attr(p=13)
+dh.get_conn('4s').set_attr(T=65)
+dh.solve('design')
+
+print(f'换热站数量: {substations.n}，方程组变量数: {dh.num_vars}')
+print(f'用户总热负荷: {substations.total(sub_cons.Q.val) / 1e3:.1f} kW')
+print(f'热源热量: {dh_hs.Q.val / 1e3:.1f} kW，总流量: {dh.get_conn("2").m.val_SI:.3f} kg/s')
+
+
+# %% 不同热负荷的换热站（子网络模板）
+# 每个换热站支路为 支管 + 用户换热器 + 控制阀，热负荷各不相同，不能用 ParallelGroup 合并。
+# 换热站支路只定义一次（Subsystem），编译成模板后按热负荷逐个实例化，
+# 所有支路一次性加入网络。
+import time
+
+from tespy.components import Merge, Splitter, Subsystem
+
+from block_template import BlockTemplate, add_blocks
+from fast_network import FastNetwork
+
+
+class Substation(Subsystem):
+    """换热站支路：支管 → 用户换热器 → 控制阀。"""
+
+    def create_comps(self):
+        self.comps['pipe'] = Pipe(f'{self.label} pipe', Q=-100, pr=0.98)
+        self.comps['consumer'] = SimpleHeatExchanger(
+            f'{self.label} consumer', Q=-10000, pr=0.98
+        )
+        self.comps['valve'] = Valve(f'{self.label} valve')
+
+    def create_conns(self):
+        self.conns['b'] = Connection(
+            self.comps['pipe'], 'out1', self.comps['consumer'], 'in1',
+            label=f'{self.label}_b'
+        )
+        self.conns['c'] = Connection(
+            self.comps['consumer'], 'out1', self.comps['valve'], 'in1',
+            label=f'{self.label}_c'
+        )
+        self.conns['c'].set_attr(T=65)
+
+
+loads = np.linspace(5e3, 15e3, 50)  # 各换热站热负荷 5 kW ~ 15 kW
+start = time.perf_counter()
+
+template = BlockTemplate(Substation)
+blocks = [
+    template.instantiate(f'sub{i}', params={'consumer': {'Q': -Q}})
+    for i, Q in enumerate(loads)
+]
+
+# 大规模网络使用 FastNetwork：预处理结果在多次求解之间缓存
+grid = FastNetwork(T_unit='C', p_unit='bar', h_unit='kJ / kg', iterinfo=False)
+grid_hs = SimpleHeatExchanger('heat source')
+grid_cc = CycleCloser('cycle closer')
+grid_pu = Pump('feed pump')
+grid_sp = Splitter('splitter', num_out=len(blocks))
+grid_me = Merge('merge', num_in=len(blocks))
+
+mains = [
+    Connection(grid_cc, 'out1', grid_hs, 'in1', label='0'),
+    Connection(grid_hs, 'out1', grid_pu, 'in1', label='1'),
+    Connection(grid_pu, 'out1', grid_sp, 'in1', label='2'),
+    Connection(grid_me, 'out1', grid_cc, 'in1', label='3'),
+]
+for i, block in enumerate(blocks, start=1):
+    mains += [
+        Connection(grid_sp, f'out{i}', *block.inlet, label=f'{block.label}_a'),
+        Connection(*block.outlet, grid_me, f'in{i}', label=f'{block.label}_d'),
+    ]
+add_blocks(grid, *blocks, conns=mains)
+built = time.perf_counter() - start
+
+grid_hs.set_attr(pr=1)
+grid_pu.set_attr(eta_s=0.75)
+grid.get_conn('1').set_attr(T=90, p=10, fluid={'INCOMP::Water': 1})
+grid.get_conn('2').set_attr(p=13)
+grid.solve('design')
+
+print(f'换热站数量: {len(blocks)}，建模用时: {built:.2f} s，方程组变量数: {grid.num_vars}')
+print(f'用户总热负荷: {-sum(b.comps["consumer"].Q.val for b in blocks) / 1e3:.1f} kW')
+print(f'热源热量: {grid_hs.Q.val / 1e3:.1f} kW，总流量: {grid.get_conn("2").m.val_SI:.3f} kg/s')
+
+# 供水温度变化时网络结构和参数设定不变，拓扑检查和工质传播直接复用
+for T in [85, 80, 75, 70]:
+    grid.get_conn('1').set_attr(T=T)
+    grid.solve('design')
+    print(f'供水温度 {T} °C: 总流量 {grid.get_conn("2").m.val_SI:.3f} kg/s')
+print(f'预处理缓存: {grid.cache_stats}')
@@ -13,18 +13,22 @@ from tespy.connections import Connection  # 导入连接类，用于连接组件
 from tespy.connections import Bus         # 导入总线类，用于将多个连接组合在一起
 
 from tespy.networks import Network       # 导入网络类，用于定义整个热力系统
+from tespy.tools.helpers import TESPyNetworkError  # 导入网络求解错误类型
 
-from tespy.tools.characteristics import CharLine  # 导入特性曲线类
-from tespy.tools.characteristics import load_default_char as ldc  # 导入加载默认特性的函数
+from char_registry import load_default_char as ldc, install  # 导入带缓存的默认特性加载函数
+from fast_chars import FastCharLine  # 导入预先计算斜率、支持数组输入的特性曲线类
 
 from tespy.tools import ExergyAnalysis    # 导入能流分析工具
+from exergy_sankey import ExergySankey    # 导入增量式㶲桑基图
+from exergy_waterfall import stack_component_data, waterfalls, save_waterfalls  # 导入向量化的能量破坏瀑布数据计算
 
 import numpy as np                        # 导入NumPy库，用于数值计算
 
 from plotly.offline import plot           # 导入Plotly离线绘图功能
 import plotly.graph_objects as go         # 导入Plotly图形对象
 
-from fluprodia import FluidPropertyDiagram # 导入Fluprodia库，用于绘制工质性质图表
+from isoline_cache import cached_diagram, calc_component_isolines # 导入带磁盘缓存的工质性质图表
+from continuation import Continuation  # 导入参数延拓求解
 
 import pandas as pd                       # 导入Pandas库，用于数据处理和分析
 
@@ -39,6 +43,8 @@ Tgeo = 9.5
 
 # 创建网络实例，设置单位制和流体类型
 nw = Network(fluids=['water'], T_unit='C', p_unit='bar', h_unit='kJ / kg', m_unit='kg / s')
+# 组件预处理时加载的默认特性也使用缓存
+install()
 
 # %% components
 
@@ -89,8 +95,8 @@ nw.add_conns(hs_ret_hsp, hsp_cd, cd_hs_feed)
 cd.set_attr(pr1=0.99, pr2=0.99, ttd_u=5, design=['pr2', 'ttd_u'],
             offdesign=['zeta2', 'kA_char'])
 # 蒸发器参数设置
-kA_char1 = ldc('heat exchanger', 'kA_char1', 'DEFAULT', CharLine)
-kA_char2 = ldc('heat exchanger', 'kA_char2', 'EVAPORATING FLUID', CharLine)
+kA_char1 = ldc('heat exchanger', 'kA_char1', 'DEFAULT', FastCharLine)
+kA_char2 = ldc('heat exchanger', 'kA_char2', 'EVAPORATING FLUID', FastCharLine)
 ev.set_attr(pr1=0.99, pr2=0.99, ttd_l=5,
             kA_char1=kA_char1, kA_char2=kA_char2,
             design=['pr1', 'ttd_l'], offdesign=['zeta1', 'kA_char'])
@@ -126,7 +132,7 @@ x = np.array([0, 0.2, 0.4, 0.6, 0.8, 1, 1.2, 1.4])
 y = np.array([0, 0.86, 0.9, 0.93, 0.95, 0.96, 0.95, 0.93])
 
 # 功率总线
-char = CharLine(x=x, y=y)
+char = FastCharLine(x=x, y=y)
 power = Bus('power input')
 power.add_comps(
     {'comp': cp, 'char': char, 'base': 'bus'},  # 压缩机功率
@@ -167,14 +173,10 @@ result_dict.update({cp.label: cp.get_plotting_data()[1]})
 result_dict.update({cd.label: cd.get_plotting_data()[1]})
 result_dict.update({va.label: va.get_plotting_data()[1]})
 
-# 创建对数焓-压力 (h-log(p)) 图
-diagram = FluidPropertyDiagram('NH3')
-diagram.set_unit_system(T='°C', p='bar', h='kJ/kg')
+# 创建对数焓-压力 (h-log(p)) 图，等值线只在第一次运行时计算，之后从缓存读取
+diagram = cached_diagram('NH3', {'T': '°C', 'p': 'bar', 'h': 'kJ/kg'})
 
-for key, data in result_dict.items():
-    result_dict[key]['datapoints'] = diagram.calc_individual_isoline(**data)
-
-diagram.calc_isolines()
+calc_component_isolines(diagram, result_dict)
 
 fig, ax = plt.subplots(1, figsize=(16, 10))
 diagram.draw_isolines(fig, ax, 'logph', x_min=0, x_max=2100, y_min=1e0, y_max=2e2)
@@ -195,42 +197,34 @@ ean.analyse(pamb, Tamb)
 print("\n##### EXERGY ANALYSIS #####\n")
 ean.print_results()
 
-# 创建桑基图
-links, nodes = ean.generate_plotly_sankey_input()
+# 创建桑基图，拓扑只构建一次，之后的工况只需调用 sankey.refresh() 刷新数值
+sankey = ExergySankey(ean)
 fig = go.Figure(go.Sankey(
     arrangement="snap",
     node={
-        "label": nodes,
+        "label": sankey.nodes,
         'pad': 11,
         'color': 'orange'},
-    link=links))
+    link=sankey.links()))
 plt.show()
 #plot(fig, filename='NH3_sankey.html')
 
 # %% plot exergy destruction
 
-# 创建数据用于条形图
-comps = ['E_F']
-E_F = ean.network_data.E_F
-# 最上面的条
-E_D = [0]  # 没有在顶部栏的能量破坏
-E_P = [E_F]  # 添加E_F作为顶部条
-for comp in ean.component_data.index:
-    # 只绘制能量破坏大于1 W的组件
-    if ean.component_data.E_D[comp] > 1:
-        comps.append(comp)
-        E_D.append(ean.component_data.E_D[comp])
-        E_F = E_F - ean.component_data.E_D[comp]
-        E_P.append(E_F)
-comps.append("E_P")
-E_D.append(0)
-E_P.append(E_F)
-
-# 创建数据框并保存数据
-df_comps = pd.DataFrame(columns=comps)
-df_comps.loc["E_D"] = E_D
-df_comps.loc["E_P"] = E_P
-df_comps.to_csv('NH3_E_D.csv')
+# 创建数据用于条形图：最上面的条为E_F，之后依次减去各组件的能量破坏
+# 只绘制能量破坏大于1 W的组件。各工况的组件㶲分析结果都记录下来，
+# 计算结束后一次算出所有工况的瀑布数据并写入同一个文件 NH3_E_D.csv
+component_data = {}  # 工况 -> ean.component_data
+E_F = {}  # 工况 -> 燃料㶲
+
+
+def record_case(case):
+    """记录当前工况的组件㶲分析结果和燃料㶲。"""
+    component_data[case] = ean.component_data.copy()
+    E_F[case] = ean.network_data.E_F
+
+
+record_case('design')
 
 # %% further calculations
 
@@ -260,6 +254,7 @@ print("变化环境温度:\n")
 for Tamb in Tamb_range:
     i += 1
     ean.analyse(pamb, Tamb)  # 进行能流分析
+    record_case(i)  # 记录瀑布图数据
     eps_Tamb.append(ean.network_data.epsilon)  # 获取并存储 epsilon
     print("案例 %d: Tamb = %.1f °C" % (i, Tamb))
 
@@ -277,6 +272,7 @@ for Tgeo in Tgeo_range:
     ev_gh_out.set_attr(T=Tgeo - 1.5)
     nw.solve('offdesign', init_path=path, design_path=path)  # 解算网络
     ean.analyse(pamb, Tamb_design)  # 进行能流分析
+    record_case(i)  # 记录瀑布图数据
     eps_Tgeo.append(ean.network_data.epsilon)  # 获取并存储 epsilon
     print("案例 %d: Tgeo = %.1f °C" % (i, Tgeo))
 
@@ -312,6 +308,7 @@ for Tgeo in Tgeo_range:
         else:
             nw.solve('offdesign', design_path=path)  # 解算网络
         ean.analyse(pamb, Tamb_design)  # 进行能流分析
+        record_case(i)  # 记录瀑布图数据
         epsilon.append(ean.network_data.epsilon)  # 获取并存储 epsilon
         cop += [abs(cd.Q.val) / (cp.P.val + ghp.P.val + hsp.P.val)]  # 计算并存储 COP
         print("案例 %d: Tgeo = %.1f °C, Ths = %.1f °C" % (i, Tgeo, Ths))
@@ -352,6 +349,7 @@ for Tgeo in Tgeo_range:
         else:
             nw.solve('offdesign', design_path=path)  # 解算网络
         ean.analyse(pamb, Tamb_design)  # 进行能流分析
+        record_case(i)  # 记录瀑布图数据
         cop += [abs(cd.Q.val) / (cp.P.val + ghp.P.val + hsp.P.val)]  # 计算并存储 COP
         epsilon.append(ean.network_data.epsilon)  # 获取并存储 epsilon
         print("案例 %s: Tgeo = %.1f °C, Q = -%.1f kW" % (i, Tgeo, Q/1000))
@@ -392,6 +390,7 @@ print("变化环境温度:\n")
 for Tamb in Tamb_range:
     i += 1
     ean.analyse(pamb, Tamb)  # 进行能流分析
+    record_case(i)  # 记录瀑布图数据
     eps_Tamb.append(ean.network_data.epsilon)  # 获取并存储 epsilon
     print("案例 %d: Tamb = %.1f °C" % (i, Tamb))
 
@@ -400,17 +399,28 @@ df_eps_Tamb.loc[Tgeo_design] = eps_Tamb
 df_eps_Tamb.to_csv('NH3_eps_Tamb.csv')
 
 # 根据 Tgeo 计算 epsilon
+# 此时冷凝器热量为上一节最后的 -2.8e3，由设计工况（init_path）直接跳到各 Tgeo 时牛顿法会发散，
+# 改为由上一个 Tgeo 的收敛工况参数延拓求解
+def set_Tgeo(T):
+    # 设置地热回路进水和回水温度
+    gh_in_ghp.set_attr(T=T + 1.5)
+    ev_gh_out.set_attr(T=T - 1.5)
+
+
+cont = Continuation(nw, {'Tgeo': set_Tgeo}, design_path=path)
 eps_Tgeo = []
 print("\n变化地热平均温度:\n")
+Tgeo_last = Tgeo_design
 for Tgeo in Tgeo_range:
     i += 1
-    # 设置地热回路进水和回水温度
-    gh_in_ghp.set_attr(T=Tgeo + 1.5)
-    ev_gh_out.set_attr(T=Tgeo - 1.5)
-    nw.solve('offdesign', init_path=path, design_path=path)  # 解算网络
+    cont.solve({'Tgeo': Tgeo_last}, {'Tgeo': Tgeo})  # 解算网络
+    Tgeo_last = Tgeo
     ean.analyse(pamb, Tamb_design)  # 进行能流分析
+    record_case(i)  # 记录瀑布图数据
     eps_Tgeo.append(ean.network_data.epsilon)  # 获取并存储 epsilon
-    print("案例 %d: Tgeo = %.1f °C" % (i, Tgeo))
+    print("案例 %d: Tgeo = %.1f °C，延拓 %d 步，迭代 %d 次" % (
+        i, Tgeo, cont.stats['steps'], cont.stats['iterations']
+    ))
 
 # 将结果保存到数据框并导出为 CSV 文件
 df_eps_Tgeo.loc[Tamb_design] = eps_Tgeo
@@ -444,6 +454,7 @@ for Tgeo in Tgeo_range:
         else:
             nw.solve('offdesign', design_path=path)  # 解算网络
         ean.analyse(pamb, Tamb_design)  # 进行能流分析
+        record_case(i)  # 记录瀑布图数据
         epsilon.append(ean.network_data.epsilon)  # 获取并存储 epsilon
         cop += [abs(cd.Q.val) / (cp.P.val + ghp.P.val + hsp.P.val)]  # 计算并存储 COP
         print("案例 %d: Tgeo = %.1f °C, Ths = %.1f °C" % (i, Tgeo, Ths))
@@ -484,6 +495,7 @@ for Tgeo in Tgeo_range:
         else:
             nw.solve('offdesign', design_path=path)  # 解算网络
         ean.analyse(pamb, Tamb_design)  # 进行能流分析
+        record_case(i)  # 记录瀑布图数据
         cop += [abs(cd.Q.val) / (cp.P.val + ghp.P.val + hsp.P.val)]  # 计算并存储 COP
         epsilon.append(ean.network_data.epsilon)  # 获取并存储 epsilon
         print("案例 %s: Tgeo = %.1f °C, Q = -%.1f kW" % (i, Tgeo, Q/1000))
@@ -493,4 +505,56 @@ for Tgeo in Tgeo_range:
     df_eps_Tgeo_Q.loc[Tgeo] = epsilon
 
 df_cop_Tgeo_Q.to_csv('NH3_cop_Tgeo_Q.csv')
-df_eps_Tgeo_Q.to_csv('NH3_eps_Tgeo_Q.csv')
\ No newline at end of file
+df_eps_Tgeo_Q.to_csv('NH3_eps_Tgeo_Q.csv')
+
+# 所有工况的㶲损瀑布数据写入同一个文件
+df_waterfall = waterfalls(stack_component_data(component_data), E_F, threshold=1)
+save_waterfalls(df_waterfall, 'NH3_E_D.csv')
+
+# %% 参数延拓：由设计工况直接求解远离设计点的工况
+# 地热平均温度 6.5 °C、加热系统温度 32.5 °C、冷凝器热量 -2.4e3（设计值 -4e3）时，由设计工况直接求解不收敛
+# （迭代过程中冷凝压力超过 NH3 的临界压力，工质性质计算出错）。
+# Continuation 先直接求解目标工况，失败时把步长减半，以最近两个收敛工况线性外推的结果为初值逐步求解。
+def set_Ths(T):
+    cd_hs_feed.set_attr(T=T + 2.5)
+    hs_ret_hsp.set_attr(T=T - 2.5)
+
+
+# 回到设计工况
+set_Tgeo(9.5)
+set_Ths(37.5)
+cd.set_attr(Q=-4e3)
+nw.solve('offdesign', init_path=path, design_path=path)
+
+# 由设计工况直接求解目标工况
+set_Tgeo(6.5)
+set_Ths(32.5)
+cd.set_attr(Q=-2.4e3)
+try:
+    nw.solve('offdesign', design_path=path)
+    direct = nw.converged
+except (ValueError, TESPyNetworkError):
+    # 求解中断时恢复 TESPy 在拓扑简化中修改的设定
+    nw.reset_topology_reduction_specifications()
+    direct = False
+print("\n直接求解: 收敛 %s" % direct)
+
+# 回到设计工况，用参数延拓求解同一目标工况
+set_Tgeo(9.5)
+set_Ths(37.5)
+cd.set_attr(Q=-4e3)
+nw.solve('offdesign', init_path=path, design_path=path)
+
+cont = Continuation(
+    nw, {'Tgeo': set_Tgeo, 'Ths': set_Ths, 'Q': lambda Q: cd.set_attr(Q=Q)},
+    design_path=path
+)
+converged = cont.solve(
+    {'Tgeo': 9.5, 'Ths': 37.5, 'Q': -4e3},
+    {'Tgeo': 6.5, 'Ths': 32.5, 'Q': -2.4e3}
+)
+print("参数延拓: 收敛 %s, 步数 %d（拒绝 %d 步）, 总迭代次数 %d" % (
+    converged, cont.stats['steps'], cont.stats['rejected'], cont.stats['iterations']
+))
+print(cont.steps)
+print("COP = %.3f" % (abs(cd.Q.val) / (cp.P.val + ghp.P.val + hsp.P.val)))
@@ -19,7 +19,8 @@ from tespy.networks import Network
 
 # 导入 TESPy 特征曲线工具
 from tespy.tools.characteristics import CharLine
-from tespy.tools.characteristics import load_default_char as ldc
+# 带缓存的 load_default_char，默认特性数据文件在进程内只解析一次
+from char_registry import load_default_char as ldc, install
 
 # 导入 TESPy 能量分析工具
 from tespy.tools import ExergyAnalysis
@@ -40,6 +41,8 @@ Tgeo = 9.5
 
 # 创建网络对象，并设置温度、压力、比焓和质量流量的单位
 nw = Network(T_unit='C', p_unit='bar', h_unit='kJ / kg', m_unit='kg / s')
+# 组件预处理时加载的默认特性也使用缓存
+install()
 
 cc = CycleCloser('cycle closer')  # 循环闭合器
 
@@ -1,7 +1,8 @@
-from tespy.networks import Network
+from fast_network import FastNetwork
 
 # 创建一个网络对象，并指定流体为 R134a（实际上这里应该是水蒸汽循环，所以应为 'water'）
-my_plant = Network()
+# 后面的参数扫描每次只修改一个数值，FastNetwork 跳过完整的初始化，沿用上一次求解的变量编号和设定表
+my_plant = FastNetwork()
 my_plant.set_attr(fluids=['water'], T_unit='C', p_unit='bar', h_unit='kJ / kg')  # 设置温度单位为摄氏度，压力单位为巴，比焓单位为 kJ/kg
 
 from tespy.components import (
@@ -58,11 +59,19 @@ my_plant.print_results()  # 打印求解结果
 # 导入必要的库
 import matplotlib.pyplot as plt
 import numpy as np
-from fluprodia import FluidPropertyDiagram
+from isoline_cache import cached_diagram, calc_component_isolines
 
-# 初始设置
-diagram = FluidPropertyDiagram('water')  # 创建水的性质图对象
-diagram.set_unit_system(T='°C', p='bar', h='kJ/kg')  # 设置单位系统：温度为摄氏度，压力为巴，比焓为 kJ/kg
+# 设置 T-s 图的隔离线
+isolines = {
+    'Q': np.linspace(0, 1, 2),
+    'p': np.array([1, 2, 5, 10, 20, 50, 100, 300]),
+    'v': np.array([]),
+    'h': np.arange(500, 3501, 500)
+}
+
+# 初始设置：创建水的性质图对象，单位制为 摄氏度、巴、kJ/kg
+# 隔离线只取决于工质、单位制和隔离线范围，第一次计算后从磁盘缓存读取
+diagram = cached_diagram('water', {'T': '°C', 'p': 'bar', 'h': 'kJ/kg'}, isolines)
 
 # 将模型结果存储在字典中
 result_dict = {}
@@ -70,23 +79,11 @@ result_dict.update(
     {cp.label: cp.get_plotting_data()[1] for cp in my_plant.comps['object']
      if cp.get_plotting_data() is not None})  # 获取每个组件的绘图数据
 
-# 遍历从 TESPy 模拟获得的结果
-for key, data in result_dict.items():
-    # 计算 T-s 图中的个别隔离线
-    result_dict[key]['datapoints'] = diagram.calc_individual_isoline(**data)
+# 批量计算 T-s 图中各组件的个别隔离线
+calc_component_isolines(diagram, result_dict)
 
 # 创建一个图形和轴用于绘制 T-s 图
 fig, ax = plt.subplots(1, figsize=(20, 10))
-isolines = {
-    'Q': np.linspace(0, 1, 2),
-    'p': np.array([1, 2, 5, 10, 20, 50, 100, 300]),
-    'v': np.array([]),
-    'h': np.arange(500, 3501, 500)
-}
-
-# 设置 T-s 图的隔离线
-diagram.set_isolines(**isolines)
-diagram.calc_isolines()
 
 # 在 T-s 图上绘制隔离线
 diagram.draw_isolines(fig, ax, 'Ts', x_min=0, x_max=7500, y_min=0, y_max=650)
@@ -200,6 +197,7 @@ for p in data['p_livesteam']:
 
 # 恢复到基础压力
 c1.set_attr(p=150)
+print(f'预处理缓存: {my_plant.cache_stats}')
 
 fig, ax = plt.subplots(2, 3, figsize=(16, 8), sharex='col', sharey='row')  # 创建子图
 
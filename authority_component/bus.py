@@ -20,10 +20,13 @@
 from tespy.components import (Sink, Source, CombustionEngine, HeatExchanger, Merge, Splitter, Pump)
 from tespy.connections import Connection, Ref, Bus
 from tespy.networks import Network
-from tespy.tools import CharLine
 import shutil
 import numpy as np
 
+# 根目录下的工具模块：在仓库根目录下以 python -m authority_component.bus 运行本文件
+from fast_chars import FastCharLine, bus_efficiencies
+from ideal_gas import IDEAL_GAS_RULE, NASA7Wrapper
+
 # 创建一个TESPy网络实例，设置压力单位为bar，温度单位为摄氏度，压力范围为0.5到10 bar，并关闭迭代信息显示
 nw = Network(p_unit='bar', T_unit='C', p_range=[0.5, 10], iterinfo=False)
 
@@ -93,11 +96,17 @@ fgc.set_attr(pr1=0.999, pr2=0.98, design=['pr1', 'pr2'], offdesign=['zeta1', 'ze
 # 设置冷却水泵的设计参数和离设计点操作参数
 pu.set_attr(eta_s=0.8, design=['eta_s'], offdesign=['eta_s_char'])
 
+# 燃气侧（空气、燃料和烟气）只涉及理想气体，各组分使用 NASA 7 系数多项式（ideal_gas.py）计算性质，
+# 冷却水仍使用 CoolProp
+nasa = {f: NASA7Wrapper for f in ['Ar', 'N2', 'CO2', 'O2', 'H2O', 'CH4']}
+
 # 设置环境空气进入内燃机的条件：压力为5 bar，温度为30°C，组成为空气成分
-amb_comb.set_attr(p=5, T=30, fluid={'Ar': 0.0129, 'N2': 0.7553, 'CO2': 0.0004, 'O2': 0.2314})
+amb_comb.set_attr(p=5, T=30, fluid={'Ar': 0.0129, 'N2': 0.7553, 'CO2': 0.0004, 'O2': 0.2314},
+                  fluid_engines=nasa, mixing_rule=IDEAL_GAS_RULE)
 
 # 设置燃料进入内燃机的条件：温度为30°C，组成为纯甲烷
-sf_comb.set_attr(T=30, fluid={'CH4': 1})
+# 燃烧产物中的水也要使用 NASA7Wrapper，因此燃料组分中列出 H2O
+sf_comb.set_attr(T=30, fluid={'CH4': 1, 'H2O': 0}, fluid_engines=nasa, mixing_rule=IDEAL_GAS_RULE)
 
 # 设置冷却水入口条件：压力为3 bar，温度为60°C，组成为纯水，质量流量为100 kg/s
 cw_pu.set_attr(p=3, T=60, fluid={'H2O': 1}, m=100)
@@ -113,8 +122,9 @@ load = np.array([0.2, 0.4, 0.6, 0.8, 1, 1.2])
 eff = np.array([0.9, 0.94, 0.97, 0.99, 1, 0.99]) * 0.98
 
 # 创建发电机和电动机的特性曲线对象
-gen = CharLine(x=load, y=eff)
-mot = CharLine(x=load, y=eff)
+# FastCharLine 与 CharLine 用法相同，构造时预先计算线段斜率，并支持数组输入
+gen = FastCharLine(x=load, y=eff)
+mot = FastCharLine(x=load, y=eff)
 
 # 创建总线以汇总总功率输出、总热输入和燃料输入
 power_bus = Bus('total power output', P=-10e6)
@@ -209,5 +219,8 @@ round(chp.P.val / chp.P.design, 3)
 # 计算并四舍五入冷却水泵在总功率输出总线上的效率
 round(pu.calc_bus_efficiency(power_bus), 3)
 
+# 一次计算总功率输出总线上所有组件的效率
+bus_efficiencies(power_bus)
+
 # 删除临时文件夹'tmp'
 shutil.rmtree('./tmp', ignore_errors=True)
\ No newline at end of file
@@ -219,6 +219,81 @@ plt.show()
 
 
 
+# %% 调度联合仿真
+# 以 15 分钟分辨率按全年（35040 步）可再生能源功率驱动电解槽，
+# 先在功率网格上求解离设计工况并建立插值表，设定值落在两个已求解工况之间时直接插值，
+# 其余设定值才求解完整网络；结果按块写入 CSV 文件。
+import pandas as pd
+
+# 根目录下的工具模块：在仓库根目录下以 python -m authority_component.electrolyzer2 运行本文件
+from dispatch_cosim import DispatchCoSimulation
+
+# 构造示例功率曲线：光伏（日变化和季节变化）与风电（随机游走）之和
+steps = pd.date_range('2023-01-01', periods=35040, freq='15min')
+rng = np.random.default_rng(42)
+day = np.arange(len(steps)) / 96
+solar = np.clip(np.sin(2 * np.pi * (day % 1 - 0.25)), 0, None) * (0.7 - 0.3 * np.cos(2 * np.pi * day / 365))
+wind = np.clip(0.5 + np.cumsum(rng.normal(0, 0.02, len(steps))) % 1.0 - 0.25, 0, 1)
+# 设定值取整到设计功率的 1 %
+profile = pd.Series(np.round(solar + wind, 2) * P_design, index=steps)
+
+cosim = DispatchCoSimulation(
+    nw, setpoint=lambda P: el.set_attr(P=P),
+    outputs={
+        'eta': lambda: el.eta.val,           # 电解效率
+        'm_H2': lambda: el_cmp.m.val_SI,     # 氢气质量流量 (kg/s)
+        'Q': lambda: el.Q.val,               # 冷却热量 (W)
+        'P_comp': lambda: comp.P.val,        # 氢气压缩机功率 (W)
+    },
+    design_path='tmp',
+    max_gap=0.051 * P_design,   # 只在间距不超过 5 % 设计功率的两个工况之间插值
+    off_below=0.5 * P_design,   # 低于 50 % 设计功率时停机
+)
+cosim.precompute(np.arange(0.5, 1.96, 0.05) * P_design)
+summary = cosim.run(profile, 'electrolyzer_dispatch.csv')
+print(summary)
+
+# %% 电解槽集群与多级间冷压缩
+# 20 个相同的并联电堆只建立一个电堆模型，由 Multiplier 把氢气流量放大 20 倍后
+# 送入三级间冷压缩机组（10 bar -> 约 200 bar），氢气使用共享的 BICUBIC 性质表。
+from h2_compression import CompressionTrain, H2
+from multiplicity import Multiplier
+
+n_stacks = 20
+fleet = Network(T_unit='C', p_unit='bar', v_unit='l / s', iterinfo=False)
+
+fleet_fw = Source('feed water')
+fleet_oxy = Sink('oxygen sink')
+fleet_hydro = Sink('hydrogen sink')
+fleet_cw_cold = Source('cooling water source')
+fleet_cw_hot = Sink('cooling water sink')
+stack = WaterElectrolyzer('electrolyzer stack')          # 单个电堆
+stacks = Multiplier('electrolyzer stacks', n=n_stacks)   # 并联电堆的汇合点
+train = CompressionTrain('h2 compression', stages=3, pr=20, eta_s=0.8, T_cool=40)
+
+fleet.add_conns(
+    Connection(fleet_fw, 'out1', stack, 'in2', label='feed water'),
+    Connection(stack, 'out2', fleet_oxy, 'in1', label='oxygen'),
+    Connection(stack, 'out3', stacks, 'in1', label='stack hydrogen'),
+    Connection(stacks, 'out1', *train.inlet, label='fleet hydrogen'),
+    Connection(*train.outlet, fleet_hydro, 'in1', label='compressed hydrogen'),
+    Connection(fleet_cw_cold, 'out1', stack, 'in1', label='stack cooling in'),
+    Connection(stack, 'out1', fleet_cw_hot, 'in1', label='stack cooling out'),
+)
+fleet.add_subsys(train)
+
+fleet.get_conn('feed water').set_attr(p=10, T=15)
+fleet.get_conn('stack cooling in').set_attr(p=5, T=15, fluid={'H2O': 1})
+fleet.get_conn('stack cooling out').set_attr(T=45)
+fleet.get_conn('stack hydrogen').set_attr(T=50, fluid={H2: 1})
+stack.set_attr(eta=0.8, pr=0.99, P=P_design / n_stacks)  # 每个电堆的功率
+fleet.solve('design')
+
+print(f'电堆数量: {n_stacks}')
+print(f'电解总功率: {stack.P.val * n_stacks:.0f} W')
+print(f'氢气总流量: {fleet.get_conn("fleet hydrogen").m.val_SI:.4f} kg/s')
+print(f'压缩机组功率: {train.P:.0f} W，间冷器换热量: {train.Q:.0f} W')
+
 # 删除临时文件夹'tmp'及其内容
 shutil.rmtree('./tmp', ignore_errors=True)
 
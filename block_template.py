@@ -0,0 +1,235 @@
+# 子网络模板
+# 区域供热管网和热泵模型中经常重复使用同样的组件块，例如 供水管 + 用户换热器 + 控制阀 的换热站支路，
+# 或 complex_Heat_pump.py 中的 蒸发器 + 汽包 + 过热器。
+# BlockTemplate 把一个 Subsystem 类只编译一次：记录块内组件的类型和参数设定、内部连接关系、
+# 连接上的参数设定以及对外接口（块内未连接的进出口），并完成标签和参数检查。
+# 之后每个实例直接按编译结果创建组件和连接，不再执行 Subsystem 的构建代码和检查，
+# 也可以按实例修改个别参数（例如各换热站的热负荷不同）。
+# 模板只缓存建模的结果（组件、连接和参数设定），方程、雅可比矩阵的结构等仍由 TESPy 在每次求解时生成。
+# add_blocks 通过一次 nw.add_conns 调用把所有实例的连接（及其组件）加入网络。
+
+from tespy.connections import Connection
+from tespy.tools.data_containers import ComponentCharacteristicMaps as dc_cm
+from tespy.tools.data_containers import ComponentCharacteristics as dc_cc
+from tespy.tools.data_containers import ComponentProperties as dc_cp
+from tespy.tools.data_containers import GroupedComponentCharacteristics as dc_gcc
+from tespy.tools.data_containers import SimpleDataContainer as dc_simple
+
+# 连接上可以直接设定的状态参数
+_CONN_PROPS = ['m', 'p', 'h', 'T', 'v', 'x', 'Td_bp']
+
+
+class BlockTemplate:
+    r"""
+    由 Subsystem 编译得到的子网络模板。
+
+    Parameters
+    ----------
+    subsystem : class
+        Subsystem 的子类，各组件标签和连接标签必须以子系统标签开头。
+
+    **kwargs
+        传给 subsystem 构造函数的其他参数（标签除外）。
+
+    Note
+    ----
+    模板内的连接不能使用 Ref 参数（引用会指向编译时的原型连接），
+    需要时请在实例化后单独设置。
+
+    Example
+    -------
+    >>> template = BlockTemplate(Substation)
+    >>> blocks = [
+    ...     template.instantiate(f'sub{i}', params={'consumer': {'Q': -Q}})
+    ...     for i, Q in enumerate(loads)
+    ... ]
+    >>> add_blocks(nw, *blocks, conns=feed_and_return_connections)
+    """
+
+    def __init__(self, subsystem, **kwargs):
+        prototype = subsystem('template', **kwargs)
+        self.name = subsystem.__name__
+        prefix = prototype.label
+
+        key_of = {}
+        self.components = {}
+        for key, comp in prototype.comps.items():
+            self.components[key] = (
+                comp.__class__, _suffix(comp.label, prefix), _comp_spec(comp)
+            )
+            key_of[comp] = key
+
+        self.connections = {}
+        for key, c in prototype.conns.items():
+            if c.source not in key_of or c.target not in key_of:
+                msg = (
+                    f"模板 {self.name} 的连接 {c.label} 连接到了子系统以外的组件，"
+                    "对外连接请在实例化后单独创建。"
+                )
+                raise ValueError(msg)
+            self.connections[key] = (
+                key_of[c.source], c.source_id, key_of[c.target], c.target_id,
+                _suffix(c.label, prefix), _conn_spec(c)
+            )
+
+        # 块内未连接的进出口，即实例的对外接口
+        used = {(s, sid) for s, sid, _, _, _, _ in self.connections.values()}
+        used |= {(t, tid) for _, _, t, tid, _, _ in self.connections.values()}
+        self.inlets, self.outlets = [], []
+        for key, comp in prototype.comps.items():
+            self.inlets += [(key, i) for i in comp.inlets() if (key, i) not in used]
+            self.outlets += [(key, o) for o in comp.outlets() if (key, o) not in used]
+
+    def instantiate(self, label, params=None):
+        r"""
+        按编译结果创建一个实例。
+
+        Parameters
+        ----------
+        label : str
+            实例标签，替换组件标签和连接标签中的子系统标签。
+
+        params : dict
+            按组件或连接的键修改个别参数，例如
+            :code:`{'consumer': {'Q': -8e3}, '2': {'T': 60}}`（可选）。
+
+        Returns
+        -------
+        block : Block
+            包含组件和连接的实例。
+        """
+        params = params or {}
+        unknown = set(params) - set(self.components) - set(self.connections)
+        if unknown:
+            msg = f"模板 {self.name} 中没有组件或连接 {', '.join(sorted(unknown))}。"
+            raise KeyError(msg)
+
+        block = Block(label, self)
+        for key, (cls, suffix, spec) in self.components.items():
+            block.comps[key] = cls(label + suffix, **{**spec, **params.get(key, {})})
+
+        for key, (s, sid, t, tid, suffix, spec) in self.connections.items():
+            c = Connection(
+                block.comps[s], sid, block.comps[t], tid, label=label + suffix
+            )
+            c.set_attr(**{**spec, **params.get(key, {})})
+            block.conns[key] = c
+        return block
+
+
+class Block:
+    """子网络模板的一个实例，组件和连接的键与模板的 Subsystem 相同。"""
+
+    def __init__(self, label, template):
+        self.label = label
+        self.template = template
+        self.comps = {}
+        self.conns = {}
+
+    @property
+    def inlet(self):
+        """实例唯一的对外进口 (组件, 接口)。"""
+        return self._port(self.template.inlets, '进口')
+
+    @property
+    def outlet(self):
+        """实例唯一的对外出口 (组件, 接口)。"""
+        return self._port(self.template.outlets, '出口')
+
+    def _port(self, ports, name):
+        if len(ports) != 1:
+            msg = (
+                f"模板 {self.template.name} 有 {len(ports)} 个对外{name}，"
+                "请通过 comps 直接指定组件和接口。"
+            )
+            raise ValueError(msg)
+        key, port = ports[0]
+        return self.comps[key], port
+
+
+def add_blocks(nw, *blocks, conns=()):
+    r"""
+    把多个模板实例和其他连接一次性加入网络，效果与 :code:`nw.add_conns` 相同。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        网络。
+
+    blocks : Block
+        模板实例。
+
+    conns : list
+        其他连接，例如实例与干管之间的连接（可选）。
+    """
+    nw.add_conns(
+        *[c for block in blocks for c in block.conns.values()], *conns
+    )
+
+
+def _suffix(label, prefix):
+    """去掉标签中的子系统标签前缀。"""
+    if not label.startswith(prefix):
+        msg = (
+            f"标签 {label} 不以子系统标签 {prefix} 开头，"
+            "模板的组件和连接标签需要包含子系统标签。"
+        )
+        raise ValueError(msg)
+    return label[len(prefix):]
+
+
+def _comp_spec(comp):
+    """组件的参数设定，返回可以传给组件构造函数的关键字参数。"""
+    spec = {}
+    for key, data in comp.parameters.items():
+        value = comp.get_attr(key)
+        if isinstance(data, dc_cp):
+            if value.is_var:
+                spec[key] = 'var'
+            elif value.is_set:
+                spec[key] = value.val
+        elif isinstance(data, (dc_cc, dc_cm)):
+            if value.char_func is not None:
+                spec[key] = value.char_func
+        elif isinstance(data, dc_gcc):
+            if value.is_set:
+                spec[key] = {'is_set': True}
+        elif isinstance(data, dc_simple):
+            if value.is_set:
+                spec[key] = value.val
+    for key in ['design', 'offdesign']:
+        if comp.get_attr(key):
+            spec[key] = list(comp.get_attr(key))
+    for key in ['local_design', 'local_offdesign', 'design_path']:
+        if comp.get_attr(key):
+            spec[key] = comp.get_attr(key)
+    return spec
+
+
+def _conn_spec(c):
+    """连接的参数设定，返回可以传给 Connection.set_attr 的关键字参数。"""
+    if any(c.get_attr(f'{prop}_ref').is_set for prop in ['m', 'p', 'h', 'T', 'v']):
+        msg = f"模板中的连接 {c.label} 设定了 Ref 参数，请在实例化后设置。"
+        raise ValueError(msg)
+
+    spec = {}
+    for prop in _CONN_PROPS:
+        data = c.get_attr(prop)
+        if data.is_set:
+            spec[prop] = data.val
+    for prop in ['m', 'p', 'h']:
+        if c.get_attr(prop).val0 == c.get_attr(prop).val0:  # 不是 NaN
+            spec[f'{prop}0'] = c.get_attr(prop).val0
+    if c.fluid.is_set:
+        spec['fluid'] = {f: c.fluid.val[f] for f in c.fluid.is_set}
+    if c.fluid_balance.is_set:
+        spec['fluid_balance'] = True
+    if c.state.is_set:
+        spec['state'] = c.state.val
+    for key in ['design', 'offdesign']:
+        if c.get_attr(key):
+            spec[key] = list(c.get_attr(key))
+    for key in ['local_design', 'local_offdesign', 'design_path']:
+        if c.get_attr(key):
+            spec[key] = c.get_attr(key)
+    return spec
@@ -0,0 +1,97 @@
+# 进程内共享的默认特性曲线/特性图缓存
+# TESPy 的 load_default_char 每次调用都要重新读取并解析 char_lines.json / char_maps.json。
+# 这里对每个 (组件, 参数, 特性名称, 类型) 只解析一次，生成一个数组只读的原型对象，
+# 之后每次调用返回原型的浅拷贝：各实例共享同一份只读数组，
+# 需要修改时替换整个数组（例如 char.y = char.y * 1.05），不影响其他实例。
+# install() 可以让 TESPy 组件在预处理时加载默认特性也使用该缓存。
+
+import copy
+import json
+import os
+from functools import lru_cache
+
+from tespy.tools.characteristics import CharLine
+from tespy.tools.characteristics import CharMap
+from tespy import __datapath__
+
+from fast_chars import FastCharMap
+
+
+@lru_cache(maxsize=None)
+def _read_data(kind):
+    """读取并解析 TESPy 的默认特性数据文件，每个文件只读取一次。"""
+    path = os.path.join(__datapath__, f"char_{kind}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def _shares_arrays(char_type):
+    """判断该类型的实例能否共享只读数组。
+
+    CharMap.evaluate_x 和 get_domain_errors_x 在超出 x 范围时返回特性图数组的视图，
+    压缩机随后会原地缩放，因此普通 CharMap 每次都复制数组；
+    FastCharMap 的这两个方法总是返回新数组，可以共享。
+    """
+    return not issubclass(char_type, CharMap) or issubclass(char_type, FastCharMap)
+
+
+@lru_cache(maxsize=None)
+def _prototype(component, parameter, function_name, char_type):
+    """创建并缓存特性曲线/特性图的原型对象，数组设为只读。"""
+    if issubclass(char_type, CharLine):
+        data = _read_data("lines")[component][parameter][function_name]
+        obj = char_type(x=data["x"], y=data["y"])
+    else:
+        data = _read_data("maps")[component][parameter][function_name]
+        obj = char_type(x=data["x"], y=data["y"], z=data["z"])
+
+    if _shares_arrays(char_type):
+        for value in vars(obj).values():
+            if hasattr(value, "setflags"):
+                value.setflags(write=False)
+    return obj
+
+
+def load_default_char(component, parameter, function_name, char_type):
+    r"""
+    加载 TESPy 默认特性曲线或特性图（带缓存），参数与 TESPy 的同名函数相同。
+
+    Parameters
+    ----------
+    component : str
+        组件类型，例如 'heat exchanger'。
+
+    parameter : str
+        使用该特性的组件参数，例如 'kA_char1'。
+
+    function_name : str
+        特性名称，例如 'DEFAULT' 或 'EVAPORATING FLUID'。
+
+    char_type : class
+        CharLine、CharMap 或其子类（例如 FastCharLine、FastCharMap）。
+
+    Returns
+    -------
+    obj : object
+        特性对象。除普通 CharMap 外，各实例共享同一份只读数组。
+    """
+    obj = copy.copy(_prototype(component, parameter, function_name, char_type))
+    if not _shares_arrays(char_type):
+        obj.x, obj.y, obj.z = obj.x.copy(), obj.y.copy(), obj.z.copy()
+    return obj
+
+
+def cache_info():
+    """返回缓存命中统计（lru_cache 的 CacheInfo）。"""
+    return _prototype.cache_info()
+
+
+def install():
+    """让 TESPy 组件在加载默认特性时使用缓存版本。
+
+    TESPy 的 Component 在预处理中为未指定的 kA_char、eta_s_char 等参数调用
+    load_default_char，替换 tespy.components.component 模块中的引用即可生效。
+    """
+    from tespy.components import component
+
+    component.ldc = load_default_char
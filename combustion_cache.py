@@ -0,0 +1,220 @@
+# 燃烧室反应计算的缓存
+# TESPy 的燃烧室每次求解前（preprocess）都要重新识别燃料、查询工质别名、计算各燃料的 C/H/O 原子数和低位热值，
+# 迭代中每个组分的反应平衡方程 stoichiometry(fluid) 各自重新计算燃料和氧气的摩尔流量，
+# 方程对质量流量和组分的导数全部用数值差分求得，每次迭代调用 stoichiometry 上百次。
+# gas_turbine.py 扫描热输入 ti 和燃料组成时，燃烧室的反应计算占了求解时间的一半以上。
+# CachedCombustionChamber 的计算结果与 DiabaticCombustionChamber 相同，区别在于：
+#   - 燃料、原子数、低位热值和氧气需求按网络中的工质（及其摩尔质量）缓存，多次求解和多个燃烧室共用；
+#   - 过量空气系数 λ >= 1 时，各组分的反应平衡对入口组分流量 m·x 是线性的，
+#     系数矩阵（反应矩阵）只取决于燃料，随上面的结果一起缓存；
+#     所有组分的残差由一次矩阵乘法得到，导数直接由反应矩阵给出，不再数值差分；
+#   - λ < 1（燃料过量）时回到 TESPy 的原始计算。
+# 组分的质量分数只影响线性方程的变量值，不影响反应矩阵，因此扫描燃料组成时缓存依然有效。
+# 每个燃烧室的 cache_stats 记录缓存命中情况，cache_stats(nw) 汇总网络中所有燃烧室的统计。
+
+import numpy as np
+from tespy.components import DiabaticCombustionChamber
+from tespy.components.component import component_registry
+
+# 反应参数缓存：(工质, 摩尔质量) 元组 -> 燃料和反应矩阵
+_reactions = {}
+
+
+@component_registry
+class CachedCombustionChamber(DiabaticCombustionChamber):
+    r"""
+    反应参数和反应矩阵带缓存的 DiabaticCombustionChamber，参数与 DiabaticCombustionChamber 相同。
+
+    Note
+    ----
+    :code:`cc.cache_stats` 记录缓存命中情况：
+
+    - 'reaction_hits' / 'reaction_misses'：求解前复用 / 重新计算燃料和反应矩阵的次数；
+    - 'analytic_derivs' / 'numeric_derivs'：反应平衡的导数由反应矩阵给出 /
+      （λ < 1 时）数值差分的次数。
+
+    网络中所有燃烧室的统计由 :code:`cache_stats(nw)` 汇总。
+    """
+
+    def __init__(self, label, **kwargs):
+        self.cache_stats = dict.fromkeys(
+            ['reaction_hits', 'reaction_misses', 'analytic_derivs',
+             'numeric_derivs'], 0
+        )
+        super().__init__(label, **kwargs)
+
+    def setup_reaction_parameters(self):
+        r"""按网络中的工质复用燃料、低位热值和反应矩阵。"""
+        inl, _ = self._get_combustion_connections()
+        fluids = sorted(set(f for c in self.inl + self.outl for f in c.fluid.val))
+        key = (
+            tuple(fluids), tuple(self.fluid_eqs_list),
+            tuple(inl[0].fluid.wrapper[f]._molar_mass for f in fluids)
+        )
+        try:
+            reaction = _reactions[key]
+        except KeyError:
+            self.cache_stats['reaction_misses'] += 1
+            super().setup_reaction_parameters()
+            reaction = _reactions[key] = self._reaction_data()
+        else:
+            self.cache_stats['reaction_hits'] += 1
+
+        self.fuel_list = set(reaction['fuel_list'])
+        self.fuels = {f: data.copy() for f, data in reaction['fuels'].items()}
+        for fluid in ['o2', 'co2', 'h2o', 'n2']:
+            setattr(self, fluid, reaction[fluid])
+        self._matrix = reaction['matrix']
+        self._o2_demand = reaction['o2_demand']
+        self._o2_index = reaction['o2_index']
+
+    def _reaction_data(self):
+        r"""
+        由 TESPy 计算的燃料参数生成反应矩阵。
+
+        Returns
+        -------
+        reaction : dict
+            燃料参数和反应矩阵。矩阵 B 的行和列都按 fluid_eqs_list 排列，
+            λ >= 1 时除氧气外各组分的残差为 :math:`B \cdot \dot{m}_x - \dot{m}_{out} \cdot x_{out}`，
+            :math:`\dot{m}_x` 为各组分在入口的质量流量之和；o2_demand 为每千克燃料消耗的氧气质量。
+        """
+        inl, _ = self._get_combustion_connections()
+        wrapper = inl[0].fluid.wrapper
+        index = {f: i for i, f in enumerate(self.fluid_eqs_list)}
+        n = len(index)
+        matrix = np.eye(n)
+        o2_demand = np.zeros(n)
+        for f in self.fuel_list:
+            M = wrapper[f]._molar_mass
+            C = self.fuels[f]['C']
+            H = self.fuels[f]['H']
+            j = index[f]
+            matrix[j, j] = 0
+            matrix[index[self.co2], j] += C * wrapper[self.co2]._molar_mass / M
+            matrix[index[self.h2o], j] += H / 2 * wrapper[self.h2o]._molar_mass / M
+            o2_demand[j] = (H / 4 + C) * wrapper[self.o2]._molar_mass / M
+
+        return {
+            'fuel_list': sorted(self.fuel_list),
+            'fuels': {f: data.copy() for f, data in self.fuels.items()},
+            'o2': self.o2, 'co2': self.co2, 'h2o': self.h2o, 'n2': self.n2,
+            'matrix': matrix, 'o2_demand': o2_demand,
+            'o2_index': index[self.o2],
+        }
+
+    def _reaction(self):
+        r"""
+        计算入口的组分流量和当前的反应矩阵。
+
+        Returns
+        -------
+        reaction : tuple
+            (反应矩阵, 各入口的组分向量, 入口组分流量之和)；λ < 1 时返回 None。
+        """
+        inl, _ = self._get_combustion_connections()
+        x = [
+            np.array([i.fluid.val[f] for f in self.fluid_eqs_list]) for i in inl
+        ]
+        flow = sum(i.m.val_SI * xi for i, xi in zip(inl, x))
+        o2 = self._o2_index
+        demand = self._o2_demand @ flow
+        if not self.lamb.is_set:
+            if demand == 0:
+                return None
+            self.lamb.val = flow[o2] / demand
+        if self.lamb.val < 1:
+            return None
+
+        matrix = self._matrix.copy()
+        if self.lamb.is_set:
+            matrix[o2, o2] -= 1 / self.lamb.val
+        else:
+            # 氧气消耗量等于化学计量需氧量
+            matrix[o2] -= self._o2_demand
+        return matrix, x, flow
+
+    def stoichiometry_func(self):
+        r"""
+        计算所有组分的反应平衡残差。
+
+        Returns
+        -------
+        residual : list
+            各组分的残差。
+        """
+        reaction = self._reaction()
+        if reaction is None:
+            return super().stoichiometry_func()
+
+        matrix, _, flow = reaction
+        _, outl = self._get_combustion_connections()
+        o = outl[0]
+        x_out = np.array([o.fluid.val[f] for f in self.fluid_eqs_list])
+        return list(matrix @ flow - o.m.val_SI * x_out)
+
+    def stoichiometry_deriv(self, increment_filter, k):
+        r"""
+        计算反应平衡的偏导数。
+
+        Parameters
+        ----------
+        increment_filter : ndarray
+            Matrix for filtering non-changing variables.
+
+        k : int
+            Position of equation in Jacobian matrix.
+        """
+        reaction = self._reaction()
+        if reaction is None:
+            self.cache_stats['numeric_derivs'] += 1
+            return super().stoichiometry_deriv(increment_filter, k)
+
+        self.cache_stats['analytic_derivs'] += 1
+        matrix, x, _ = reaction
+        inl, outl = self._get_combustion_connections()
+        index = {f: i for i, f in enumerate(self.fluid_eqs_list)}
+        rows = range(k, k + len(index))
+        for conn, xi in zip(inl, x):
+            if self.is_variable(conn.m, increment_filter):
+                for row, value in zip(rows, matrix @ xi):
+                    self.jacobian[row, conn.m.J_col] = value
+            for f in conn.fluid.is_var:
+                col = conn.fluid.J_col[f]
+                for row, value in zip(rows, conn.m.val_SI * matrix[:, index[f]]):
+                    self.jacobian[row, col] = value
+
+        o = outl[0]
+        if self.is_variable(o.m, increment_filter):
+            for f, row in zip(self.fluid_eqs_list, rows):
+                self.jacobian[row, o.m.J_col] = -o.fluid.val[f]
+        for f in o.fluid.is_var:
+            col = o.fluid.J_col[f]
+            for row in rows:
+                self.jacobian[row, col] = 0
+            self.jacobian[k + index[f], col] = -o.m.val_SI
+
+
+def cache_stats(nw):
+    r"""
+    汇总网络中所有 CachedCombustionChamber 的缓存命中情况。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        网络。
+
+    Returns
+    -------
+    stats : dict
+        各燃烧室 cache_stats 之和，键与 CachedCombustionChamber.cache_stats 相同。
+    """
+    stats = dict.fromkeys(
+        ['reaction_hits', 'reaction_misses', 'analytic_derivs',
+         'numeric_derivs'], 0
+    )
+    for cp in nw.comps['object']:
+        if isinstance(cp, CachedCombustionChamber):
+            for key, value in cp.cache_stats.items():
+                stats[key] += value
+    return stats
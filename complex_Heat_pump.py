@@ -6,141 +6,66 @@ nw = Network(
 )
 # 创建一个新的热力系统网络实例，并设置温度、压力、比焓和质量流量的单位
 
+from tespy.components import Compressor  # 导入Compressor类用于压缩机组件
 from tespy.components import Condenser  # 导入Condenser类用于冷凝器组件
 from tespy.components import CycleCloser  # 导入CycleCloser类用于循环闭合组件
+from tespy.components import Drum  # 导入Drum类用于集汽器组件
+from tespy.components import HeatExchanger  # 导入HeatExchanger类用于换热器组件
+from tespy.components import Merge  # 导入Merge类用于合并器组件
 from tespy.components import SimpleHeatExchanger  # 导入SimpleHeatExchanger类用于简单的换热器组件
 from tespy.components import Pump  # 导入Pump类用于泵组件
 from tespy.components import Sink  # 导入Sink类用于汇组件
 from tespy.components import Source  # 导入Source类用于源组件
+from tespy.components import Splitter  # 导入Splitter类用于分流器组件
+from tespy.components import Valve  # 导入Valve类用于阀门组件
 
-# 源 和 汇
-c_in = Source("refrigerant in")  # 创建一个名为“refrigerant in”的源组件
-cons_closer = CycleCloser("consumer cycle closer")  # 创建一个名为“consumer cycle closer”的循环闭合组件
-va = Sink("valve")  # 创建一个名为“valve”的汇组件
-
-# 冷凝器 和 再循环泵 和 消费者换热器
+# 消费者系统：冷凝器、再循环泵和消费者
 cd = Condenser("condenser")  # 创建一个名为“condenser”的冷凝器组件
 rp = Pump("recirculation pump")  # 创建一个名为“recirculation pump”的泵组件
 cons = SimpleHeatExchanger("consumer")  # 创建一个名为“consumer”的简单换热器组件
+cons_closer = CycleCloser("consumer cycle closer")  # 创建一个名为“consumer cycle closer”的循环闭合组件
 
-# 建立 消费者系统
-# 从消费者开始，因为该装置将设计为提供特定的热流量。
-# 可以确定消费者系统的组件：冷凝器、泵和消费者
-from tespy.connections import Connection  # 导入Connection类用于连接组件
-
-c0 = Connection(c_in, "out1", cd, "in1", label="0")  # 连接“refrigerant in”到“condenser”
-c1 = Connection(cd, "out1", va, "in1", label="1")  # 连接“condenser”到“valve”
-c20 = Connection(cons_closer, "out1", rp, "in1", label="20")  # 连接“consumer cycle closer”到“recirculation pump”
-c21 = Connection(rp, "out1", cd, "in2", label="21")  # 连接“recirculation pump”到“condenser”
-c22 = Connection(cd, "out2", cons, "in1", label="22")  # 连接“condenser”到“consumer”
-c23 = Connection(cons, "out1", cons_closer, "in1", label="23")  # 连接“consumer”到“consumer cycle closer”
-
-nw.add_conns(c0, c1, c20, c21, c22, c23)  # 将所有连接添加到网络中
-
-cd.set_attr(pr1=0.99, pr2=0.99)  # 设置冷凝器的第一和第二出口的压力比
-rp.set_attr(eta_s=0.75)  # 设置再循环泵的等熵效率
-cons.set_attr(pr=0.99)  # 设置消费者换热器的压力比
-
-# PropsSI函数可以用来查询各种流体的热力学性质，比如压力、温度、比焓等
-from CoolProp.CoolProp import PropsSI as PSI  # 导入PropsSI函数用于获取流体性质
-
-# "P" 表示我们要查询的是压力
-# "Q", 1 表示我们要查询的是饱和状态下的性质（Q=1表示饱和蒸汽）
-# "T", 273.15 + 95 表示我们在273.15 + 95 K（即95°C）的温度下进行查询
-# working_fluid 是我们指定的工作流体，这里是氨气（NH3）
-# / 1e5 将结果从Pa转换为bar
-p_cond = PSI("P", "Q", 1, "T", 273.15 + 95, working_fluid) / 1e5  # 计算冷凝温度对应的饱和压力
-c0.set_attr(T=170, p=p_cond, fluid={working_fluid: 1})  # 设置c0连接的温度、压力和流体组分
-c20.set_attr(T=60, p=2, fluid={"water": 1})  # 设置c20连接的温度、压力和流体组分
-c22.set_attr(T=90)  # 设置c22连接的温度
-
-# key design parameter
-cons.set_attr(Q=-230e3)  # 设置消费者换热器的热量传递率
-
-nw.solve("design")  # 执行设计点计算
-nw.print_results()  # 打印计算结果
-
-# 建立 阀门和蒸发器系统
-from tespy.components import Valve  # 导入Valve类用于阀门组件
-from tespy.components import Drum  # 导入Drum类用于集汽器组件
-from tespy.components import HeatExchanger  # 导入HeatExchanger类用于换热器组件
-
-# 环境源 和 汇
-amb_in = Source("source ambient")  # 创建一个名为“source ambient”的源组件
-amb_out = Sink("sink ambient")  # 创建一个名为“sink ambient”的汇组件
-
-# 蒸发系统
+# 蒸发系统：阀门、集汽器、蒸发器和过热器
 va = Valve("valve")  # 创建一个名为“valve”的阀门组件
 dr = Drum("drum")  # 创建一个名为“drum”的集汽器组件
 ev = HeatExchanger("evaporator")  # 创建一个名为“evaporator”的换热器组件
 su = HeatExchanger("superheater")  # 创建一个名为“superheater”的过热器组件
 
-# 虚拟汇
-cp1 = Sink("compressor 1")  # 创建一个名为“compressor 1”的虚拟汇组件
-
-nw.del_conns(c1)  # 删除之前的c1连接
-
-# 蒸发系统
-c1 = Connection(cd, "out1", va, "in1", label="1")  # 连接“condenser”到“valve”
-c2 = Connection(va, "out1", dr, "in1", label="2")  # 连接“valve”到“drum”
-c3 = Connection(dr, "out1", ev, "in2", label="3")  # 连接“drum”到“evaporator”
-c4 = Connection(ev, "out2", dr, "in2", label="4")  # 连接“evaporator”到“drum”
-c5 = Connection(dr, "out2", su, "in2", label="5")  # 连接“drum”到“superheater”
-c6 = Connection(su, "out2", cp1, "in1", label="6")  # 连接“superheater”到“compressor 1”
-
-nw.add_conns(c1, c2, c3, c4, c5, c6)  # 将新的连接添加到网络中
-
-c17 = Connection(amb_in, "out1", su, "in1", label="17")  # 连接“source ambient”到“superheater”
-c18 = Connection(su, "out1", ev, "in1", label="18")  # 连接“superheater”到“evaporator”
-c19 = Connection(ev, "out1", amb_out, "in1", label="19")  # 连接“evaporator”到“sink ambient”
-
-nw.add_conns(c17, c18, c19)  # 将新的连接添加到网络中
-
-ev.set_attr(pr1=0.99)  # 设置蒸发器的第一出口的压力比
-su.set_attr(pr1=0.99, pr2=0.99)  # 设置过热器的第一和第二出口的压力比
-
-# 蒸发系统冷端
-c4.set_attr(x=0.9, T=5)  # 设置c4连接的质量含汽率和温度
-
-h_sat = PSI("H", "Q", 1, "T", 273.15 + 15, working_fluid) / 1e3  # 计算饱和温度对应的比焓
-c6.set_attr(h=h_sat)  # 设置c6连接的比焓
-
-# 蒸发系统热端
-c17.set_attr(T=15, fluid={"water": 1})  # 设置c17连接的温度和流体组分
-c19.set_attr(T=9, p=1.013)  # 设置c19连接的温度和压力
-
-# 注意：鼓是一个特殊组件，它内置了循环闭合器
-# 因此，尽管我们在技术上在鼓的出口 1 到入口 2 处形成一个循环，但我们在这里不需要包括循环闭合器。
-
-nw.solve("design")  # 执行设计点计算
-nw.print_results()  # 打印计算结果
-
-# 建立 压缩机系统
-from tespy.components import Compressor  # 导入Compressor类用于压缩机组件
-from tespy.components import Splitter  # 导入Splitter类用于分流器组件
-from tespy.components import Merge  # 导入Merge类用于合并器组件
-
+# 压缩机系统：两级压缩和中间冷却
 cp1 = Compressor("compressor 1")  # 创建一个名为“compressor 1”的压缩机组件
 cp2 = Compressor("compressor 2")  # 创建一个名为“compressor 2”的压缩机组件
-
 ic = HeatExchanger("intermittent cooling")  # 创建一个名为“intermittent cooling”的间歇冷却器组件
-hsp = Pump("heat source pump")  # 创建一个名为“heat source pump”的热源泵组件
+cc = CycleCloser("heat pump cycle closer")  # 创建一个名为“heat pump cycle closer”的热泵循环闭合组件
 
+# 热源系统：热源泵、分流器、控制阀和合并器
+hs = Source("ambient intake")  # 创建一个名为“ambient intake”的环境入口源组件
+hsp = Pump("heat source pump")  # 创建一个名为“heat source pump”的热源泵组件
 sp = Splitter("splitter")  # 创建一个名为“splitter”的分流器组件
-me = Merge("merge")  # 创建一个名为“merge”的合并器组件
 cv = Valve("control valve")  # 创建一个名为“control valve”的控制阀组件
+me = Merge("merge")  # 创建一个名为“merge”的合并器组件
+amb_out = Sink("sink ambient")  # 创建一个名为“sink ambient”的汇组件
 
-hs = Source("ambient intake")  # 创建一个名为“ambient intake”的环境入口源组件
-cc = CycleCloser("heat pump cycle closer")  # 创建一个名为“heat pump cycle closer”的热泵循环闭合组件
+from tespy.connections import Connection  # 导入Connection类用于连接组件
 
-nw.del_conns(c0, c6, c17)  # 删除之前的c0、c6和c17连接
+# 消费者系统
+c20 = Connection(cons_closer, "out1", rp, "in1", label="20")  # 连接“consumer cycle closer”到“recirculation pump”
+c21 = Connection(rp, "out1", cd, "in2", label="21")  # 连接“recirculation pump”到“condenser”
+c22 = Connection(cd, "out2", cons, "in1", label="22")  # 连接“condenser”到“consumer”
+c23 = Connection(cons, "out1", cons_closer, "in1", label="23")  # 连接“consumer”到“consumer cycle closer”
 
+# 热泵回路
+c0 = Connection(cc, "out1", cd, "in1", label="0")  # 连接“heat pump cycle closer”到“condenser”
+c1 = Connection(cd, "out1", va, "in1", label="1")  # 连接“condenser”到“valve”
+c2 = Connection(va, "out1", dr, "in1", label="2")  # 连接“valve”到“drum”
+c3 = Connection(dr, "out1", ev, "in2", label="3")  # 连接“drum”到“evaporator”
+c4 = Connection(ev, "out2", dr, "in2", label="4")  # 连接“evaporator”到“drum”
+c5 = Connection(dr, "out2", su, "in2", label="5")  # 连接“drum”到“superheater”
 c6 = Connection(su, "out2", cp1, "in1", label="6")  # 连接“superheater”到“compressor 1”
 c7 = Connection(cp1, "out1", ic, "in1", label="7")  # 连接“compressor 1”到“intermittent cooling”
 c8 = Connection(ic, "out1", cp2, "in1", label="8")  # 连接“intermittent cooling”到“compressor 2”
 c9 = Connection(cp2, "out1", cc, "in1", label="9")  # 连接“compressor 2”到“heat pump cycle closer”
-c0 = Connection(cc, "out1", cd, "in1", label="0")  # 连接“heat pump cycle closer”到“condenser”
 
+# 热源系统
 c11 = Connection(hs, "out1", hsp, "in1", label="11")  # 连接“ambient intake”到“heat source pump”
 c12 = Connection(hsp, "out1", sp, "in1", label="12")  # 连接“heat source pump”到“splitter”
 c13 = Connection(sp, "out1", ic, "in2", label="13")  # 连接“splitter”到“intermittent cooling”
@@ -148,44 +73,64 @@ c14 = Connection(ic, "out2", me, "in1", label="14")  # 连接“intermittent coo
 c15 = Connection(sp, "out2", cv, "in1", label="15")  # 连接“splitter”到“control valve”
 c16 = Connection(cv, "out1", me, "in2", label="16")  # 连接“control valve”到“merge”
 c17 = Connection(me, "out1", su, "in1", label="17")  # 连接“merge”到“superheater”
+c18 = Connection(su, "out1", ev, "in1", label="18")  # 连接“superheater”到“evaporator”
+c19 = Connection(ev, "out1", amb_out, "in1", label="19")  # 连接“evaporator”到“sink ambient”
 
-nw.add_conns(c6, c7, c8, c9, c0, c11, c12, c13, c14, c15, c16, c17)  # 将新的连接添加到网络中
-
-pr = (c1.p.val / c5.p.val) ** 0.5  # 计算压力比
-cp1.set_attr(pr=pr)  # 设置压缩机1的压力比
-ic.set_attr(pr1=0.99, pr2=0.98)  # 设置间歇冷却器的第一和第二出口的压力比
-hsp.set_attr(eta_s=0.75)  # 设置热源泵的等熵效率
-
-c0.set_attr(p=p_cond, fluid={working_fluid: 1})  # 设置c0连接的压力和流体组分
-
-c6.set_attr(h=c5.h.val + 10)  # 设置c6连接的比焓
-c8.set_attr(h=c5.h.val + 10)  # 设置c8连接的比焓
+nw.add_conns(
+    c20, c21, c22, c23, c0, c1, c2, c3, c4, c5, c6, c7, c8, c9,
+    c11, c12, c13, c14, c15, c16, c17, c18, c19
+)  # 将所有连接添加到网络中
 
-c7.set_attr(h=c5.h.val * 1.2)  # 设置c7连接的比焓
-c9.set_attr(h=c5.h.val * 1.2)  # 设置c9连接的比焓
+# 消费者系统
+cd.set_attr(pr1=0.99, pr2=0.99, ttd_u=5)  # 设置冷凝器的压力比和上部温差
+rp.set_attr(eta_s=0.75)  # 设置再循环泵的等熵效率
+cons.set_attr(pr=0.99)  # 设置消费者换热器的压力比
+c20.set_attr(T=60, p=2, fluid={"water": 1})  # 设置c20连接的温度、压力和流体组分
+c22.set_attr(T=90)  # 设置c22连接的温度
 
-c11.set_attr(p=1.013, T=15, fluid={"water": 1})  # 设置c11连接的压力、温度和流体组分
-c14.set_attr(T=30)  # 设置c14连接的温度
+# key design parameter
+cons.set_attr(Q=-230e3)  # 设置消费者换热器的热量传递率
 
-nw.solve("design")  # 执行设计点计算
+# 蒸发系统
+ev.set_attr(pr1=0.99, ttd_l=5)  # 设置蒸发器的第一出口的压力比和下部温差
+su.set_attr(pr1=0.99, pr2=0.99, ttd_u=5)  # 设置过热器的压力比和上部温差
+c4.set_attr(x=0.9)  # 设置c4连接的质量含汽率
+c19.set_attr(T=9, p=1.013)  # 设置c19连接的温度和压力
 
-c0.set_attr(p=None)  # 清除c0连接的压力设定
-cd.set_attr(ttd_u=5)  # 设置冷凝器的上部温差
+# 注意：鼓是一个特殊组件，它内置了循环闭合器
+# 因此，尽管我们在技术上在鼓的出口 1 到入口 2 处形成一个循环，但我们在这里不需要包括循环闭合器。
 
-c4.set_attr(T=None)  # 清除c4连接的温度设定
-ev.set_attr(ttd_l=5)  # 设置蒸发器的下部温差
+# 压缩机系统
+# PropsSI函数可以用来查询各种流体的热力学性质，比如压力、温度、比焓等
+from CoolProp.CoolProp import PropsSI as PSI  # 导入PropsSI函数用于获取流体性质
 
-c6.set_attr(h=None)  # 清除c6连接的比焓设定
-su.set_attr(ttd_u=5)  # 设置过热器的上部温差
+# 冷凝器上部温差 5 K、消费者供水 90 °C，冷凝温度约为 95 °C；
+# 蒸发器下部温差 5 K、热源出口 9 °C，蒸发温度约为 4 °C
+p_cond = PSI("P", "Q", 1, "T", 273.15 + 95, working_fluid)  # 冷凝压力
+p_evap = PSI("P", "Q", 1, "T", 273.15 + 4, working_fluid)  # 蒸发压力
+pr = (p_cond / p_evap) ** 0.5  # 两级压缩的压力比相同
+cp1.set_attr(pr=pr, eta_s=0.8)  # 设置压缩机1的压力比和等熵效率
+cp2.set_attr(eta_s=0.8)  # 设置压缩机2的等熵效率
+ic.set_attr(pr1=0.99, pr2=0.98)  # 设置间歇冷却器的第一和第二出口的压力比
+c0.set_attr(fluid={working_fluid: 1})  # 设置c0连接的流体组分
+c8.set_attr(Td_bp=4)  # 设置c8连接与泡点的温差
 
-c7.set_attr(h=None)  # 清除c7连接的比焓设定
-cp1.set_attr(eta_s=0.8)  # 设置压缩机1的等熵效率
+# 热源系统
+hsp.set_attr(eta_s=0.75)  # 设置热源泵的等熵效率
+c11.set_attr(p=1.013, T=15, fluid={"water": 1})  # 设置c11连接的压力、温度和流体组分
+c14.set_attr(T=30)  # 设置c14连接的温度
 
-c9.set_attr(h=None)  # 清除c9连接的比焓设定
-cp2.set_attr(eta_s=0.8)  # 设置压缩机2的等熵效率
+# %% 多起点初始化
+# 完整的模型从 TESPy 的默认初值出发无法收敛：氨回路的压力没有高低压之分，焓值与压力也不对应。
+# MultiStart 自动生成多组初值（按压力等级估计的启发式初值和随机扰动），
+# 分别进行少量迭代，以第一组收敛且参数合理的结果作为初值完成求解。
+from multistart import MultiStart  # 导入多起点初始化
 
-c8.set_attr(h=None, Td_bp=4)  # 清除c8连接的比焓设定并设置与泡点的温差
-nw.solve("design")  # 再次执行设计点计算
+ms = MultiStart(nw)
+start = ms.solve("design")  # 返回采用的初值名称
+print(ms.attempts)  # 各组初值的收敛情况、迭代次数和求解时间
+print(f"采用的初值: {start}，压缩机1出口温度: {c7.T.val:.1f} °C")
+nw.print_results()  # 打印计算结果
 nw.save("system_design")  # 保存当前的设计点参数
 
 cp1.set_attr(design=["eta_s"], offdesign=["eta_s_char"])  # 设置压缩机1的设计和离设计工况下的特性曲线
@@ -200,7 +145,7 @@ cd.set_attr(
 )  # 设置冷凝器的设计和离设计工况下的阻力系数和传热系数特性曲线
 
 from tespy.tools.characteristics import CharLine  # 导入CharLine类用于特性曲线
-from tespy.tools.characteristics import load_default_char as ldc  # 导入load_default_char函数用于加载默认特性曲线
+from char_registry import load_default_char as ldc  # 导入带缓存的load_default_char函数，默认特性数据只解析一次
 
 kA_char1 = ldc("heat exchanger", "kA_char1", "DEFAULT", CharLine)  # 加载默认的传热系数特性曲线
 kA_char2 = ldc("heat exchanger", "kA_char2", "EVAPORATING FLUID", CharLine)  # 加载蒸发侧的传热系数特性曲线
@@ -245,4 +190,42 @@ for Q in np.linspace(1, 0.6, 5) * cons.Q.val:
 # 在非设计点计算中，所有在design属性中列出的参数将被取消设置（即不再固定这些参数）
 # 在非设计点计算中，所有在offdesign属性中列出的参数将被设置为特定值（即固定这些参数）。
 
-# 如果在规格值没有任何更改的情况下运行非设计模拟，结果必须与相应的设计案例相同！如果它们不相同，很可能是出了些问题。
\ No newline at end of file
+# 如果在规格值没有任何更改的情况下运行非设计模拟，结果必须与相应的设计案例相同！如果它们不相同，很可能是出了些问题。
+
+# %% 部分负荷代理模型
+# 在 热负荷 × 热源温度 的网格上求解完整的离设计模型，再拟合多项式代理模型，
+# 代理模型每秒可计算数百万个工况点，用于调度优化等需要大量计算 COP 的场合。
+from partload_surrogate import run_doe, PolynomialSurrogate  # 导入试验设计和多项式代理模型
+
+
+def cop():
+    return abs(cons.Q.val) / (cp1.P.val + cp2.P.val + hsp.P.val + rp.P.val)  # 系统的性能系数（COP）
+
+
+doe = run_doe(
+    nw,
+    inputs={
+        "Q": (lambda Q: cons.set_attr(Q=Q), np.linspace(0.5, 1.1, 7) * -230e3),  # 消费者热负荷
+        # 热源进口温度，出口温度比进口低 6 K
+        "T_source": (lambda T: (c11.set_attr(T=T), c19.set_attr(T=T - 6)), np.linspace(12, 20, 5)),
+    },
+    outputs={
+        "COP": cop,
+        "P_cp1": lambda: cp1.P.val,  # 压缩机1功率
+        "P_cp2": lambda: cp2.P.val,  # 压缩机2功率
+        "T_cp1": lambda: c7.T.val,  # 压缩机1出口温度
+        "T_cp2": lambda: c9.T.val,  # 压缩机2出口温度
+    },
+    design_path="system_design",
+)  # 未收敛的工况结果为 NaN
+surrogate = PolynomialSurrogate.fit(
+    doe, ["Q", "T_source"], ["COP", "P_cp1", "P_cp2", "T_cp1", "T_cp2"], degree=3
+)  # 拟合三次多项式代理模型
+print("代理模型拟合误差（均方根）:", surrogate.rmse)
+surrogate.to_json("NH3_partload_surrogate.json")  # 保存代理模型
+
+# 代理模型可一次计算大量工况点，例如全年逐时的热负荷和热源温度（固定随机数种子，结果可重复）
+rng = np.random.default_rng(42)
+Q_year = rng.uniform(0.5, 1.1, 8760) * -230e3
+T_year = rng.uniform(12, 20, 8760)
+print("全年平均 COP:", surrogate(Q=Q_year, T_source=T_year)["COP"].mean())
@@ -0,0 +1,174 @@
+# 离设计工况的参数延拓求解
+# GSHP.py 由设计工况直接跳到远离设计点的目标工况
+# （例如地热平均温度由 9.5 °C 降到 6.5 °C，同时降低加热系统温度和冷凝器热量）时，
+# 牛顿法可能发散，只能改用 init_path 重新求解。Continuation 把指定参数由当前值分步移动到目标值：
+#   - 参数按 t ∈ [0, 1] 线性插值，每一步先由最近两个收敛工况线性外推各连接的质量流量、压力和焓值
+#     作为初值（预测），再用 Network.solve 求解（校正）；
+#   - 校正收敛且组件参数在允许范围内时接受这一步，迭代次数少时增大步长；
+#     否则恢复上一个收敛工况，步长减半后重新尝试；步长小于 min_step 时由最后一个收敛工况
+#     重新求解网络并停止；
+#   - steps 记录每一步的 t、步长、是否接受和迭代次数，stats 汇总步数和总迭代次数。
+
+import time
+
+import pandas as pd
+from tespy.tools.helpers import TESPyNetworkError
+
+from multistart import apply_state
+from multistart import parameters_within_bounds
+
+# Continuation.steps 的列：参数位置、步长、是否接受、迭代次数、求解时间
+_COLUMNS = ['t', 'step', 'accepted', 'iterations', 'time']
+
+
+class Continuation:
+    r"""
+    由当前工况出发，分步把参数移动到目标值并求解网络。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        已在起点工况收敛的网络。
+
+    setters : dict
+        参数名称到设定函数的映射，例如 :code:`{'Tgeo': set_Tgeo}`，设定函数接收一个参数值。
+
+    mode, design_path
+        与 Network.solve 相同。
+
+    step : float
+        初始步长（t 的增量，t = 1 为目标值），默认先直接求解目标工况。
+
+    min_step : float
+        最小步长，步长减半后小于该值时停止。
+
+    max_iter : int
+        每一步校正的最大迭代次数。
+
+    fast_iter : int
+        校正迭代次数不超过该值时，下一步的步长加倍。
+
+    Note
+    ----
+    :code:`cont.steps` 记录每一步（包括被拒绝的步）的求解情况，:code:`cont.stats` 汇总
+    'steps'（接受的步数）、'rejected'（被拒绝的步数）和 'iterations'（总迭代次数）。
+    """
+
+    def __init__(self, nw, setters, mode='offdesign', design_path=None,
+                 step=1.0, min_step=1 / 64, max_iter=20, fast_iter=6):
+        self.nw = nw
+        self.setters = setters
+        self.mode = mode
+        self.design_path = design_path
+        self.step = step
+        self.min_step = min_step
+        self.max_iter = max_iter
+        self.fast_iter = fast_iter
+        self.steps = pd.DataFrame(columns=_COLUMNS)
+        self.stats = dict.fromkeys(['steps', 'rejected', 'iterations'], 0)
+
+    def solve(self, start, target):
+        r"""
+        由起点参数延拓求解到目标参数。
+
+        Parameters
+        ----------
+        start : dict
+            参数名称到起点值的映射，网络应已在该工况收敛。
+
+        target : dict
+            参数名称到目标值的映射。
+
+        Returns
+        -------
+        converged : bool
+            是否到达目标值。未到达时恢复最后一个收敛工况的参数，并以该工况的结果为初值
+            重新求解，网络中连接的数值和结果表都恢复为该工况（重新求解的迭代次数计入 stats）。
+        """
+        rows = []
+        self.stats = dict.fromkeys(['steps', 'rejected', 'iterations'], 0)
+        # 最近两个收敛工况 (t, 状态)，用于线性外推
+        history = [(0.0, _state(self.nw))]
+        t = 0.0
+        step = self.step
+        iterinfo = self.nw.iterinfo
+        self.nw.set_attr(iterinfo=False)
+        try:
+            while t < 1:
+                step = min(step, 1 - t)
+                t_new = t + step
+                self._set(start, target, t_new)
+                apply_state(self.nw, _predict(history, t_new))
+                tic = time.perf_counter()
+                converged, iterations = self._correct()
+                rows += [[t_new, step, converged, iterations,
+                          time.perf_counter() - tic]]
+                self.stats['iterations'] += iterations
+
+                if converged:
+                    self.stats['steps'] += 1
+                    history = history[-1:] + [(t_new, _state(self.nw))]
+                    t = t_new
+                    if iterations <= self.fast_iter:
+                        step *= 2
+                    continue
+
+                self.stats['rejected'] += 1
+                step /= 2
+                if step < self.min_step:
+                    # 恢复最后一个收敛工况：以其结果为初值重新求解，覆盖失败的校正结果
+                    self._set(start, target, t)
+                    apply_state(self.nw, history[-1][1])
+                    _, iterations = self._correct()
+                    self.stats['iterations'] += iterations
+                    return False
+            return True
+        finally:
+            self.nw.set_attr(iterinfo=iterinfo)
+            self.steps = pd.DataFrame(rows, columns=_COLUMNS)
+
+    def _set(self, start, target, t):
+        """设定 t 处的参数值。"""
+        for name, setter in self.setters.items():
+            setter(start[name] + t * (target[name] - start[name]))
+
+    def _correct(self):
+        """由预测的初值求解，返回 (是否收敛且参数合理, 迭代次数)。"""
+        try:
+            self.nw.solve(
+                self.mode, design_path=self.design_path, max_iter=self.max_iter
+            )
+        except (ValueError, TESPyNetworkError):
+            self.nw.reset_topology_reduction_specifications()
+            return False, self.nw.iter + 1
+        converged = bool(self.nw.converged) and parameters_within_bounds(self.nw)
+        return converged, self.nw.iter + 1
+
+
+def _state(nw):
+    """各连接的质量流量、压力、焓值（SI 单位）和组分。"""
+    return {
+        c.label: {
+            'm': c.m.val_SI, 'p': c.p.val_SI, 'h': c.h.val_SI,
+            'fluid': c.fluid.val.copy()
+        } for c in nw.conns['object']
+    }
+
+
+def _predict(history, t):
+    """由最近两个收敛工况线性外推 t 处的状态，只有一个工况时直接使用它。"""
+    t1, last = history[-1]
+    if len(history) == 1:
+        return last
+    t0, previous = history[0]
+    factor = (t - t1) / (t1 - t0)
+    state = {}
+    for label, values in last.items():
+        state[label] = {
+            key: values[key] + factor * (values[key] - previous[label][key])
+            for key in ['m', 'p', 'h']
+        }
+        # 压力外推后不能为负
+        state[label]['p'] = max(state[label]['p'], values['p'] * 0.5)
+        state[label]['fluid'] = values['fluid']
+    return state
@@ -0,0 +1,218 @@
+# 按调度时间序列驱动离设计模型的联合仿真
+# 例如以 15 分钟分辨率给定全年（35040 步）电解槽功率设定值，逐步求解离设计工况：
+#   - 热启动：每一步以上一个收敛工况的结果作为初值，未收敛时恢复到上一个收敛工况；
+#   - 关闭迭代信息和警告输出；
+#   - 结果按块追加写入 CSV 文件，不在内存中保存全年结果；
+#   - 可选的插值表：设定值落在两个已求解工况之间（区间宽度不超过 max_gap）时直接线性插值，
+#     不再求解网络；插值表可以预先在网格上计算，也会记录运行中求解过的工况。
+
+import logging
+import os
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+from tespy.tools.helpers import TESPyNetworkError
+from tespy.tools.logger import logger
+
+from partload_surrogate import restore_state
+from partload_surrogate import save_state
+
+
+class SetpointTable:
+    """已求解工况的插值表。
+
+    Parameters
+    ----------
+    outputs : list
+        输出名称。
+
+    max_gap : float
+        允许插值的最大区间宽度（与设定值单位相同）。
+    """
+
+    def __init__(self, outputs, max_gap):
+        self.outputs = list(outputs)
+        self.max_gap = max_gap
+        self.x = []
+        self.y = []
+
+    def add(self, x, values):
+        """记录一个已求解的工况，values 为各输出的值。"""
+        pos = bisect_left(self.x, x)
+        if pos < len(self.x) and self.x[pos] == x:
+            self.y[pos] = values
+        else:
+            self.x.insert(pos, x)
+            self.y.insert(pos, values)
+
+    def lookup(self, x):
+        """设定值落在允许插值的区间内时返回各输出的插值，否则返回 None。"""
+        pos = bisect_left(self.x, x)
+        if pos < len(self.x) and self.x[pos] == x:
+            return list(self.y[pos])
+        if pos == 0 or pos == len(self.x):
+            return None
+        x0, x1 = self.x[pos - 1], self.x[pos]
+        if x1 - x0 > self.max_gap:
+            return None
+        frac = (x - x0) / (x1 - x0)
+        y0, y1 = self.y[pos - 1], self.y[pos]
+        return [a + frac * (b - a) for a, b in zip(y0, y1)]
+
+
+class DispatchCoSimulation:
+    """按设定值时间序列逐步求解离设计工况。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        已完成设计计算的网络。
+
+    setpoint : callable
+        接收一个设定值并修改网络参数的函数，例如 :code:`lambda P: el.set_attr(P=P)`。
+
+    outputs : dict
+        输出名称到函数的映射，函数在求解后调用并返回一个数值。
+
+    design_path : str
+        设计工况文件路径。
+
+    max_gap : float
+        插值表允许插值的最大区间宽度，为 None 时不使用插值表。
+
+    off_below : float
+        小于该值的设定值视为停机，不求解网络，输出为 NaN（可选）。
+    """
+
+    def __init__(self, nw, setpoint, outputs, design_path, max_gap=None,
+                 off_below=None):
+        self.nw = nw
+        self.setpoint = setpoint
+        self.outputs = outputs
+        self.design_path = design_path
+        self.off_below = off_below
+        self.table = None
+        if max_gap is not None:
+            self.table = SetpointTable(outputs, max_gap)
+        self._state = None
+
+    def solve(self, x):
+        """求解单个设定值，返回 (各输出的值, 是否收敛)。"""
+        self.setpoint(x)
+        try:
+            self.nw.solve("offdesign", design_path=self.design_path)
+            converged = self.nw.converged
+        except (ValueError, ZeroDivisionError, TESPyNetworkError):
+            # 求解中断时 TESPy 不会撤销拓扑简化，需要手动恢复
+            self.nw.reset_topology_reduction_specifications()
+            converged = False
+
+        if converged:
+            self._state = save_state(self.nw)
+            values = [func() for func in self.outputs.values()]
+            if self.table is not None:
+                self.table.add(x, values)
+            return values, True
+
+        if self._state is not None:
+            restore_state(self._state)
+        return [np.nan] * len(self.outputs), False
+
+    def precompute(self, grid):
+        """在设定值网格上求解并填充插值表。
+
+        Parameters
+        ----------
+        grid : ndarray
+            设定值网格，相邻值的间距应不超过 max_gap。
+
+        Returns
+        -------
+        converged : int
+            收敛的工况数。
+        """
+        if self.table is None:
+            msg = "使用插值表需要在创建 DispatchCoSimulation 时指定 max_gap。"
+            raise ValueError(msg)
+        with _quiet(self.nw):
+            return sum(self.solve(x)[1] for x in grid)
+
+    def run(self, profile, path, chunk=1000):
+        """按设定值时间序列运行联合仿真，结果按块写入 CSV 文件。
+
+        Parameters
+        ----------
+        profile : pandas.Series
+            设定值时间序列，索引为时间。
+
+        path : str
+            结果文件路径，已存在时覆盖。
+
+        chunk : int
+            每次写入的行数。
+
+        Returns
+        -------
+        summary : dict
+            各状态的步数：'solved'（求解网络）、'table'（插值表）、
+            'repeat'（与上一步设定值相同）、'off'（停机）、'failed'（未收敛）。
+        """
+        if os.path.isfile(path):
+            os.remove(path)
+
+        columns = ["time", "setpoint", "status"] + list(self.outputs)
+        summary = dict.fromkeys(["solved", "table", "repeat", "off", "failed"], 0)
+        rows = []
+        last = None
+        with _quiet(self.nw):
+            for time, x in profile.items():
+                x = float(x)
+                if last is not None and x == last[0]:
+                    values, status = last[1], "repeat"
+                elif self.off_below is not None and x < self.off_below:
+                    values, status = [np.nan] * len(self.outputs), "off"
+                else:
+                    values = None
+                    if self.table is not None:
+                        values = self.table.lookup(x)
+                    if values is not None:
+                        status = "table"
+                    else:
+                        values, converged = self.solve(x)
+                        status = "solved" if converged else "failed"
+
+                summary[status] += 1
+                last = (x, values)
+                rows.append([time, x, status] + list(values))
+                if len(rows) >= chunk:
+                    _append(path, rows, columns)
+                    rows = []
+
+        if rows:
+            _append(path, rows, columns)
+        return summary
+
+
+def _append(path, rows, columns):
+    """把一块结果追加写入 CSV 文件，文件不存在时写入表头。"""
+    pd.DataFrame(rows, columns=columns).to_csv(
+        path, mode="a", header=not os.path.isfile(path), index=False
+    )
+
+
+class _quiet:
+    """在联合仿真期间关闭迭代信息和 TESPy 的警告输出。"""
+
+    def __init__(self, nw):
+        self.nw = nw
+
+    def __enter__(self):
+        self._iterinfo = self.nw.iterinfo
+        self._level = logger.level
+        self.nw.set_attr(iterinfo=False)
+        logger.setLevel(logging.ERROR)
+
+    def __exit__(self, *args):
+        self.nw.set_attr(iterinfo=self._iterinfo)
+        logger.setLevel(self._level)
@@ -0,0 +1,218 @@
+# 增量式㶲桑基图
+# ean.generate_plotly_sankey_input() 每次调用都会重新构建完整的 links/nodes 结构。
+# ExergySankey 只根据网络的组件分组构建一次拓扑（节点顺序、连线的起点/终点/颜色），
+# 之后每个工况只从最新的 ExergyAnalysis 结果中刷新连线数值数组，
+# 并可输出紧凑的 JSON 供网页前端使用。
+
+import json
+
+import numpy as np
+
+# 与 TESPy 默认配色一致
+COLORS = {
+    "E_F": "rgba(242, 142, 43, 0.90)",
+    "E_P": "rgba(118, 183, 178, 0.90)",
+    "E_D": "rgba(176, 122, 161, 0.90)",
+    "E_L": "rgba(156, 117, 95, 0.90)",
+    "combustion-gas": "rgba(237, 201, 72, 0.90)",
+    "non-combustion-gas": "rgba(186, 176, 172, 0.90)",
+    "two-phase-fluid": "rgba(89, 161, 79, 0.90)",
+    "incompressible": "rgba(255, 157, 167, 0.90)",
+    "work": "rgba(78, 121, 167, 0.90)",
+    "heat": "rgba(225, 87, 89, 0.90)",
+}
+NAN_COLOR = "rgba(100, 100, 100, 1.00)"
+
+
+class ExergySankey:
+    """只构建一次拓扑、之后只刷新数值的㶲桑基图数据。
+
+    Parameters
+    ----------
+    ean : tespy.tools.analyses.ExergyAnalysis
+        已调用过 analyse() 的㶲分析对象。
+
+    node_order : list
+        节点顺序（可选），默认与 generate_plotly_sankey_input 相同。
+
+    colors : dict
+        各流股类型的颜色（可选），覆盖默认配色。
+
+    display_threshold : float
+        构建拓扑时忽略的最小流股（W），默认为 1e-3。
+
+    Note
+    ----
+    与 generate_plotly_sankey_input 一样，低于显示阈值的流股被忽略，只有一个
+    输入和一个输出的组件分组会被合并到上游分组中；每个流股只为不为 0 的㶲类别
+    建立连线（例如没有化学㶲时不建立化学㶲连线）。拓扑确定后不再删除连线，
+    之后变为 0 的连线保留在数组中，使得各工况的连线顺序保持一致。若新的分析结果
+    中出现了拓扑中没有、高于阈值且不为 0 的数值，拓扑会自动重建，重建次数记录在
+    rebuilds 中。
+    """
+
+    def __init__(self, ean, node_order=None, colors=None,
+                 display_threshold=1e-3):
+        self.ean = ean
+        self.display_threshold = display_threshold
+        self.colors = dict(COLORS)
+        self.colors.update(colors or {})
+        self._node_order = node_order
+        self.rebuilds = 0
+        self.build()
+        self.refresh()
+
+    def build(self):
+        """由 ean.sankey_data 构建桑基图拓扑。"""
+        ean = self.ean
+        cols = ean.exergy_cats
+        # 分组 -> {(行标签, 列序号)}：高于显示阈值的流股中不为 0 的数值
+        self._known = {
+            fkt_group: self._visible_cells(data)
+            for fkt_group, data in ean.sankey_data.items()
+        }
+        # 分组 -> {(目标分组, 类别): [来源 (分组, (目标分组, 类别))]}
+        groups = {
+            fkt_group: {
+                target: [(fkt_group, target)]
+                for target in dict.fromkeys(idx for idx, _ in cells)
+            }
+            for fkt_group, cells in self._known.items()
+        }
+        self._remove_transit_groups(groups)
+
+        if self._node_order is None:
+            self.nodes = (
+                ["E_F"] + [b.label for b in ean.E_F]
+                + [fkt_group for fkt_group in ean.group_data.index]
+                + [b.label for b in ean.internal_busses + ean.E_P + ean.E_L]
+                + ["E_P", "E_L", "E_D"]
+            )
+        else:
+            self.nodes = list(self._node_order)
+
+        source, target, color, contributions = [], [], [], []
+        for fkt_group, targets in groups.items():
+            source_id = self.nodes.index(fkt_group)
+            for (target_group, category), origins in targets.items():
+                # 只为来源流股中不为 0 的㶲类别（化学㶲、物理㶲、无质量流的㶲）建立连线
+                for col in range(len(cols)):
+                    if not any(
+                            (idx, col) in self._known[group]
+                            for group, idx in origins):
+                        continue
+                    source.append(source_id)
+                    target.append(self.nodes.index(target_group))
+                    color.append(self.colors.get(category, NAN_COLOR))
+                    contributions.append(
+                        [(group, idx, col) for group, idx in origins]
+                    )
+
+        self.source = np.array(source, dtype=int)
+        self.target = np.array(target, dtype=int)
+        self.color = color
+        self.value = np.zeros(len(source))
+
+        # 每个分组的 (行标签, 列序号, 连线序号)，刷新时按分组整体取值
+        self._lookup = {}
+        for link, origins in enumerate(contributions):
+            for group, idx, col in origins:
+                self._lookup.setdefault(group, ([], [], []))
+                self._lookup[group][0].append(idx)
+                self._lookup[group][1].append(col)
+                self._lookup[group][2].append(link)
+        self._lookup = {
+            group: (rows, np.array(cols_, dtype=int), np.array(links, dtype=int))
+            for group, (rows, cols_, links) in self._lookup.items()
+        }
+
+    def _visible_cells(self, data, values=None):
+        """返回高于显示阈值的流股中不为 0 的数值位置 {(行标签, 列序号)}。"""
+        if values is None:
+            values = data.loc[:, self.ean.exergy_cats].to_numpy(dtype=float)
+        visible = np.abs(values).sum(axis=1) >= self.display_threshold
+        rows, cols = np.nonzero(visible[:, None] & (values != 0))
+        return {(data.index[row], col) for row, col in zip(rows, cols)}
+
+    def _remove_transit_groups(self, groups):
+        """合并只有一个输入和一个输出目标的组件分组（与 TESPy 的处理相同）。"""
+        reserved = self.ean.reserved_fkt_groups
+        removed = True
+        while removed:
+            removed = False
+            for fkt_group in list(groups):
+                if fkt_group in reserved:
+                    continue
+                inputs = [
+                    other for other, targets in groups.items()
+                    if other != fkt_group
+                    and fkt_group in {t[0] for t in targets}
+                ]
+                outputs = {t[0] for t in groups[fkt_group]}
+                if len(inputs) == 1 and len(outputs) == 1:
+                    upstream = groups[inputs[0]]
+                    for target, origins in groups[fkt_group].items():
+                        upstream.setdefault(target, [])
+                        upstream[target] = upstream[target] + origins
+                    for target in [t for t in upstream if t[0] == fkt_group]:
+                        del upstream[target]
+                    del groups[fkt_group]
+                    removed = True
+                    break
+                elif len(inputs) == 0 and len(groups[fkt_group]) == 0:
+                    del groups[fkt_group]
+
+    def refresh(self):
+        """从最新的㶲分析结果刷新连线数值。
+
+        Returns
+        -------
+        value : ndarray
+            各连线的数值（W），负值按 0 处理。
+        """
+        cols = self.ean.exergy_cats
+        values = {
+            group: data.loc[:, cols].to_numpy(dtype=float)
+            for group, data in self.ean.sankey_data.items()
+        }
+        if any(
+                not self._visible_cells(data, values[group])
+                <= self._known.get(group, set())
+                for group, data in self.ean.sankey_data.items()):
+            self.rebuilds += 1
+            self.build()
+
+        value = np.zeros(len(self.source))
+        for group, (rows, col, link) in self._lookup.items():
+            pos = self.ean.sankey_data[group].index.get_indexer(rows)
+            found = pos >= 0
+            np.add.at(
+                value, link[found], values[group][pos[found], col[found]]
+            )
+
+        self.value = np.clip(value, 0, None)
+        return self.value
+
+    def links(self):
+        """返回 plotly Sankey 的 link 字典，与 generate_plotly_sankey_input 的格式相同。"""
+        return {
+            "source": self.source.tolist(),
+            "target": self.target.tolist(),
+            "value": self.value.tolist(),
+            "color": self.color,
+        }
+
+    def topology_json(self):
+        """返回拓扑的紧凑 JSON（节点、起点、终点、颜色），前端只需加载一次。"""
+        return json.dumps({
+            "nodes": self.nodes,
+            "source": self.source.tolist(),
+            "target": self.target.tolist(),
+            "color": self.color,
+        }, separators=(",", ":"), ensure_ascii=False)
+
+    def values_json(self, decimals=1):
+        """返回当前连线数值的紧凑 JSON 数组（单位 W）。"""
+        return json.dumps(
+            np.round(self.value, decimals).tolist(), separators=(",", ":")
+        )
@@ -0,0 +1,107 @@
+# 㶲损（E_D）瀑布图数据的向量化计算
+# GSHP.py 中对 ean.component_data.index 逐行循环，依次从 E_F 中减去各组件的 E_D 得到 E_P。
+# 这里对多个工况堆叠在一起的 component_data 用 NumPy 分组累加一次算出全部瀑布数据，
+# 并写入同一个列式文件，而不是每个工况一个 NH3_E_D.csv。
+
+import numpy as np
+import pandas as pd
+
+
+def stack_component_data(cases):
+    """把多个工况的 ean.component_data 堆叠成一张表。
+
+    Parameters
+    ----------
+    cases : dict
+        工况标签到 component_data（DataFrame，索引为组件标签）的映射。
+
+    Returns
+    -------
+    stacked : pandas.DataFrame
+        以 (case, component) 为多级索引的表。
+    """
+    return pd.concat(cases, names=["case", "component"])
+
+
+def waterfalls(stacked, E_F, threshold=1):
+    """计算所有工况的 E_F/E_D/E_P 瀑布数据。
+
+    Parameters
+    ----------
+    stacked : pandas.DataFrame
+        以 (case, component) 为多级索引、包含 'E_D' 列的表。
+
+    E_F : pandas.Series, dict
+        各工况的燃料㶲 ean.network_data.E_F，以工况标签为索引。
+
+    threshold : float
+        只保留 E_D 大于该值（W）的组件，默认为 1 W。
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        长表，每个工况依次为 'E_F'、各组件、'E_P' 三类行，
+        列为 case、step、component、E_D、E_P。
+    """
+    E_D = stacked["E_D"]
+    E_D = E_D[E_D > threshold]
+    cases = E_D.index.get_level_values("case")
+    components = E_D.index.get_level_values("component")
+    values = E_D.to_numpy(dtype=float)
+
+    # 保持工况出现顺序，同一工况的行连续排列
+    case_labels = pd.unique(stacked.index.get_level_values("case"))
+    codes = pd.Index(case_labels).get_indexer(cases)
+    order = np.argsort(codes, kind="stable")
+    codes, values = codes[order], values[order]
+    components = np.asarray(components)[order]
+
+    # 分组累加：全局累加后减去每组起点之前的累加值
+    n = len(case_labels)
+    counts = np.bincount(codes, minlength=n)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    total = np.concatenate([[0.], np.cumsum(values)])
+    destroyed = total[1:] - np.repeat(total[starts], counts)
+    fuel = pd.Series(E_F).reindex(case_labels).to_numpy(dtype=float)
+
+    # 每个工况在组件行前后加上 E_F 和 E_P 行
+    rows = len(values) + 2 * n
+    group_start = starts + 2 * np.arange(n)
+    comp_pos = np.arange(len(values)) + 2 * codes + 1
+    end_pos = group_start + counts + 1
+
+    component = np.empty(rows, dtype=object)
+    component[group_start] = "E_F"
+    component[comp_pos] = components
+    component[end_pos] = "E_P"
+    E_D_col = np.zeros(rows)
+    E_D_col[comp_pos] = values
+    E_P_col = np.empty(rows)
+    E_P_col[group_start] = fuel
+    E_P_col[comp_pos] = fuel[codes] - destroyed
+    E_P_col[end_pos] = fuel - (total[starts + counts] - total[starts])
+
+    return pd.DataFrame({
+        "case": np.repeat(case_labels, counts + 2),
+        "step": np.arange(rows) - np.repeat(group_start, counts + 2),
+        "component": component,
+        "E_D": E_D_col,
+        "E_P": E_P_col,
+    })
+
+
+def waterfall_table(df, case):
+    """把单个工况的瀑布数据转换为 GSHP.py 中 df_comps 的格式（行 E_D/E_P，列为组件）。"""
+    data = df[df["case"] == case]
+    return pd.DataFrame(
+        [data["E_D"].to_numpy(), data["E_P"].to_numpy()],
+        index=["E_D", "E_P"], columns=data["component"].tolist()
+    )
+
+
+def save_waterfalls(df, path):
+    """把所有工况的瀑布数据写入一个文件，.parquet 后缀写 Parquet，否则写 CSV。"""
+    if str(path).endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
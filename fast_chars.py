@@ -0,0 +1,359 @@
+# 预先计算线段斜率的特性曲线
+# TESPy 的 CharLine 每次调用 evaluate 都要重新计算插值分数，且只接受标量。
+# FastCharLine 继承 CharLine，可以直接用于 Bus 的 'char' 和组件的 kA_char1/kA_char2 等参数，
+# 构造时预先计算各线段斜率，evaluate 和 get_der 同时支持标量和数组输入。
+# CharLineStack 把多条特性曲线拼接在一起，一次调用即可计算多个组件的特性函数值。
+# FastCharMap 继承 CharMap，可以直接用于压缩机的 char_map_eta_s/char_map_pr 参数，
+# 构造时预先计算各转速线之间的插值斜率；特性图的导数仍由 TESPy 数值差分计算。
+
+from bisect import bisect_left
+
+import numpy as np
+from tespy.tools.characteristics import CharLine
+from tespy.tools.characteristics import CharMap
+from tespy.tools.logger import logger
+
+
+class FastCharLine(CharLine):
+    r"""
+    预先计算线段斜率的特性曲线，插值和外推规则与 CharLine 相同。
+
+    Parameters
+    ----------
+    x : ndarray
+        特性曲线的 x 值（递增）。
+
+    y : ndarray
+        对应的 y 值。
+
+    extrapolate : boolean
+        为 :code:`True` 时超出范围的 x 按首/末线段线性外推，
+        否则取边界上的 y 值。
+    """
+
+    def __init__(self, x=np.array([0, 1]), y=np.ones((2)), extrapolate=False):
+        super().__init__(x=x, y=y, extrapolate=extrapolate)
+        self._prepare()
+
+    @classmethod
+    def from_char(cls, char):
+        """由已有的 CharLine（例如 load_default_char 的结果）创建 FastCharLine。"""
+        return cls(x=char.x, y=char.y, extrapolate=char.extrapolate)
+
+    def __setattr__(self, key, value):
+        super().__setattr__(key, value)
+        # x 或 y 被替换时重新计算斜率
+        if key in ("x", "y") and "_slope" in self.__dict__:
+            self._prepare()
+
+    def _prepare(self):
+        """预先计算各线段的斜率以及标量查找用的列表。"""
+        x = np.asarray(self.x, dtype=float)
+        y = np.asarray(self.y, dtype=float)
+        if len(x) < 2:
+            msg = "FastCharLine 至少需要两个点。"
+            raise ValueError(msg)
+        slope = np.diff(y) / np.diff(x)
+        self.__dict__["_slope"] = slope
+        self.__dict__["_xl"] = x.tolist()
+        self.__dict__["_yl"] = y.tolist()
+        self.__dict__["_sl"] = slope.tolist()
+
+    def _segment(self, x):
+        """返回数组 x 所在线段的序号以及是否超出下/上边界。"""
+        n = len(self._xl)
+        xpos = np.searchsorted(self.x, x)
+        below = xpos == 0
+        above = xpos == n
+        seg = np.clip(xpos, 1, n - 1) - 1
+        return seg, below, above
+
+    def evaluate(self, x):
+        r"""
+        计算特性曲线在 x 处的值。
+
+        Parameters
+        ----------
+        x : float, ndarray
+            输入值，可以是标量或数组。
+
+        Returns
+        -------
+        y : float, ndarray
+            标量输入返回 float，数组输入返回相同形状的 ndarray。
+        """
+        if np.ndim(x) == 0:
+            xl = self._xl
+            xpos = bisect_left(xl, x)
+            if xpos == len(xl):
+                if not self.extrapolate:
+                    return self._yl[-1]
+                xpos -= 1
+            elif xpos == 0:
+                if not self.extrapolate:
+                    return self._yl[0]
+                xpos = 1
+            return self._yl[xpos - 1] + (x - xl[xpos - 1]) * self._sl[xpos - 1]
+
+        x = np.asarray(x, dtype=float)
+        seg, below, above = self._segment(x)
+        y = self.y[seg] + (x - self.x[seg]) * self._slope[seg]
+        if not self.extrapolate:
+            y = np.where(below, self.y[0], np.where(above, self.y[-1], y))
+        return y
+
+    def get_der(self, x):
+        r"""
+        计算特性曲线在 x 处对 x 的导数。
+
+        Parameters
+        ----------
+        x : float, ndarray
+            输入值，可以是标量或数组。
+
+        Returns
+        -------
+        dydx : float, ndarray
+            所在线段的斜率，不外推时超出范围的导数为 0。
+        """
+        if np.ndim(x) == 0:
+            xpos = bisect_left(self._xl, x)
+            if xpos == len(self._xl):
+                return self._sl[-1] if self.extrapolate else 0.0
+            elif xpos == 0:
+                return self._sl[0] if self.extrapolate else 0.0
+            return self._sl[xpos - 1]
+
+        x = np.asarray(x, dtype=float)
+        seg, below, above = self._segment(x)
+        dydx = self._slope[seg]
+        if not self.extrapolate:
+            dydx = np.where(below | above, 0.0, dydx)
+        return dydx
+
+
+class CharLineStack:
+    """多条特性曲线的拼接，一次调用计算所有曲线。
+
+    各曲线的 x、y 按最长曲线补齐成二维数组（补齐位置 x 为 +inf），
+    第 k 个输入值使用第 line[k] 条曲线计算。
+
+    Parameters
+    ----------
+    chars : list
+        CharLine 或 FastCharLine 对象列表。
+    """
+
+    def __init__(self, chars):
+        self.chars = list(chars)
+        n = max(len(c.x) for c in self.chars)
+        m = len(self.chars)
+        self.x = np.full((m, n), np.inf)
+        self.y = np.zeros((m, n))
+        self.slope = np.zeros((m, n - 1))
+        self.length = np.array([len(c.x) for c in self.chars])
+        self.extrapolate = np.array([c.extrapolate for c in self.chars])
+        for i, c in enumerate(self.chars):
+            k = len(c.x)
+            self.x[i, :k] = c.x
+            self.y[i, :k] = c.y
+            self.y[i, k:] = c.y[-1]
+            self.slope[i, :k - 1] = np.diff(c.y) / np.diff(c.x)
+
+    def _segment(self, x, line):
+        x = np.asarray(x, dtype=float)
+        if line is None:
+            line = np.arange(len(self.chars))
+        line = np.asarray(line, dtype=int)
+        n = self.length[line]
+        # 与 np.searchsorted(side='left') 等价的逐行查找
+        xpos = (self.x[line] < x[..., None]).sum(axis=-1)
+        below = xpos == 0
+        above = xpos == n
+        seg = np.clip(xpos, 1, n - 1) - 1
+        return x, line, n, seg, below, above
+
+    def evaluate(self, x, line=None):
+        """计算各特性曲线的值。
+
+        Parameters
+        ----------
+        x : ndarray
+            输入值数组。
+
+        line : ndarray
+            每个输入值所用曲线的序号，默认第 k 个值对应第 k 条曲线。
+
+        Returns
+        -------
+        y : ndarray
+            特性函数值。
+        """
+        x, line, n, seg, below, above = self._segment(x, line)
+        y = self.y[line, seg] + (x - self.x[line, seg]) * self.slope[line, seg]
+        clip = ~self.extrapolate[line]
+        y = np.where(clip & below, self.y[line, 0], y)
+        return np.where(clip & above, self.y[line, n - 1], y)
+
+    def get_der(self, x, line=None):
+        """计算各特性曲线对 x 的导数，参数与 evaluate 相同。"""
+        x, line, n, seg, below, above = self._segment(x, line)
+        dydx = self.slope[line, seg]
+        return np.where(~self.extrapolate[line] & (below | above), 0.0, dydx)
+
+
+class FastCharMap(CharMap):
+    r"""
+    预先计算插值斜率的特性图，插值规则与 CharMap 相同。
+
+    Parameters
+    ----------
+    x : ndarray
+        第一维输入（转速线序号 X）。
+
+    y : ndarray
+        第二维输入的二维数组，每行对应一个 x 值。
+
+    z : ndarray
+        输出的二维数组，形状与 y 相同。
+
+    Note
+    ----
+    CharMap.evaluate_x 和 get_domain_errors_x 在超出 x 范围时直接返回 self.y/self.z 的某一行，
+    压缩机随后用 igva 原地缩放该数组，会改写特性图本身。
+    FastCharMap 的这两个方法总是返回新数组，不存在这个问题。
+    """
+
+    def __init__(self, x=np.array([0, 1]), y=np.ones((2, 2)),
+                 z=np.ones((2, 2))):
+        super().__init__(x=x, y=y, z=z)
+        self._prepare()
+
+    @classmethod
+    def from_char(cls, char):
+        """由已有的 CharMap（例如 load_default_char 的结果）创建 FastCharMap。"""
+        return cls(x=char.x, y=char.y, z=char.z)
+
+    def __setattr__(self, key, value):
+        super().__setattr__(key, value)
+        # x、y 或 z 被替换时重新计算斜率
+        if key in ("x", "y", "z") and "_dy" in self.__dict__:
+            self._prepare()
+
+    def _prepare(self):
+        """预先计算相邻转速线之间 y、z 对 x 的斜率。"""
+        if len(self.x) < 2:
+            msg = "FastCharMap 至少需要两条转速线。"
+            raise ValueError(msg)
+        dx = np.diff(self.x)[:, None]
+        self.__dict__["_dy"] = np.diff(self.y, axis=0) / dx
+        self.__dict__["_dz"] = np.diff(self.z, axis=0) / dx
+        self.__dict__["_xl"] = self.x.tolist()
+
+    def _row(self, x):
+        """返回 x 所在区间的下边界序号以及到下边界的距离（超出范围时为 None）。"""
+        xl = self._xl
+        xpos = bisect_left(xl, x)
+        if xpos == len(xl):
+            return xpos - 1, None
+        elif xpos == 0:
+            return 0, None
+        return xpos - 1, x - xl[xpos - 1]
+
+    def evaluate_x(self, x):
+        r"""
+        计算第一维输入 x 对应的 y、z 数组。
+
+        Parameters
+        ----------
+        x : float
+            第一维输入。
+
+        Returns
+        -------
+        yarr : ndarray
+            第二维输入数组（新数组，可以原地修改）。
+
+        zarr : ndarray
+            输出数组（新数组，可以原地修改）。
+        """
+        k, dx = self._row(x)
+        if dx is None:
+            return self.y[k].copy(), self.z[k].copy()
+        return self.y[k] + dx * self._dy[k], self.z[k] + dx * self._dz[k]
+
+    def get_domain_errors_x(self, x, c):
+        r"""
+        超出 x 范围时给出警告（与 CharMap 相同），并返回 x 对应的 y 数组。
+
+        Parameters
+        ----------
+        x : float
+            第一维输入。
+
+        c : str
+            使用该特性图的组件标签。
+
+        Returns
+        -------
+        yarr : ndarray
+            第二维输入数组（新数组，可以原地修改）。
+        """
+        k, dx = self._row(x)
+        if dx is not None:
+            return self.y[k] + dx * self._dy[k]
+
+        if x > self._xl[-1]:
+            msg = ('Operating point above CharMap range: '
+                   'X=' + str(round(x, 3)) + ' with maximum of ' +
+                   str(self.x[-1]) + ' at component ' + c + '.')
+            logger.warning(msg)
+        elif x < self._xl[0]:
+            msg = ('Operating point below CharMap range: '
+                   'X=' + str(round(x, 3)) + ' with minimum of ' +
+                   str(self.x[0]) + ' at component ' + c + '.')
+            logger.warning(msg)
+        return self.y[k].copy()
+
+    def evaluate_y(self, y, yarr, zarr):
+        r"""
+        由 evaluate_x 的结果计算第二维输入 y 对应的输出。
+
+        Parameters
+        ----------
+        y : float
+            第二维输入。
+
+        yarr : ndarray
+            第二维输入数组。
+
+        zarr : ndarray
+            输出数组。
+        """
+        ypos = bisect_left(yarr.tolist(), y)
+        if ypos == len(yarr):
+            return zarr[ypos - 1]
+        elif ypos == 0:
+            return zarr[0]
+        zfrac = (y - yarr[ypos - 1]) / (yarr[ypos] - yarr[ypos - 1])
+        return zarr[ypos - 1] + zfrac * (zarr[ypos] - zarr[ypos - 1])
+
+
+def bus_efficiencies(bus):
+    """一次计算总线上所有组件的效率。
+
+    Parameters
+    ----------
+    bus : tespy.connections.bus.Bus
+        已求解网络中的总线。
+
+    Returns
+    -------
+    efficiency : dict
+        组件标签到总线效率的映射，与 comp.calc_bus_efficiency(bus) 的结果相同。
+    """
+    comps = bus.comps.index.tolist()
+    expr = np.array([comp.calc_bus_expr(bus) for comp in comps], dtype=float)
+    stack = CharLineStack(bus.comps["char"].tolist())
+    eta = stack.evaluate(expr)
+    return {comp.label: float(value) for comp, value in zip(comps, eta)}
@@ -0,0 +1,321 @@
+# 适用于大规模网络的 Network
+# TESPy 的 Network 在求解前检查拓扑、沿分流/合流/分离器支路传播工质、分配变量，
+# 其中许多步骤逐个组件在整张连接表中查找，或逐行向 DataFrame 追加结果，
+# 耗时随连接数平方增长；工质传播还会在每次求解时为所有连接重新创建物性计算对象。
+# FastNetwork 的求解结果、结果表和设定表（包括行的顺序）与 Network 相同，区别在于：
+#   - 设定表和结果表在初始化和后处理期间逐行记录在字典中，结束后一次性生成 DataFrame；
+#   - 工质传播的结果按连接参数设定的指纹缓存，只有增删连接或修改设定
+#     （设定/取消某个参数、修改工质组成的设定项、后端或混合规则）时才重新计算；
+#     只修改数值时（例如 c3.set_attr(T=T)）直接复用；
+#   - 快速路径：与上一次收敛的求解相比只修改了参数的数值（哪些参数被设定、哪些是变量都不变，
+#     例如扫描中的 c3.set_attr(T=T) 或 cp.set_attr(pr=pr)）时，不再调用 Network.initialise，
+#     变量编号、方程数和设定表沿用上一次的结果，只重新换算设定值、预求解连接的状态并预处理方程，
+#     迭代初值为上一次的解；
+#   - cache_stats 记录拓扑检查、工质传播缓存和快速路径的命中次数。
+
+import numpy as np
+import pandas as pd
+from tespy.networks import Network
+from tespy.tools.data_containers import ComponentProperties as dc_cp
+from tespy.tools.helpers import convert_to_SI
+
+
+class FastNetwork(Network):
+    r"""
+    预处理结果带缓存的 Network，用法与 Network 相同。
+
+    Note
+    ----
+    :code:`nw.cache_stats` 记录缓存命中情况：
+
+    - 'topology_hits' / 'topology_misses'：求解时复用 / 重新进行拓扑检查的次数；
+    - 'fluid_hits' / 'fluid_misses'：求解时复用 / 重新进行工质传播的次数；
+    - 'fast_path_hits' / 'fast_path_misses'：只修改了数值、跳过 Network.initialise /
+      结构有变化、完整初始化的次数。
+
+    快速路径只在上一次求解收敛、没有指定 init_path、init_previous 为 True
+    且没有连接或组件使用 local_design / local_offdesign 时使用；
+    离设计计算还要求 design_path 与上一次相同。
+    """
+
+    def set_defaults(self):
+        """设置网络默认属性，并初始化缓存。"""
+        super().set_defaults()
+        self.cache_stats = dict.fromkeys(
+            ['topology_hits', 'topology_misses', 'fluid_hits', 'fluid_misses',
+             'fast_path_hits', 'fast_path_misses'], 0
+        )
+        self._fluid_key = None
+        self._structure_key = None
+        self._previous_structure_key = None
+        self._fast_path = False
+
+    def solve(self, *args, **kwargs):
+        """求解网络，参数与 Network.solve 相同。"""
+        if self.checked:
+            self.cache_stats['topology_hits'] += 1
+        else:
+            self.cache_stats['topology_misses'] += 1
+            self._fluid_key = None
+            self._structure_key = None
+
+        # 求解失败时下一次求解重新完整初始化
+        self._previous_structure_key = self._structure_key
+        self._structure_key = None
+
+        result = super().solve(*args, **kwargs)
+        if self.converged:
+            # 离设计计算会切换设计/离设计参数，记录求解后的设定结构
+            self._structure_key = self._specification_structure(
+                self.mode, self.design_path
+            )
+        return result
+
+    def _specification_structure(self, mode, design_path):
+        """参数设定的结构：哪些参数被设定、哪些是变量，不包含数值。"""
+        return (
+            mode, design_path,
+            tuple(
+                (
+                    c,
+                    tuple(
+                        c.get_attr(key).is_set for key in c.property_data
+                        if key != 'fluid'
+                    ),
+                    frozenset(c.fluid.is_set),
+                    frozenset(c.fluid.val),
+                )
+                for c in self.conns['object']
+            ),
+            tuple(
+                (
+                    cp,
+                    tuple(
+                        (data.is_set, getattr(data, 'is_var', False))
+                        for data in map(cp.get_attr, cp.parameters)
+                    ),
+                    tuple(cp.design), tuple(cp.offdesign),
+                )
+                for cp in self.comps['object']
+            ),
+            tuple(
+                (label, b.P.is_set, tuple(b.comps.index))
+                for label, b in self.busses.items()
+            ),
+            tuple(self.user_defined_eq),
+        )
+
+    def propagate_fluid_wrappers(self):
+        """工质传播，连接参数设定未变化时复用上一次的结果。"""
+        key = self._fluid_specification_key()
+        if key == self._fluid_key:
+            self.cache_stats['fluid_hits'] += 1
+            return
+
+        self.cache_stats['fluid_misses'] += 1
+        super().propagate_fluid_wrappers()
+        self._fluid_key = self._fluid_specification_key()
+
+    def _fluid_specification_key(self):
+        """连接参数设定的指纹：哪些参数被设定，以及工质的设定项、后端和混合规则。"""
+        return tuple(
+            (
+                c,
+                tuple(c.get_attr(key).is_set for key in c.parameters),
+                frozenset(c.fluid.is_set),
+                tuple(sorted(
+                    (f, c.fluid.engine.get(f), c.fluid.back_end.get(f))
+                    for f in c.fluid.is_set
+                )),
+                c.mixing_rule,
+            )
+            for c in self.conns['object']
+        )
+
+    def initialise(self):
+        """初始化计算，设定表在初始化期间逐行记录，结束后一次性生成 DataFrame。
+
+        与上一次收敛的求解相比只修改了数值时按快速路径初始化，不调用 Network.initialise。
+        """
+        self._fast_path = self._is_value_change()
+        if self._fast_path:
+            if self._reinitialise():
+                self.cache_stats['fast_path_hits'] += 1
+                return
+            # 变量数与上一次不同，撤销质量流量和工质的合并后完整初始化
+            self._fast_path = False
+            self.reset_topology_reduction_specifications()
+
+        self.cache_stats['fast_path_misses'] += 1
+        for comp_type, tables in self.specifications.items():
+            if comp_type not in ['lookup', 'Connection', 'Ref']:
+                for spec, df in tables.items():
+                    tables[spec] = _TableBuffer(df)
+        try:
+            super().initialise()
+        finally:
+            _build_tables(self.specifications)
+
+    def _is_value_change(self):
+        """与上一次收敛的求解相比是否只修改了参数的数值。"""
+        if (
+                self._previous_structure_key is None
+                or self.init_path is not None or not self.init_previous
+                or (self.mode == 'offdesign' and self.new_design)
+        ):
+            return False
+        if any(c.local_design or c.local_offdesign for c in self.conns['object']):
+            return False
+        if any(cp.local_design or cp.local_offdesign for cp in self.comps['object']):
+            return False
+        key = self._specification_structure(self.mode, self.design_path)
+        return key == self._previous_structure_key
+
+    def _reinitialise(self):
+        """快速路径的初始化，对应 Network.initialise 中与数值有关的步骤。
+
+        变量编号和设定表沿用上一次的结果，连接和组件的方程按当前数值重新预处理和计数。
+        迭代初值为上一次的解（连接的 val0 在后处理中更新为上一次的结果）。
+
+        Returns
+        -------
+        bool
+            变量数与上一次相同时为 True；否则需要完整初始化。
+        """
+        num_conn_vars = self.num_conn_vars
+        self.num_bus_eq = 0
+        self.num_conn_eq = 0
+        self.num_conn_vars = 0
+        self.variables_dict = {}
+
+        self.presolve_massflow_topology()
+        self.presolve_fluid_topology()
+
+        # 设定值换算为 SI 单位
+        for c in self.conns['object']:
+            for key, data in c.property_data.items():
+                if 'fluid' in key or not data.is_set:
+                    continue
+                prop = key.split('_ref')[0]
+                if 'ref' in key:
+                    quantity = 'Td_bp' if prop == 'T' else prop
+                    data.ref.delta_SI = convert_to_SI(
+                        quantity, data.ref.delta, c.get_attr(prop).unit
+                    )
+                else:
+                    data.val_SI = convert_to_SI(key, data.val, data.unit)
+
+        offdesign = self.mode == 'offdesign'
+        self._conn_variables = []
+        for c in self.conns['object']:
+            if offdesign:
+                for var in c.offdesign:
+                    c.get_attr(var).val_SI = c.get_attr(var).design
+            if not c.fluid.is_var:
+                c.simplify_specifications()
+            self._assign_variable_space(c)
+            c.preprocess()
+
+        if self.num_conn_vars != num_conn_vars:
+            return False
+
+        # 组件的预处理还会换算组件参数（例如换热器的压降、环境温度），每次都要重新进行
+        self.num_comp_eq = 0
+        i = self.num_conn_vars
+        for cp in self.comps['object']:
+            if offdesign:
+                for var in cp.offdesign:
+                    data = cp.get_attr(var)
+                    if isinstance(data, dc_cp):
+                        data.val = data.design
+            cp.preprocess(i)
+            for container, name in cp.vars.items():
+                self.variables_dict[i] = {'obj': container, 'variable': name}
+                i += 1
+            self.num_comp_eq += cp.num_eq
+
+        if i != self.num_conn_vars + self.num_comp_vars:
+            return False
+
+        for b in self.busses.values():
+            self.num_bus_eq += b.P.is_set * 1
+            if not offdesign:
+                b.comps['P_ref'] = np.nan
+
+        self.init_properties()
+        return True
+
+    def init_count_connections_parameters(self, c):
+        """统计连接的方程数，快速路径下连接的设定表与上一次相同，不再写入。"""
+        if self._fast_path:
+            self.num_conn_eq += c.num_eq
+        else:
+            super().init_count_connections_parameters(c)
+
+    def init_set_properties(self):
+        """换算设定值，连接的设定表在初始化期间逐行记录。"""
+        super().init_set_properties()
+        for key in ['Connection', 'Ref']:
+            self.specifications[key] = _TableBuffer(self.specifications[key])
+
+    def postprocessing(self):
+        """计算结果，连接和组件的结果表在后处理期间逐行记录，结束后一次性生成 DataFrame。"""
+        # 总线的结果表在后处理中还要按列求和，不记录
+        keys = [
+            key for key, table in self.results.items()
+            if key not in self.busses and isinstance(table, pd.DataFrame)
+        ]
+        for key in keys:
+            self.results[key] = _TableBuffer(self.results[key])
+        try:
+            super().postprocessing()
+        finally:
+            _build_tables(self.results)
+
+
+def _build_tables(tables):
+    """把逐行记录的表生成 DataFrame，tables 为 nw.specifications 或 nw.results。"""
+    for key, table in tables.items():
+        if isinstance(table, _TableBuffer):
+            tables[key] = table.to_frame()
+        elif isinstance(table, dict) and key != 'lookup':
+            _build_tables(table)
+
+
+class _TableBuffer:
+    """初始化和后处理期间代替设定表、结果表的 DataFrame。
+
+    支持 Network 中用到的 :code:`table.loc[label] = row`、
+    :code:`table.loc[label, columns] = row` 和 :code:`table.loc[label]`，
+    逐行写入只记录到字典中，to_frame 一次性生成 DataFrame。
+    已有的行保持原来的顺序和数值，新的行按第一次写入的顺序排在后面，与逐行写入 DataFrame 相同。
+    """
+
+    def __init__(self, frame):
+        self.columns = frame.columns
+        self.rows = frame.to_dict(orient='index')
+        self.loc = self
+
+    def __setitem__(self, key, value):
+        if isinstance(key, tuple):
+            label, columns = key
+            row = self.rows.setdefault(label, {})
+            if isinstance(columns, str):
+                row[columns] = value
+            else:
+                row.update(zip(columns, value))
+        else:
+            row = self.rows.setdefault(key, {})
+            if isinstance(value, dict):
+                row.update(value)
+            else:
+                row.update(zip(self.columns, value))
+
+    def __getitem__(self, label):
+        return pd.Series(self.rows[label])
+
+    def to_frame(self):
+        """生成 DataFrame。"""
+        return pd.DataFrame.from_dict(
+            self.rows, orient='index', columns=self.columns
+        )
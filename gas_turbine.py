@@ -1,18 +1,22 @@
 from tespy.networks import Network  # 导入Network类，用于创建和管理热力系统网络
 from tespy.components import (  # 导入所需的组件类
-    DiabaticCombustionChamber,  # 非绝热燃烧室
     Turbine,  # 涡轮机
     Source,  # 源（空气源、燃料源）
     Sink,  # 汇（烟气汇）
     Compressor  # 压缩机
 )
 from tespy.connections import Connection, Ref, Bus  # 导入连接类、引用类和总线类
+from state_pool import MIXING_RULE, PooledCoolPropWrapper  # 带组成缓存的混合规则和共用的工质状态对象
+from combustion_cache import CachedCombustionChamber, cache_stats  # 反应参数带缓存、反应平衡导数解析计算的燃烧室
+
+# 各组分使用共用的工质状态对象（每种工质只创建一个）
+pooled = {f: PooledCoolPropWrapper for f in ["Ar", "N2", "CO2", "O2", "H2O", "CH4", "H2"]}
 
 # 定义网络中的流体列表，并设置压力和温度单位
 nw = Network(p_unit="bar", T_unit="C")  # 创建一个新的网络对象，设置压力单位为巴，温度单位为摄氏度
 
 cp = Compressor("Compressor")  # 创建一个压缩机组件，命名为"Compressor"
-cc = DiabaticCombustionChamber("combustion chamber")  # 创建一个非绝热燃烧室组件，命名为"combustion chamber"
+cc = CachedCombustionChamber("combustion chamber")  # 创建一个非绝热燃烧室组件（带反应计算缓存），命名为"combustion chamber"
 tu = Turbine("turbine")  # 创建一个涡轮机组件，命名为"turbine"
 air = Source("air source")  # 创建一个空气源组件，命名为"air source"
 fuel = Source("fuel source")  # 创建一个燃料源组件，命名为"fuel source"
@@ -30,11 +34,15 @@ cc.set_attr(pr=1, eta=1, lamb=1.5, ti=10e6)  # 设置燃烧室的压力比、效
 # 设置空气源到燃烧室连接的初始条件
 c2.set_attr(
     p=1, T=20,  # 设置压力为1 bar，温度为20°C
-    fluid={"Ar": 0.0129, "N2": 0.7553, "CO2": 0.0004, "O2": 0.2314}  # 设置流体组成
+    fluid={"Ar": 0.0129, "N2": 0.7553, "CO2": 0.0004, "O2": 0.2314},  # 设置流体组成
+    fluid_engines=pooled, mixing_rule=MIXING_RULE  # 共用状态对象，按组成缓存摩尔分数
 )
 
 # 设置燃料源到燃烧室连接的初始条件
-c5.set_attr(p=1, T=20, fluid={"CO2": 0.04, "CH4": 0.96, "H2": 0})  # 设置压力为1 bar，温度为20°C，流体组成
+c5.set_attr(
+    p=1, T=20, fluid={"CO2": 0.04, "CH4": 0.96, "H2": 0, "H2O": 0},  # 设置压力为1 bar，温度为20°C，流体组成
+    fluid_engines=pooled, mixing_rule=MIXING_RULE
+)
 
 nw.solve(mode="design")  # 解决设计工况下的网络
 nw.print_results()  # 打印网络结果
@@ -50,7 +58,7 @@ c3.set_attr(T=1400)  # 设置涡轮机入口温度为1400°C
 nw.solve(mode="design")  # 再次解决设计工况下的网络
 
 # 修改燃料源的流体组成并重新求解
-c5.set_attr(fluid={"CO2": 0.03, "CH4": 0.92, "H2": 0.05})  # 修改燃料的流体组成
+c5.set_attr(fluid={"CO2": 0.03, "CH4": 0.92, "H2": 0.05, "H2O": 0})  # 修改燃料的流体组成
 nw.solve(mode="design")  # 再次解决设计工况下的网络
 
 # 打印所有连接的结果
@@ -89,7 +97,8 @@ tu.set_attr(eta_s=0.90)  # 设置涡轮机的等熵效率为0.90
 # 设置空气源到压缩机连接的初始条件
 c1.set_attr(
     p=1, T=20,  # 设置压力为1 bar，温度为20°C
-    fluid={"Ar": 0.0129, "N2": 0.7553, "CO2": 0.0004, "O2": 0.2314}  # 设置流体组成
+    fluid={"Ar": 0.0129, "N2": 0.7553, "CO2": 0.0004, "O2": 0.2314},  # 设置流体组成
+    fluid_engines=pooled, mixing_rule=MIXING_RULE  # 共用状态对象，按组成缓存摩尔分数
 )
 
 # 设置涡轮机入口的质量流量和出口压力
@@ -151,6 +160,54 @@ for pr in data['pr']:
 # 重置压缩机压力比
 cp.set_attr(pr=15)
 
+# %% 理想气体性质（NASA 7 系数多项式）
+# 燃烧室网络只涉及理想气体，各组分改用 NASA7Wrapper 和 IDEAL_GAS_RULE 混合规则后，
+# 性质由多项式直接计算，不再调用 CoolProp，燃烧室的参数扫描快得多
+from fast_network import FastNetwork
+from ideal_gas import IDEAL_GAS_RULE, NASA7Wrapper
+
+nasa = {f: NASA7Wrapper for f in ["Ar", "N2", "CO2", "O2", "H2O", "CH4", "H2"]}
+ig = FastNetwork(p_unit="bar", T_unit="C", iterinfo=False)
+ig_cc = CachedCombustionChamber("combustion chamber")
+ig_air = Source("air source")
+ig_fuel = Source("fuel source")
+ig_fg = Sink("flue gas sink")
+ig_c2 = Connection(ig_air, "out1", ig_cc, "in1", label="2")
+ig_c3 = Connection(ig_cc, "out1", ig_fg, "in1", label="3")
+ig_c5 = Connection(ig_fuel, "out1", ig_cc, "in2", label="5")
+ig.add_conns(ig_c2, ig_c3, ig_c5)
+
+ig_cc.set_attr(pr=1, eta=1, lamb=1.5, ti=10e6)
+ig_c2.set_attr(
+    p=1, T=20, fluid={"Ar": 0.0129, "N2": 0.7553, "CO2": 0.0004, "O2": 0.2314},
+    fluid_engines=nasa, mixing_rule=IDEAL_GAS_RULE
+)
+ig_c5.set_attr(
+    p=1, T=20, fluid={"CO2": 0.04, "CH4": 0.96, "H2": 0, "H2O": 0},
+    fluid_engines=nasa, mixing_rule=IDEAL_GAS_RULE
+)
+ig.solve("design")
+
+# 烟气温度随热输入、过量空气系数和燃料中氢气含量的变化
+T_flue = {'ti': [], 'lamb': [], 'H2': []}
+for ti in np.linspace(5e6, 20e6, 7):
+    ig_cc.set_attr(ti=ti)
+    ig.solve("design")
+    T_flue['ti'] += [ig_c3.T.val]
+ig_cc.set_attr(ti=10e6)
+
+for lamb in np.linspace(1.5, 3, 7):
+    ig_cc.set_attr(lamb=lamb)
+    ig.solve("design")
+    T_flue['lamb'] += [ig_c3.T.val]
+ig_cc.set_attr(lamb=1.5)
+
+for x in np.linspace(0, 0.2, 5):
+    ig_c5.set_attr(fluid={"CO2": 0.04, "CH4": 0.96 - x, "H2": x, "H2O": 0})
+    ig.solve("design")
+    T_flue['H2'] += [ig_c3.T.val]
+print({key: [round(float(T), 1) for T in values] for key, values in T_flue.items()})
+
 # 绘制功率和效率随涡轮机入口温度变化的关系图
 fig, ax = plt.subplots(2, 2, figsize=(16, 8), sharex='col', sharey='row')
 ax = ax.flatten()
@@ -219,6 +276,7 @@ for ti in data:
     H2 += [c5.fluid.val["H2"] * 100]  # 记录氢气质量分数
 
 nw._convergence_check()  # 检查收敛情况
+print(f'燃烧室反应缓存: {cache_stats(nw)}')  # 网络中各燃烧室反应参数的复用次数和解析/数值导数的次数之和
 
 # 绘制甲烷和氢气质量分数随热输入变化的关系图
 fig, ax = plt.subplots(1, figsize=(16, 8))
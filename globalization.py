@@ -0,0 +1,444 @@
+# 牛顿法的全局化：回溯线搜索和 dogleg 信赖域
+# TESPy 的牛顿法每次迭代都走完整的牛顿步，只对压力做了防止变为负值的松弛。
+# 初值离解较远时，完整的牛顿步常常越过解，使压力或焓值超出工质的有效范围（例如
+# authority_component/bus.py 的 p_range=[0.5, 10]），之后只能被截断到范围边界，求解因此发散；
+# power_optimization.py 的 solve_model 遇到这种情况只能放弃该候选点。
+# GlobalizedNetwork 的方程和收敛判据与 Network 相同，区别在于每次迭代的步长：
+#   - 'line_search'：回溯线搜索，由完整牛顿步开始，残差范数没有充分下降时步长减半；
+#   - 'trust_region'：dogleg 信赖域，在按变量量级缩放的空间中，把牛顿步与最速下降步组合成
+#     不超过信赖域半径的步长，按实际与预测的残差下降之比调整半径；
+#   - None（默认）：与 Network 相同。
+# 试探点的残差和雅可比矩阵在接受后直接用于下一次迭代，只有被拒绝的试探点增加计算量。
+# 以本文件为脚本运行时，对仓库中各示例模型的收敛解施加随机扰动作为初值，
+# 比较三种方法的收敛率和平均迭代次数。
+
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.linalg import norm
+from tespy.networks import Network
+from tespy.tools.global_vars import ERR
+from tespy.tools.helpers import TESPyNetworkError
+
+from multistart import apply_state
+from multistart import parameters_within_bounds
+
+_METHODS = [None, 'line_search', 'trust_region']
+# 牛顿步使各变量的相对变化都小于该值时直接走完整的牛顿步：此时已在牛顿法的局部收敛范围内，
+# 而组分截断等原因留下的微小残差不一定随迭代继续下降，按残差下降判断反而会拒绝正确的步长
+_LOCAL = 1e-2
+# 信赖域缩放时各类变量的最小量级（SI 单位），避免接近 0 的变量把步长限制得过小
+_SCALE = {'m': 1e-2, 'p': 1e4, 'h': 1e4, 'fluid': 1e-2}
+# benchmark 的列：收敛率、收敛时的平均迭代次数、平均残差计算次数、平均求解时间
+_COLUMNS = ['converged', 'iterations', 'evaluations', 'time']
+
+
+class GlobalizedNetwork(Network):
+    r"""
+    带步长控制的 Network，用法与 Network 相同。
+
+    Note
+    ----
+    通过 :code:`nw.set_attr(globalization='line_search')` 或 'trust_region' 选择步长控制方法，
+    None（默认）时与 Network 相同。
+
+    - :code:`max_backtracks`：每次迭代最多拒绝的试探步数，之后接受最后一个试探步；
+    - :code:`radius`：信赖域的初始半径（缩放后各变量的相对变化量）。
+
+    :code:`nw.solver_stats` 记录最近一次求解的 'evaluations'（残差和雅可比矩阵的计算次数）
+    和 'rejected'（被拒绝的试探步数）。
+    """
+
+    def set_defaults(self):
+        """设置网络默认属性和步长控制参数。"""
+        super().set_defaults()
+        self._set_globalization_defaults()
+
+    def _set_globalization_defaults(self):
+        self.globalization = None
+        self.max_backtracks = 8
+        self.radius = 1.0
+        self.solver_stats = dict.fromkeys(['evaluations', 'rejected'], 0)
+
+    @classmethod
+    def from_network(cls, nw, globalization=None):
+        r"""
+        复制一个已有的网络（例如示例脚本中的 Network 或 FastNetwork）。
+
+        Parameters
+        ----------
+        nw : tespy.networks.network.Network
+            要复制的网络，不会被修改。
+
+        globalization : str
+            步长控制方法。
+
+        Returns
+        -------
+        nw : GlobalizedNetwork
+            网络的副本，参数设定和上一次的求解结果都与原网络相同。
+        """
+        copy = pickle.loads(pickle.dumps(nw))
+        copy.__class__ = cls
+        copy._set_globalization_defaults()
+        copy.set_attr(globalization=globalization)
+        return copy
+
+    def set_attr(self, **kwargs):
+        """设置网络属性，另外接受 globalization、max_backtracks 和 radius。"""
+        if 'globalization' in kwargs:
+            if kwargs['globalization'] not in _METHODS:
+                msg = (
+                    'Network parameter globalization must be one of '
+                    f'{_METHODS}.'
+                )
+                raise ValueError(msg)
+            self.globalization = kwargs['globalization']
+        for key in ['max_backtracks', 'radius']:
+            if key in kwargs:
+                setattr(self, key, kwargs[key])
+        super().set_attr(**kwargs)
+
+    def solve_loop(self, print_results=True):
+        """牛顿迭代，每次求解重新开始计数、重置信赖域半径。"""
+        self._reset_solver()
+        super().solve_loop(print_results)
+
+    def _reset_solver(self):
+        self.solver_stats = dict.fromkeys(['evaluations', 'rejected'], 0)
+        self._radius = self.radius
+        self._next = None
+
+    def solve_control(self):
+        r"""
+        一次牛顿迭代：计算残差和雅可比矩阵、求解牛顿步，按 globalization 确定步长。
+        """
+        if self.globalization is None:
+            self.solver_stats['evaluations'] += 1
+            return super().solve_control()
+
+        if self._next is None:
+            self._evaluate()
+        else:
+            # 上一次迭代接受的试探点已经计算过残差和雅可比矩阵
+            self.residual, self.jacobian = self._next
+            self._next = None
+
+        self.matrix_inversion()
+        if self.lin_dep:
+            return
+
+        values = self._values()
+        scale = self._scale()
+        # 方程按缩放后雅可比矩阵各行的最大元素归一化，质量、能量和组分方程的残差量级相当
+        weights = np.abs(self.jacobian * scale).max(axis=1)
+        weights[weights == 0] = 1
+        residual = self.residual / weights
+        jacobian = self.jacobian * scale / weights[:, None]
+        start = self.residual.copy()
+        if np.abs(self.increment / scale).max() < _LOCAL:
+            self._try(self.increment.copy(), values, weights)
+        elif self.globalization == 'line_search':
+            self._line_search(residual, weights, values)
+        else:
+            self._dogleg(residual, jacobian, scale, weights, values)
+        # 与 Network 相同，记录的是本次迭代起点的残差
+        self.residual = start
+
+    def _evaluate(self):
+        """计算当前变量值的残差和雅可比矩阵。"""
+        self.solver_stats['evaluations'] += 1
+        self.solve_components()
+        self.solve_busses()
+        self.solve_connections()
+        self.solve_user_defined_eq()
+
+    def _try(self, step, values, weights):
+        r"""
+        由 values 出发走一步并计算残差。
+
+        Returns
+        -------
+        residual : float
+            试探点归一化后的残差范数，工质性质无法计算时为无穷大。
+        """
+        self._restore(values)
+        self.increment = step
+        self.increment_filter = np.absolute(step) < ERR ** 2
+        self.update_variables()
+        try:
+            self.check_variable_bounds()
+            self._evaluate()
+        except ValueError:
+            self._next = None
+            return np.inf
+        self._next = (self.residual.copy(), self.jacobian.copy())
+        return norm(self.residual / weights)
+
+    def _line_search(self, residual, weights, values):
+        """回溯线搜索：残差范数满足 Armijo 条件时接受，否则步长减半。"""
+        newton = self.increment.copy()
+        f0 = norm(residual)
+        alpha = 1.0
+        for _ in range(self.max_backtracks):
+            f = self._try(alpha * newton, values, weights)
+            if f <= (1 - 1e-4 * alpha) * f0:
+                return
+            self.solver_stats['rejected'] += 1
+            alpha /= 2
+        self._try(alpha * newton, values, weights)
+
+    def _dogleg(self, residual, jacobian, scale, weights, values):
+        """dogleg 信赖域：按实际与预测的残差下降之比接受步长并调整半径。"""
+        newton = self.increment / scale
+        gradient = jacobian.T @ residual
+        descent = jacobian @ gradient
+        if descent @ descent == 0:
+            cauchy = newton
+        else:
+            cauchy = -(gradient @ gradient) / (descent @ descent) * gradient
+        f0 = residual @ residual
+
+        for _ in range(self.max_backtracks):
+            step = _dogleg_step(newton, cauchy, gradient, self._radius)
+            length = norm(step)
+            predicted = f0 - norm(residual + jacobian @ step) ** 2
+            f = self._try(scale * step, values, weights)
+            rho = (f0 - f ** 2) / predicted if predicted > 0 else -1
+            if rho < 0.25:
+                self._radius = 0.5 * length
+            elif rho > 0.75 and length >= 0.99 * self._radius:
+                self._radius = 2 * self._radius
+            if rho > 1e-4:
+                return
+            self.solver_stats['rejected'] += 1
+
+    def _values(self):
+        """保存所有变量（包括各支路的组分）的当前值。"""
+        fluids = [
+            (c.fluid.val, c.fluid.val.copy())
+            for c in self.conns['object'] if c.fluid.is_var
+        ]
+        return self._variables(), fluids
+
+    def _variables(self):
+        """各变量的当前值，按雅可比矩阵的列排列。"""
+        values = {}
+        for col, data in self.variables_dict.items():
+            variable = data['variable']
+            if variable in ['m', 'p', 'h']:
+                values[col] = data['obj'].get_attr(variable).val_SI
+            elif variable == 'fluid':
+                values[col] = data['obj'].fluid.val[data['fluid']]
+            else:
+                values[col] = data['obj'].val
+        return values
+
+    def _restore(self, values):
+        values, fluids = values
+        for fluid, val in fluids:
+            fluid.update(val)
+        for col, data in self.variables_dict.items():
+            variable = data['variable']
+            if variable in ['m', 'p', 'h']:
+                data['obj'].get_attr(variable).val_SI = values[col]
+            elif variable == 'fluid':
+                data['obj'].fluid.val[data['fluid']] = values[col]
+            else:
+                data['obj'].val = values[col]
+
+    def _scale(self):
+        """各变量当前值的量级，用于信赖域的缩放。"""
+        values = self._variables()
+        scale = np.ones(self.num_vars)
+        for col, data in self.variables_dict.items():
+            floor = _SCALE.get(data['variable'], 1.0)
+            scale[col] = max(abs(values[col]), floor)
+        return scale
+
+
+def _dogleg_step(newton, cauchy, gradient, radius):
+    """缩放空间中的 dogleg 步。"""
+    if norm(newton) <= radius:
+        return newton
+    if norm(cauchy) >= radius:
+        return -radius * gradient / norm(gradient)
+    # 在柯西点到牛顿步的连线上取长度等于半径的点
+    d = newton - cauchy
+    a = d @ d
+    b = 2 * cauchy @ d
+    c = cauchy @ cauchy - radius ** 2
+    tau = (-b + np.sqrt(b ** 2 - 4 * a * c)) / (2 * a)
+    return cauchy + tau * d
+
+
+def perturbed_starts(nw, size, seed=0, sigma=(0.5, 0.1, 0.05)):
+    r"""
+    在收敛解的基础上随机扰动，生成多组初值。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        已收敛的网络。
+
+    size : int
+        初值组数。
+
+    seed : int
+        随机数种子。
+
+    sigma : tuple
+        质量流量、压力和焓值的扰动幅度（对数正态分布的标准差）。
+
+    Returns
+    -------
+    starts : list
+        连接标签到 {'m', 'p', 'h', 'fluid'} 的映射（SI 单位），可用 apply_state 写入网络。
+    """
+    rng = np.random.default_rng(seed)
+    starts = []
+    for _ in range(size):
+        start = {}
+        # 共用同一个质量流量变量的连接（同一支路）使用相同的扰动
+        factors = {}
+        for c in nw.conns['object']:
+            key = id(c.m)
+            if key not in factors:
+                factors[key] = np.exp(rng.normal(0, sigma[0]))
+            start[c.label] = {
+                'm': c.m.val_SI * factors[key],
+                'p': c.p.val_SI * np.exp(rng.normal(0, sigma[1])),
+                'h': c.h.val_SI * np.exp(rng.normal(0, sigma[2])),
+                'fluid': c.fluid.val.copy(),
+            }
+        starts += [start]
+    return starts
+
+
+def benchmark(nw, size=20, seed=0, max_iter=50, methods=None):
+    r"""
+    由扰动后的初值求解网络，比较各步长控制方法。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        已收敛的网络，按上一次求解的模式（和 design_path）重新求解，不会被修改。
+
+    size, seed
+        扰动初值的组数和随机数种子，见 perturbed_starts。
+
+    max_iter : int
+        最大迭代次数。
+
+    methods : list
+        要比较的方法，默认为 None、'line_search' 和 'trust_region'。
+
+    Returns
+    -------
+    results : pandas.DataFrame
+        每种方法一行：收敛率（收敛且组件参数在允许范围内）、收敛时的平均迭代次数、
+        平均残差计算次数和平均求解时间。
+    """
+    if methods is None:
+        methods = _METHODS
+    starts = perturbed_starts(nw, size, seed)
+    rows = []
+    for method in methods:
+        converged, iterations, evaluations, times = [], [], [], []
+        for start in starts:
+            # 每组初值使用新的副本，上一次求解留下的状态不影响结果
+            copy = GlobalizedNetwork.from_network(nw, method)
+            copy.set_attr(iterinfo=False)
+            apply_state(copy, start)
+            tic = time.perf_counter()
+            try:
+                copy.solve(
+                    nw.mode, design_path=nw.design_path, max_iter=max_iter
+                )
+                ok = bool(copy.converged) and parameters_within_bounds(copy)
+            except (ValueError, ZeroDivisionError, TESPyNetworkError):
+                copy.reset_topology_reduction_specifications()
+                ok = False
+            times += [time.perf_counter() - tic]
+            converged += [ok]
+            if ok:
+                iterations += [copy.iter + 1]
+                evaluations += [copy.solver_stats['evaluations']]
+        rows += [[
+            np.mean(converged),
+            np.mean(iterations) if iterations else np.nan,
+            np.mean(evaluations) if evaluations else np.nan,
+            np.mean(times),
+        ]]
+    index = [str(method) for method in methods]
+    return pd.DataFrame(rows, index=index, columns=_COLUMNS)
+
+
+if __name__ == "__main__":
+    # 收敛基准测试：运行各示例脚本，对脚本中所有已收敛的网络进行测试
+    # 用法: python globalization.py [脚本 ...]，默认为 examples 中列出的示例脚本
+    import contextlib
+    import io
+    import logging
+    import os
+    import runpy
+    import sys
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from tespy.tools.logger import logger
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    # 求解示例模型的脚本（不包括工具模块和需要 pygmo、运行时间很长的 power_optimization.py）
+    examples = [
+        "first_TESPy.py", "Heat_pump.py", "Rankine_Cycle.py", "GSHP.py",
+        "GSHP_R410A.py", "complex_Heat_pump.py", "District_heating_network.py",
+        "gas_turbine.py", "network_example.py",
+    ]
+    scripts = [os.path.abspath(path) for path in sys.argv[1:]] or [
+        os.path.join(root, example) for example in examples
+    ]
+
+    tables = {}
+    for script in scripts:
+        name = os.path.relpath(script, root)
+        # 示例脚本在自己的目录中读写文件，关闭其打印输出
+        cwd = os.getcwd()
+        os.chdir(os.path.dirname(script))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                namespace = runpy.run_path(script, run_name="__example__")
+        except Exception as e:
+            print(f"{name}: 脚本运行失败（{type(e).__name__}: {e}），跳过")
+            continue
+        finally:
+            os.chdir(cwd)
+
+        networks = {}
+        for key, value in namespace.items():
+            if isinstance(value, Network) and id(value) not in networks:
+                networks[id(value)] = (key, value)
+            elif isinstance(getattr(value, "nw", None), Network):
+                networks.setdefault(id(value.nw), (f"{key}.nw", value.nw))
+
+        level = logger.level
+        logger.setLevel(logging.CRITICAL)
+        os.chdir(os.path.dirname(script))
+        try:
+            for key, nw in networks.values():
+                if not nw.converged:
+                    continue
+                tables[f"{name}: {key}"] = benchmark(nw)
+                print(f"{name}: {key}")
+                print(tables[f"{name}: {key}"].round(3).to_string(), "\n")
+        finally:
+            os.chdir(cwd)
+            logger.setLevel(level)
+
+    if tables:
+        summary = pd.concat(tables).groupby(level=1).mean()
+        print("所有模型的平均值:")
+        print(summary.loc[[str(method) for method in _METHODS]].round(3).to_string())
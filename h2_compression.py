@@ -0,0 +1,109 @@
+# 多级间冷氢气压缩机组
+# CompressionTrain 是 TESPy 的 Subsystem，按级数自动创建 压缩机 + 间冷器 并连接，
+# 各级压比相同；氢气使用 CoolProp 的 BICUBIC&HEOS 表格后端，
+# 性质表只在第一次使用时生成并缓存在磁盘上（~/.CoolProp/Tables），之后各网络和进程共享。
+# N 个相同的并联电堆可以只建立一个电堆模型，经 multiplicity.py 的流量倍增器接入压缩机组。
+
+from tespy.components import Compressor
+from tespy.components import SimpleHeatExchanger
+from tespy.components import Subsystem
+from tespy.connections import Connection
+
+# 使用表格后端的氢气，用于连接的 fluid 参数，例如 fluid={H2: 1}
+H2 = "BICUBIC&HEOS::H2"
+
+
+class CompressionTrain(Subsystem):
+    r"""
+    多级间冷压缩机组。
+
+    Parameters
+    ----------
+    label : str
+        子系统标签，也用作各组件标签的前缀。
+
+    stages : int
+        压缩级数，每两级之间有一个间冷器。
+
+    pr : float
+        总压比（不含间冷器压损），各级压比相同。
+
+    eta_s : float
+        各级压缩机的等熵效率。
+
+    T_cool : float
+        间冷器出口温度，单位与网络的温度单位相同。
+
+    pr_cooler : float
+        间冷器的压比。
+
+    Note
+    ----
+    压缩机组的进口为 :code:`train.inlet`，出口为 :code:`train.outlet`，
+    均为 (组件, 接口) 元组，可直接用于创建外部连接::
+
+        Connection(el, 'out3', *train.inlet)
+        Connection(*train.outlet, hydro, 'in1')
+    """
+
+    def __init__(self, label, stages=3, pr=10, eta_s=0.8, T_cool=40,
+                 pr_cooler=0.99):
+        self.stages = stages
+        self.pr = pr
+        self.eta_s = eta_s
+        self.T_cool = T_cool
+        self.pr_cooler = pr_cooler
+        super().__init__(label)
+
+    def create_comps(self):
+        """创建各级压缩机和间冷器。"""
+        # 各级压比相同，间冷器压损由压缩机补偿
+        pr_stage = (self.pr / self.pr_cooler ** (self.stages - 1)) ** (1 / self.stages)
+        for i in range(1, self.stages + 1):
+            self.comps[f'compressor {i}'] = Compressor(
+                f'{self.label} compressor {i}', pr=pr_stage, eta_s=self.eta_s
+            )
+            if i < self.stages:
+                self.comps[f'intercooler {i}'] = SimpleHeatExchanger(
+                    f'{self.label} intercooler {i}', pr=self.pr_cooler
+                )
+
+    def create_conns(self):
+        """连接各级压缩机和间冷器，并设置间冷器出口温度。"""
+        for i in range(1, self.stages):
+            compressor = self.comps[f'compressor {i}']
+            cooler = self.comps[f'intercooler {i}']
+            self.conns[f'{i}a'] = Connection(
+                compressor, 'out1', cooler, 'in1', label=f'{self.label}_{i}a'
+            )
+            self.conns[f'{i}b'] = Connection(
+                cooler, 'out1', self.comps[f'compressor {i + 1}'], 'in1',
+                label=f'{self.label}_{i}b'
+            )
+            self.conns[f'{i}b'].set_attr(T=self.T_cool)
+
+    @property
+    def inlet(self):
+        """压缩机组的进口 (组件, 接口)。"""
+        return self.comps['compressor 1'], 'in1'
+
+    @property
+    def outlet(self):
+        """压缩机组的出口 (组件, 接口)。"""
+        return self.comps[f'compressor {self.stages}'], 'out1'
+
+    @property
+    def P(self):
+        """各级压缩机的总功率（W）。"""
+        return sum(
+            self.comps[f'compressor {i}'].P.val
+            for i in range(1, self.stages + 1)
+        )
+
+    @property
+    def Q(self):
+        """各间冷器的总换热量（W，放热为负）。"""
+        return sum(
+            self.comps[f'intercooler {i}'].Q.val
+            for i in range(1, self.stages)
+        )
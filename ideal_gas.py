@@ -0,0 +1,334 @@
+# 理想气体混合物的 NASA 7 系数多项式性质
+# gas_turbine.py 的燃烧室网络和 bus.py 的燃气内燃机只涉及 N2、O2、Ar、CO2、H2O、CH4、H2 的理想气体混合物，
+# 按 CoolProp 的 HEOS 状态方程逐组分计算分压下的性质、再用牛顿法反求温度，代价很高。
+# 这里每种组分的 cp/R、h/RT、s/R 都是温度的多项式（GRI-Mech 3.0 的 NASA 7 系数，两个温度段，分界 1000 K），
+# 混合物的系数是各组分系数按质量分数加权之和，因此：
+#   - h(T) 和 s(T, p) 是一个多项式，直接求值；
+#   - T(h) 和 T(s, p) 用解析的 cp 做标量牛顿迭代，通常 3~4 步收敛；
+#   - 所有函数都接受 NumPy 数组，可以一次计算一组状态点。
+# 焓和熵的参考点与 CoolProp 相同（按 CoolProp 的理想气体部分在 298.15 K 对齐），
+# 结果可以与使用 CoolProp 的连接直接比较。水按理想气体处理，不考虑冷凝。
+# 通过连接参数选择：
+# :code:`fluid_engines={f: NASA7Wrapper for f in fluids}, mixing_rule=IDEAL_GAS_RULE`。
+
+import CoolProp as CP
+import numpy as np
+from tespy.tools.fluid_properties import mixtures
+from tespy.tools.fluid_properties.wrappers import FluidPropertyWrapper
+from tespy.tools.fluid_properties.wrappers import wrapper_registry
+from tespy.tools.global_vars import ERR
+
+IDEAL_GAS_RULE = "nasa7-ideal"
+
+R_UNIVERSAL = 8.314462618  # J / (mol K)
+P_STANDARD = 1e5  # NASA 多项式的标准压力，Pa
+T_MID = 1000.0  # 两个温度段的分界，K
+T_MIN = 200.0
+T_MAX = 3500.0
+
+# GRI-Mech 3.0：低温段（T < 1000 K）和高温段的 a1 ~ a7
+_NASA7 = {
+    "N2": (
+        [3.298677, 1.4082404e-03, -3.963222e-06, 5.641515e-09, -2.444854e-12,
+         -1020.8999, 3.950372],
+        [2.92664, 1.4879768e-03, -5.68476e-07, 1.0097038e-10, -6.753351e-15,
+         -922.7977, 5.980528],
+    ),
+    "O2": (
+        [3.78245636, -2.99673416e-03, 9.84730201e-06, -9.68129509e-09,
+         3.24372837e-12, -1063.94356, 3.65767573],
+        [3.28253784, 1.48308754e-03, -7.57966669e-07, 2.09470555e-10,
+         -2.16717794e-14, -1088.45772, 5.45323129],
+    ),
+    "Ar": (
+        [2.5, 0.0, 0.0, 0.0, 0.0, -745.375, 4.366],
+        [2.5, 0.0, 0.0, 0.0, 0.0, -745.375, 4.366],
+    ),
+    "CO2": (
+        [2.35677352, 8.98459677e-03, -7.12356269e-06, 2.45919022e-09,
+         -1.43699548e-13, -4.83719697e+04, 9.90105222],
+        [3.85746029, 4.41437026e-03, -2.21481404e-06, 5.23490188e-10,
+         -4.72084164e-14, -4.8759166e+04, 2.27163806],
+    ),
+    "H2O": (
+        [4.19864056, -2.0364341e-03, 6.52040211e-06, -5.48797062e-09,
+         1.77197817e-12, -3.02937267e+04, -0.849032208],
+        [3.03399249, 2.17691804e-03, -1.64072518e-07, -9.7041987e-11,
+         1.68200992e-14, -3.00042971e+04, 4.9667701],
+    ),
+    "CH4": (
+        [5.14987613, -0.0136709788, 4.91800599e-05, -4.84743026e-08,
+         1.66693956e-11, -1.02466476e+04, -4.64130376],
+        [0.074851495, 0.0133909467, -5.73285809e-06, 1.22292535e-09,
+         -1.0181523e-13, -9468.34459, 18.437318],
+    ),
+    "H2": (
+        [2.34433112, 7.98052075e-03, -1.9478151e-05, 2.01572094e-08,
+         -7.37611761e-12, -917.935173, 0.683010238],
+        [3.3372792, -4.94024731e-05, 4.99456778e-07, -1.79566394e-10,
+         2.00255376e-14, -950.158922, -3.20502331],
+    ),
+}
+
+# 工质别名 -> 组分名称
+_ALIASES = {
+    alias: species
+    for species in _NASA7 for alias in CP.CoolProp.get_aliases(species)
+}
+
+
+def _species_data(species):
+    """组分的摩尔质量（kg/mol）、按质量计的多项式系数和与 CoolProp 参考点的偏差。"""
+    state = CP.AbstractState("HEOS", species)
+    M = state.molar_mass()
+    R = R_UNIVERSAL / M
+    low, high = (np.array(a) * R for a in _NASA7[species])
+    # 在低压下取 CoolProp 的理想气体部分，确定焓和熵的参考点偏差
+    T_ref, p_ref = 298.15, 100.0
+    state.update(CP.PT_INPUTS, p_ref, T_ref)
+    h_offset = state.hmass_idealgas() - _h(low, T_ref)
+    s_offset = state.smass_idealgas() - (_s(low, T_ref) - R * np.log(p_ref / P_STANDARD))
+    return M, low, high, h_offset, s_offset
+
+
+def _h(a, T):
+    return T * (a[0] + T * (a[1] / 2 + T * (a[2] / 3 + T * (a[3] / 4 + T * a[4] / 5)))) + a[5]
+
+
+def _s(a, T):
+    return a[0] * np.log(T) + T * (a[1] + T * (a[2] / 2 + T * (a[3] / 3 + T * a[4] / 4))) + a[6]
+
+
+def _cp(a, T):
+    return a[0] + T * (a[1] + T * (a[2] + T * (a[3] + T * a[4])))
+
+
+_SPECIES = {species: _species_data(species) for species in _NASA7}
+
+
+class IdealGasMixture:
+    r"""
+    N2、O2、Ar、CO2、H2O、CH4、H2 组成的理想气体混合物。
+
+    Parameters
+    ----------
+    composition : dict
+        各组分的质量分数，键可以是 CoolProp 的任意别名，例如
+        :code:`{'N2': 0.7553, 'O2': 0.2314, 'Ar': 0.0129, 'CO2': 0.0004}`。
+
+    Note
+    ----
+    温度单位为 K，压力单位为 Pa，比焓和比熵单位为 J/kg 和 J/(kg K)。
+    所有方法都接受标量或 NumPy 数组。
+    """
+
+    def __init__(self, composition):
+        y = {}
+        for fluid, fraction in composition.items():
+            if fluid not in _ALIASES:
+                msg = (
+                    f"理想气体性质不支持工质 {fluid}，可用的组分为 "
+                    f"{', '.join(_NASA7)}。"
+                )
+                raise ValueError(msg)
+            species = _ALIASES[fluid]
+            y[species] = y.get(species, 0) + fraction
+
+        moles = {species: y[species] / _SPECIES[species][0] for species in y}
+        total = sum(moles.values())
+        self.molar_mass = 1 / total
+        self.R = R_UNIVERSAL * total
+
+        self._low = np.zeros(7)
+        self._high = np.zeros(7)
+        for species, fraction in y.items():
+            _, low, high, h_offset, s_offset = _SPECIES[species]
+            self._low += fraction * low
+            self._high += fraction * high
+            self._low[5] += fraction * h_offset
+            self._high[5] += fraction * h_offset
+            self._low[6] += fraction * s_offset
+            self._high[6] += fraction * s_offset
+            # 混合熵
+            if fraction > 0:
+                x = moles[species] / total
+                self._low[6] -= fraction * R_UNIVERSAL / _SPECIES[species][0] * np.log(x)
+                self._high[6] -= fraction * R_UNIVERSAL / _SPECIES[species][0] * np.log(x)
+        self._low = tuple(self._low)
+        self._high = tuple(self._high)
+
+    def _coefficients(self, T):
+        if np.ndim(T):
+            shape = (7,) + (1,) * np.ndim(T)
+            return np.where(
+                T < T_MID,
+                np.reshape(self._low, shape), np.reshape(self._high, shape)
+            )
+        return self._low if T < T_MID else self._high
+
+    def h(self, T):
+        """比焓 h(T)。"""
+        return _h(self._coefficients(T), T)
+
+    def s(self, p, T):
+        """比熵 s(p, T)。"""
+        return _s(self._coefficients(T), T) - self.R * np.log(p / P_STANDARD)
+
+    def cp(self, T):
+        """定压比热容 cp(T)。"""
+        return _cp(self._coefficients(T), T)
+
+    def d(self, p, T):
+        """密度 p / (R T)。"""
+        return p / (self.R * T)
+
+    def T_h(self, h, T0=None):
+        """由比焓反求温度（牛顿法）。"""
+        T = _start(h, T0)
+        for _ in range(50):
+            dT = (self.h(T) - h) / self.cp(T)
+            T = T - dT
+            if _converged(dT, T):
+                break
+        return T
+
+    def T_s(self, p, s, T0=None):
+        """由压力和比熵反求温度（对 ln T 做牛顿迭代，ds/dlnT = cp）。"""
+        T = _start(s, T0)
+        for _ in range(50):
+            dlnT = (self.s(p, T) - s) / self.cp(T)
+            T = T * np.exp(-dlnT)
+            if _converged(dlnT, 1):
+                break
+        return T
+
+
+def _start(value, T0):
+    """牛顿迭代的初始温度，与 value 的形状相同。"""
+    if T0 is None:
+        T0 = T_MID
+    if np.ndim(value):
+        return np.full(np.shape(value), T0, dtype=float)
+    return float(T0)
+
+
+def _converged(dT, T):
+    """牛顿迭代的收敛判断（相对步长小于 1e-9）。"""
+    if np.ndim(dT):
+        return np.all(np.abs(dT) < 1e-9 * T)
+    return abs(dT) < 1e-9 * T
+
+
+@wrapper_registry
+class NASA7Wrapper(FluidPropertyWrapper):
+    r"""
+    单一组分的理想气体性质封装，可用作连接的 fluid_engines。
+
+    Parameters
+    ----------
+    fluid : str
+        工质名称（N2、O2、Ar、CO2、H2O、CH4、H2 或它们的 CoolProp 别名）。
+
+    back_end : str
+        未使用，保留与其他封装类相同的参数。
+    """
+
+    def __init__(self, fluid, back_end=None) -> None:
+        super().__init__(fluid, back_end)
+        self.gas = IdealGasMixture({self.fluid: 1})
+        self._aliases = CP.CoolProp.get_aliases(_ALIASES[self.fluid])
+        self._molar_mass = self.gas.molar_mass
+        self._T_min = T_MIN
+        self._T_max = T_MAX
+        self._p_min = 1.0
+        self._p_max = 1e9
+        self._p_crit = None
+        self._T_crit = None
+
+    def _is_below_T_critical(self, T):
+        # 理想气体不冷凝
+        return False
+
+    def isentropic(self, p_1, h_1, p_2):
+        return self.h_ps(p_2, self.s_ph(p_1, h_1))
+
+    def T_ph(self, p, h):
+        return self.gas.T_h(h)
+
+    def T_ps(self, p, s):
+        return self.gas.T_s(p, s)
+
+    def h_ps(self, p, s):
+        return self.gas.h(self.gas.T_s(p, s))
+
+    def h_pT(self, p, T):
+        return self.gas.h(T)
+
+    def T_sat(self, p):
+        # 理想气体没有饱和状态，任何温度都高于"饱和温度"（forced-gas 混合规则按气体计算）
+        return 0.0
+
+    def Q_ph(self, p, h):
+        return 1
+
+    def phase_ph(self, p, h):
+        return "g"
+
+    def d_ph(self, p, h):
+        return self.gas.d(p, self.gas.T_h(h))
+
+    def d_pT(self, p, T):
+        return self.gas.d(p, T)
+
+    def s_ph(self, p, h):
+        return self.gas.s(p, self.gas.T_h(h))
+
+    def s_pT(self, p, T):
+        return self.gas.s(p, T)
+
+
+# 按组成缓存的混合物：(工质, 质量分数) 元组 -> IdealGasMixture
+_mixtures = {}
+_MAX_MIXTURES = 10000
+
+
+def mixture(fluid_data):
+    """由 TESPy 的 fluid_data 返回（缓存的）IdealGasMixture。"""
+    key = tuple((fluid, data["mass_fraction"]) for fluid, data in fluid_data.items())
+    gas = _mixtures.get(key)
+    if gas is None:
+        for fluid, data in fluid_data.items():
+            if data["mass_fraction"] > ERR and not isinstance(data["wrapper"], NASA7Wrapper):
+                msg = (
+                    f"混合规则 {IDEAL_GAS_RULE} 要求所有组分使用 NASA7Wrapper，"
+                    f"工质 {fluid} 使用的是 {data['wrapper'].__class__.__name__}。"
+                )
+                raise ValueError(msg)
+        if len(_mixtures) >= _MAX_MIXTURES:
+            _mixtures.clear()
+        gas = IdealGasMixture(
+            {fluid: fraction for fluid, fraction in key if fraction > ERR}
+        )
+        _mixtures[key] = gas
+    return gas
+
+
+def h_mix_pT_nasa7(p=None, T=None, fluid_data=None, **kwargs):
+    return mixture(fluid_data).h(T)
+
+
+def s_mix_pT_nasa7(p=None, T=None, fluid_data=None, **kwargs):
+    return mixture(fluid_data).s(p, T)
+
+
+def v_mix_pT_nasa7(p=None, T=None, fluid_data=None, **kwargs):
+    return 1 / mixture(fluid_data).d(p, T)
+
+
+# 注册到 TESPy 的混合规则表，连接的 mixing_rule 参数即可选择
+mixtures.T_MIX_PH_REVERSE[IDEAL_GAS_RULE] = h_mix_pT_nasa7
+mixtures.T_MIX_PS_REVERSE[IDEAL_GAS_RULE] = s_mix_pT_nasa7
+mixtures.H_MIX_PT_DIRECT[IDEAL_GAS_RULE] = h_mix_pT_nasa7
+mixtures.S_MIX_PT_DIRECT[IDEAL_GAS_RULE] = s_mix_pT_nasa7
+mixtures.V_MIX_PT_DIRECT[IDEAL_GAS_RULE] = v_mix_pT_nasa7
+mixtures.EXERGY_CHEMICAL[IDEAL_GAS_RULE] = mixtures.exergy_chemical_ideal_cond
@@ -0,0 +1,137 @@
+# fluprodia 等值线（isoline）的磁盘缓存
+# calc_isolines() 的结果只取决于 工质、单位制 和 等值线范围，
+# 因此第一次计算后以 JSON 形式保存到缓存目录，之后直接读取，
+# 绘制 h-log(p) 图或 T-s 图时不再重复计算。
+
+import hashlib
+import json
+import os
+
+import numpy as np
+from fluprodia import FluidPropertyDiagram
+
+CACHE_DIR = ".isoline_cache"
+
+
+def _cache_key(fluid, units, isolines):
+    """根据 工质、单位制 和 等值线范围 生成缓存文件名。"""
+    data = {
+        "fluid": fluid,
+        "units": {key: units[key] for key in sorted(units)},
+        "isolines": {
+            key: np.asarray(isolines[key], dtype=float).round(8).tolist()
+            for key in sorted(isolines)
+        },
+    }
+    digest = hashlib.sha1(
+        json.dumps(data, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{fluid}_{digest}.json"
+
+
+def cached_diagram(fluid, units, isolines=None, cache_dir=CACHE_DIR):
+    """返回已计算好等值线的 FluidPropertyDiagram。
+
+    Parameters
+    ----------
+    fluid : str
+        工质名称，例如 'NH3' 或 'water'。
+
+    units : dict
+        单位制，与 set_unit_system 的参数相同，例如
+        :code:`{'T': '°C', 'p': 'bar', 'h': 'kJ/kg'}`。
+
+    isolines : dict
+        等值线范围，与 set_isolines 的参数相同；为 None 时使用 fluprodia 默认值。
+
+    cache_dir : str
+        缓存目录。
+
+    Returns
+    -------
+    diagram : fluprodia.FluidPropertyDiagram
+        等值线数据已就绪的性质图对象。
+    """
+    if isolines is None:
+        isolines = {}
+
+    path = os.path.join(cache_dir, _cache_key(fluid, units, isolines))
+    if os.path.isfile(path):
+        diagram = FluidPropertyDiagram.from_json(path)
+        diagram.set_unit_system(**units)
+        return diagram
+
+    diagram = FluidPropertyDiagram(fluid)
+    diagram.set_unit_system(**units)
+    if isolines:
+        diagram.set_isolines(**isolines)
+    diagram.calc_isolines()
+    diagram.to_json(path)
+    return diagram
+
+
+def collect_plotting_data(components, select=None):
+    """收集组件的 get_plotting_data() 结果。
+
+    Parameters
+    ----------
+    components : iterable
+        TESPy 组件，例如 :code:`nw.comps['object']`。
+
+    select : dict
+        组件标签到连接序号的映射，例如换热器只取冷侧 :code:`{'evaporator': 2}`。
+        未列出的组件取全部连接，标签为 :code:`'label'` 或 :code:`'label:idx'`。
+
+    Returns
+    -------
+    result_dict : dict
+        标签到 calc_individual_isoline 参数字典的映射。
+    """
+    if select is None:
+        select = {}
+
+    result_dict = {}
+    for comp in components:
+        data = comp.get_plotting_data()
+        if data is None:
+            continue
+        if comp.label in select:
+            result_dict[comp.label] = data[select[comp.label]]
+        elif len(data) == 1:
+            result_dict[comp.label] = list(data.values())[0]
+        else:
+            for idx, value in data.items():
+                result_dict[f"{comp.label}:{idx}"] = value
+    return result_dict
+
+
+def calc_component_isolines(diagram, result_dict):
+    """批量计算各组件的状态变化曲线。
+
+    参数完全相同的曲线（例如多个并联组件）只计算一次。
+
+    Parameters
+    ----------
+    diagram : fluprodia.FluidPropertyDiagram
+        性质图对象。
+
+    result_dict : dict
+        标签到 calc_individual_isoline 参数字典的映射，
+        计算结果写入各字典的 'datapoints' 键。
+
+    Returns
+    -------
+    result_dict : dict
+        与输入相同的字典。
+    """
+    computed = {}
+    for data in result_dict.values():
+        kwargs = {k: v for k, v in data.items() if k != "datapoints"}
+        key = tuple(sorted(
+            (k, round(float(v), 8) if isinstance(v, (int, float)) else v)
+            for k, v in kwargs.items()
+        ))
+        if key not in computed:
+            computed[key] = diagram.calc_individual_isoline(**kwargs)
+        data["datapoints"] = computed[key]
+    return result_dict
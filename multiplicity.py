@@ -0,0 +1,135 @@
+# 相同并联单元的倍数（multiplicity）
+# TESPy 中每个组件都有自己的一组方程，N 台相同的并联泵、电堆、燃料电池或用户换热站
+# 需要实例化 N 次。这里只建立一个单元的模型：进口前用 Multiplier(n=1/N) 把总流量分配到
+# 一个单元，出口后用 Multiplier(n=N) 把一个单元的流量汇合成总流量，
+# 方程组规模与并联数量无关。ParallelGroup 记录单元的倍数，
+# 用于把单元的功率、热量、流量换算成总量，以及按倍数计入总线。
+
+from tespy.components import Splitter
+from tespy.components.component import component_registry
+from tespy.tools.characteristics import CharLine
+from tespy.tools.data_containers import SimpleDataContainer as dc_simple
+from tespy.tools.document_models import generate_latex_eq
+
+
+@component_registry
+class Multiplier(Splitter):
+    r"""
+    流量倍增器：出口质量流量为进口的 n 倍，压力、比焓和组分不变。
+
+    Parameters
+    ----------
+    label : str
+        组件标签。
+
+    n : float
+        倍数。N 个并联单元的汇合点取 N，分配点取 1/N。
+
+    Note
+    ----
+    .. math::
+
+        0 = \dot{m}_\mathrm{in} \cdot n - \dot{m}_\mathrm{out}
+    """
+
+    @staticmethod
+    def component():
+        return 'multiplier'
+
+    @staticmethod
+    def get_parameters():
+        return {'n': dc_simple()}
+
+    def outlets(self):
+        return ['out1']
+
+    def mass_flow_func(self):
+        r"""
+        计算质量流量方程的残差。
+
+        Returns
+        -------
+        res : float
+            方程残差。
+        """
+        return self.inl[0].m.val_SI * self.n.val - self.outl[0].m.val_SI
+
+    def mass_flow_func_doc(self, label):
+        latex = r'0 = \dot{m}_\mathrm{in} \cdot n - \dot{m}_\mathrm{out}'
+        return generate_latex_eq(self, latex, label)
+
+    def mass_flow_deriv(self, k):
+        r"""计算质量流量方程的偏导数（常数）。"""
+        i = self.inl[0]
+        o = self.outl[0]
+        if i.m.is_var:
+            self.jacobian[k, i.m.J_col] = self.n.val
+        if o.m.is_var:
+            self.jacobian[k, o.m.J_col] = -1
+
+
+class ParallelGroup:
+    """N 个相同并联单元组成的组。
+
+    Parameters
+    ----------
+    label : str
+        组标签，也用作分配点和汇合点组件标签的前缀。
+
+    n : int
+        并联单元数量。
+
+    Note
+    ----
+    组内只建立一个单元的模型，连接方式为::
+
+        总进口 -> group.distributor -> 单元 -> group.collector -> 总出口
+
+    组内连接的流量和组件的功率、热量都是一个单元的值，用 total 换算为总量。
+    分配点和汇合点只改变质量流量，㶲分析中不应把组内组件按总量计算。
+    """
+
+    def __init__(self, label, n):
+        self.label = label
+        self.n = n
+        self.distributor = Multiplier(f'{label} distributor', n=1 / n)
+        self.collector = Multiplier(f'{label} collector', n=n)
+
+    def total(self, value):
+        """把一个单元的值（流量、功率、热量）换算为整组的总量。"""
+        return value * self.n
+
+    def totals(self, components, param):
+        """返回各组件某个参数的整组总量，例如 :code:`group.totals([fc], 'P')`。"""
+        return {c.label: c.get_attr(param).val * self.n for c in components}
+
+    def bus_entry(self, comp, char=None, base='component'):
+        """返回按倍数计入总线的 Bus.add_comps 参数字典。
+
+        Parameters
+        ----------
+        comp : tespy.components.component.Component
+            组内的组件。
+
+        char : float, CharLine
+            组件原有的效率或特性曲线（可选）。
+
+        base : str
+            'component' 或 'bus'，与 Bus.add_comps 的含义相同。
+
+        Returns
+        -------
+        entry : dict
+            总线上的组件参数，效率（特性曲线）已乘以倍数
+            （base 为 'bus' 时除以倍数），总线值即为整组的总量。
+        """
+        factor = self.n if base == 'component' else 1 / self.n
+        if char is None:
+            char = factor
+        elif isinstance(char, CharLine):
+            char = type(char)(
+                x=char.x, y=char.y * factor, extrapolate=char.extrapolate
+            )
+        else:
+            char = char * factor
+        return {'comp': comp, 'char': char, 'base': base}
@@ -0,0 +1,436 @@
+# 难收敛模型的多起点初始化
+# complex_Heat_pump.py 的完整模型从默认初值出发无法收敛：TESPy 的通用初值中氨回路的压力
+# 没有高低压之分，焓值与压力也不对应，否则只能先用汇代替阀门和压缩机、再猜测焓值，分阶段搭建模型。
+# MultiStart 自动生成多组初值，分别进行少量迭代的求解，取第一组收敛且参数合理的结果作为初值完成求解：
+#   - 已保存的状态：nw.save 保存的结果文件夹（init_path）；
+#   - 启发式初值：按压缩机、泵、阀门和涡轮把连接分成若干压力等级，纯工质回路的各压力等级
+#     在网络设定的最低和最高温度对应的饱和压力之间按高低顺序分配；压缩机进出口为过热蒸汽，
+#     阀门入口为饱和液体，阀门出口和汽包为两相；其他连接按同一压力等级上设定温度的平均值估计焓值；
+#   - 随机扰动：在启发式初值的基础上随机改变质量流量、压力和焓值。
+# 各组初值的求解在多个进程中并行进行（需要 fork，Windows 上依次求解），
+# 牛顿法从不同初值出发可能收敛到质量流量为负、换热方向相反的解，
+# 因此收敛后还检查组件参数是否在允许范围内（与 TESPy 求解后给出警告的判断相同）。
+
+import multiprocessing
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+from tespy.components import Compressor
+from tespy.components import CycleCloser
+from tespy.components import Drum
+from tespy.components import Merge
+from tespy.components import Pump
+from tespy.components import Splitter
+from tespy.components import Turbine
+from tespy.components import Valve
+from tespy.tools import helpers as hlp
+from tespy.tools.data_containers import ComponentProperties as dc_cp
+from tespy.tools.fluid_properties import T_sat_p
+from tespy.tools.fluid_properties import h_mix_pQ
+from tespy.tools.fluid_properties import h_mix_pT
+from tespy.tools.global_vars import ERR
+from tespy.tools.helpers import TESPyNetworkError
+
+# 升压和降压的组件，进出口属于不同的压力等级
+_RAISE = (Compressor, Pump)
+_LOWER = (Turbine, Valve)
+# 进出口状态相同的组件，出口的焓值初值取入口的值
+_TRANSPARENT = (CycleCloser, Merge, Splitter)
+# MultiStart.attempts 的列：初值名称、是否收敛、参数是否合理、迭代次数、求解时间
+_COLUMNS = ['start', 'converged', 'valid', 'iterations', 'time']
+
+
+class MultiStart:
+    r"""
+    由多组初值并行求解网络，继续使用第一组收敛的结果。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        参数设定完整的网络，不需要事先求解。
+
+    init_paths : list
+        已保存状态的文件夹（可选），作为最先尝试的初值。
+
+    perturbations : int
+        随机扰动初值的组数。
+
+    seed : int
+        随机扰动的随机数种子。
+
+    Note
+    ----
+    每组初值都完整给定（或交给 TESPy 的通用初值）所有连接的质量流量、压力和焓值，
+    与网络之前的求解结果无关。:code:`ms.attempts` 记录各组初值的求解情况。
+    """
+
+    def __init__(self, nw, init_paths=None, perturbations=8, seed=0):
+        self.nw = nw
+        self.init_paths = list(init_paths or [])
+        self.perturbations = perturbations
+        self.seed = seed
+        self.attempts = pd.DataFrame(columns=_COLUMNS)
+
+    def starts(self, mode='design', design_path=None):
+        r"""
+        生成各组初值。
+
+        Returns
+        -------
+        starts : list
+            (名称, 初值) 列表；初值为 :code:`{'init_path': path}` 或
+            :code:`{'values': {连接标签: {'m': m, 'p': p, 'h': h}}}`（SI 单位，
+            缺少的量使用 TESPy 的通用初值）。
+        """
+        starts = [
+            (f'stored {path}', {'init_path': path}) for path in self.init_paths
+        ]
+        values = heuristic_start(self.nw, mode, design_path)
+        starts += [('heuristic', {'values': values})]
+
+        rng = np.random.default_rng(self.seed)
+        for i in range(self.perturbations):
+            perturbed = {}
+            # 同一支路上的连接质量流量初值相同，扰动后也要相同
+            factors = {}
+            for label, start in values.items():
+                if start['m'] not in factors:
+                    factors[start['m']] = np.exp(rng.normal(0, 1))
+                perturbed[label] = {
+                    'm': start['m'] * factors[start['m']],
+                    'p': start['p'] * np.exp(rng.normal(0, 0.1)),
+                }
+                if 'h' in start:
+                    perturbed[label]['h'] = start['h'] * np.exp(rng.normal(0, 0.02))
+            starts += [(f'perturbed {i + 1}', {'values': perturbed})]
+        return starts
+
+    def solve(self, mode='design', design_path=None, max_iter=30,
+              processes=None, validate=None):
+        r"""
+        用多组初值求解网络。
+
+        Parameters
+        ----------
+        mode, design_path
+            与 Network.solve 相同。
+
+        max_iter : int
+            每组初值的最大迭代次数。
+
+        processes : int
+            并行进程数，默认为 CPU 核数；为 1 时依次求解。
+
+        validate : callable
+            :code:`validate(nw)`，对收敛的结果做额外检查（可选），返回 False 时继续尝试下一组。
+
+        Returns
+        -------
+        start : str
+            采用的初值名称；所有初值都失败时为 None，网络保持未收敛。
+        """
+        starts = self.starts(mode, design_path)
+        data = pickle.dumps(self.nw)
+        args = [
+            (data, start, mode, design_path, max_iter) for _, start in starts
+        ]
+        names = [name for name, _ in starts]
+        rows = []
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            pool = _Pool(args, processes)
+            results = iter(pool)
+        else:
+            pool = None
+            results = ((i, _attempt(*arg)) for i, arg in enumerate(args))
+
+        try:
+            for index, result in results:
+                rows += [[
+                    names[index], result['converged'], result['valid'],
+                    result['iterations'], result['time']
+                ]]
+                if (result['valid']
+                        and self._finish(result['state'], mode, design_path, validate)):
+                    return names[index]
+        finally:
+            if pool is not None:
+                pool.close()
+            self.attempts = pd.DataFrame(rows, columns=_COLUMNS)
+        return None
+
+    def _finish(self, state, mode, design_path, validate):
+        """以收敛的结果为初值在原网络上完成求解。"""
+        apply_state(self.nw, state)
+        try:
+            self.nw.solve(mode, design_path=design_path)
+        except (ValueError, TESPyNetworkError):
+            self.nw.reset_topology_reduction_specifications()
+            return False
+        if not (self.nw.converged and parameters_within_bounds(self.nw)):
+            return False
+        return validate is None or validate(self.nw)
+
+
+class _Pool:
+    """在进程池中求解，按完成顺序迭代 (序号, 结果)；close 取消尚未开始的求解。"""
+
+    def __init__(self, args, processes):
+        context = multiprocessing.get_context('fork')
+        self.executor = ProcessPoolExecutor(processes, mp_context=context)
+        self.futures = {
+            self.executor.submit(_attempt, *arg): i for i, arg in enumerate(args)
+        }
+
+    def __iter__(self):
+        for future in as_completed(self.futures):
+            yield self.futures[future], future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _attempt(data, start, mode, design_path, max_iter):
+    """在网络副本上用一组初值求解（在子进程中运行），返回求解结果和各连接的状态。"""
+    nw = pickle.loads(data)
+    nw.set_attr(iterinfo=False)
+    t = time.perf_counter()
+    if 'values' in start:
+        apply_state(nw, start['values'])
+    try:
+        nw.solve(
+            mode, design_path=design_path, init_path=start.get('init_path'),
+            max_iter=max_iter
+        )
+    except (ValueError, TESPyNetworkError):
+        nw.reset_topology_reduction_specifications()
+    converged = bool(nw.converged)
+    result = {
+        'converged': converged,
+        'valid': converged and parameters_within_bounds(nw),
+        'iterations': nw.iter + 1,
+        'time': time.perf_counter() - t,
+        'state': None,
+    }
+    if result['valid']:
+        result['state'] = {
+            c.label: {
+                'm': c.m.val_SI, 'p': c.p.val_SI, 'h': c.h.val_SI,
+                'fluid': c.fluid.val.copy()
+            } for c in nw.conns['object']
+        }
+    return result
+
+
+def apply_state(nw, state):
+    r"""
+    把一组初值写入网络（SI 单位）。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        网络。
+
+    state : dict
+        连接标签到 {'m', 'p', 'h', 'fluid'} 的映射，缺少的量在求解时使用 TESPy 的通用初值。
+    """
+    for c in nw.conns['object']:
+        values = state.get(c.label, {})
+        for key in ['m', 'p', 'h']:
+            if key in values:
+                c.get_attr(key).val0 = hlp.convert_from_SI(
+                    key, values[key], nw.get_attr(f'{key}_unit')
+                )
+            else:
+                c.get_attr(key).val0 = np.nan
+        if 'fluid' in values:
+            c.fluid.val0 = values['fluid'].copy()
+        # 完整的状态（例如收敛的结果）直接作为迭代初值，否则由 TESPy 根据设定的温度等补充
+        c.good_starting_values = all(key in values for key in ['m', 'p', 'h'])
+
+
+def parameters_within_bounds(nw):
+    r"""
+    组件参数是否都在允许范围内。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        已求解的网络。
+
+    Returns
+    -------
+    valid : bool
+        判断条件与 TESPy 求解后的参数范围检查相同。
+    """
+    for cp in nw.comps['object']:
+        for param in cp.parameters:
+            data = cp.get_attr(param)
+            # 无法计算的参数（NaN）与 TESPy 相同，不视为越界
+            if isinstance(data, dc_cp) and (
+                    data.val > data.max_val + ERR or data.val < data.min_val - ERR):
+                return False
+    return True
+
+
+def heuristic_start(nw, mode='design', design_path=None):
+    r"""
+    按压力等级估计各连接的初值。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        参数设定完整的网络（不会被修改）。
+
+    Returns
+    -------
+    start : dict
+        连接标签到 {'m', 'p', 'h'} 的映射（SI 单位），无法估计的焓值不给出。
+    """
+    # 在副本上完成预处理，得到设定值的 SI 单位数值和工质数据
+    nw = pickle.loads(pickle.dumps(nw))
+    nw.set_attr(iterinfo=False)
+    apply_state(nw, {})
+    nw.solve(mode, design_path=design_path, init_only=True)
+    conns = list(nw.conns['object'])
+
+    level = _pressure_levels(nw)
+    rank = _level_ranks(nw, level)
+    T_set = [c.T.val_SI for c in conns if c.T.is_set]
+
+    pressure = {}
+    for c in conns:
+        if not c.p.is_var:
+            pressure[level[c]] = c.p.val_SI
+
+    # 纯工质回路中没有设定压力的等级按饱和压力分配
+    cycle = {}
+    for c in conns:
+        fluid = _two_phase_fluid(c)
+        if fluid is not None and level[c] not in pressure and T_set:
+            cycle.setdefault(fluid, set()).add(level[c])
+    for fluid, levels in cycle.items():
+        wrapper = [c for c in conns if level[c] in levels][0].fluid.wrapper[fluid]
+        low = min(rank[lv] for lv in levels)
+        high = max(rank[lv] for lv in levels)
+        T_low = max(min(T_set) - 5, wrapper._T_min + 1)
+        T_high = min(max(T_set) + 5, wrapper._T_crit - 5)
+        for lv in levels:
+            share = (rank[lv] - low) / max(high - low, 1)
+            pressure[lv] = wrapper.p_sat(T_low + (T_high - T_low) * share)
+    cycle_levels = set().union(*cycle.values())
+
+    # TESPy 只为每条支路保留一个质量流量变量，取支路上哪个连接的初值与集合的顺序有关，
+    # 因此同一支路上的连接使用相同的初值
+    m = {c: c.m.val_SI for c in conns}
+    for branch in nw.massflow_branches:
+        for c in branch['connections']:
+            m[c] = m[branch['connections'][0]]
+
+    start = {}
+    for c in conns:
+        p = c.p.val_SI if not c.p.is_var else pressure.get(level[c], c.p.val_SI)
+        start[c.label] = {'m': m[c], 'p': p}
+
+    for c in conns:
+        if not c.h.is_var:
+            continue
+        p = start[c.label]['p']
+        if level[c] in cycle_levels:
+            h = _cycle_enthalpy(c, p)
+        elif not c.T.is_set:
+            T = [q.T.val_SI for q in conns if q.T.is_set and level[q] is level[c]]
+            h = h_mix_pT(p, np.mean(T), c.fluid_data, c.mixing_rule) if T else None
+        else:
+            h = None
+        if h is not None:
+            start[c.label]['h'] = h
+
+    # 循环闭合器、合流器和分流器的出口与入口状态相同
+    for _ in range(len(conns)):
+        changed = False
+        for c in conns:
+            if c.h.is_var and 'h' not in start[c.label] and isinstance(c.source, _TRANSPARENT):
+                upstream = start[c.source.inl[0].label]
+                if 'h' in upstream:
+                    start[c.label]['h'] = upstream['h']
+                    changed = True
+        if not changed:
+            break
+    return start
+
+
+def _pressure_levels(nw):
+    """把压力相同（不经过升压或降压组件）的连接归为一个压力等级，返回连接到等级代表的映射。"""
+    parent = {c: c for c in nw.conns['object']}
+
+    def find(c):
+        while parent[c] is not c:
+            parent[c] = parent[parent[c]]
+            c = parent[c]
+        return c
+
+    for cp in nw.comps['object']:
+        if isinstance(cp, _RAISE + _LOWER):
+            continue
+        if len(cp.inl) == len(cp.outl):
+            # 换热器等组件的各侧分别相连
+            pairs = zip(cp.inl, cp.outl)
+        else:
+            conns = cp.inl + cp.outl
+            pairs = [(conns[0], c) for c in conns[1:]]
+        for a, b in pairs:
+            parent[find(a)] = find(b)
+    return {c: find(c) for c in parent}
+
+
+def _level_ranks(nw, level):
+    """按升压和降压组件给压力等级排序，返回等级到序号（越大压力越高）的映射。"""
+    edges = []
+    for cp in nw.comps['object']:
+        if isinstance(cp, _RAISE):
+            edges += [(level[cp.inl[0]], level[cp.outl[0]])]
+        elif isinstance(cp, _LOWER):
+            edges += [(level[cp.outl[0]], level[cp.inl[0]])]
+
+    levels = set(level.values())
+    rank = dict.fromkeys(levels, 0)
+    # 最长路径；有矛盾的环时序号不超过等级数
+    for _ in range(len(levels)):
+        for low, high in edges:
+            if low is not high and rank[high] <= rank[low] < len(levels):
+                rank[high] = rank[low] + 1
+    return rank
+
+
+def _two_phase_fluid(c):
+    """连接上为有两相区的纯工质时返回工质名称。"""
+    fluids = [f for f, x in c.fluid.val.items() if x > ERR]
+    if len(fluids) != 1:
+        return None
+    wrapper = c.fluid.wrapper[fluids[0]]
+    if getattr(wrapper, '_T_crit', None) is None:
+        return None
+    return fluids[0]
+
+
+def _cycle_enthalpy(c, p):
+    """纯工质回路中按连接所在位置估计焓值。"""
+    if p >= c.fluid.wrapper[_two_phase_fluid(c)]._p_crit:
+        return None
+    T_sat = T_sat_p(p, c.fluid_data)
+    if isinstance(c.target, Compressor) or (isinstance(c.source, Drum) and c.source_id == 'out2'):
+        return h_mix_pT(p, T_sat + 5, c.fluid_data, c.mixing_rule)
+    elif isinstance(c.source, Compressor):
+        return h_mix_pT(p, T_sat + 30, c.fluid_data, c.mixing_rule)
+    elif isinstance(c.target, Valve) or isinstance(c.source, Drum):
+        return h_mix_pQ(p, 0, c.fluid_data, c.mixing_rule)
+    elif isinstance(c.source, Valve) or isinstance(c.target, Drum):
+        return h_mix_pQ(p, 0.2, c.fluid_data, c.mixing_rule)
+    return None
@@ -2,6 +2,9 @@ from tespy.components import (Sink, Source, CombustionChamber,
                             Compressor, Turbine, SimpleHeatExchanger)
 from tespy.connections import Connection, Ref, Bus
 from tespy.networks import load_network, Network
+from tespy.tools.characteristics import CharMap
+from tespy.tools.characteristics import load_default_char as ldc
+from fast_chars import FastCharMap
 import shutil
 
 # 创建一个新的TESPy网络对象，并设置单位为bar（压力）、C（温度）、kJ/kg（比焓）
@@ -35,6 +38,11 @@ nw.add_conns(inc, cc, fp, pc, ct, outg)
 
 # 设置压缩机的设计参数和离设计工况下的性能特性
 c.set_attr(pr=10, eta_s=0.88, design=['eta_s', 'pr'], offdesign=['char_map_eta_s', 'char_map_pr'])
+# 压缩机特性图使用预先计算插值斜率的 FastCharMap，离设计工况每次牛顿迭代都要多次查表
+c.set_attr(
+    char_map_eta_s=FastCharMap.from_char(ldc('compressor', 'char_map_eta_s', 'DEFAULT', CharMap)),
+    char_map_pr=FastCharMap.from_char(ldc('compressor', 'char_map_pr', 'DEFAULT', CharMap))
+)
 # 设置涡轮机的设计参数和离设计工况下的性能特性
 t.set_attr(eta_s=0.9, design=['eta_s'], offdesign=['eta_s_char', 'cone'])
 # 设置燃烧室的过剩空气系数
@@ -0,0 +1,165 @@
+# 可中断、可恢复的 pygmo 优化
+# power_optimization.py 的 OptimizationProblem.run 在一个进程中连续进化 num_gen 代，
+# 进程崩溃或计算节点被抢占时已完成的各代全部丢失。CheckpointedOptimizationProblem 的用法与
+# OptimizationProblem 相同，run 另外接受检查点文件 checkpoint 和间隔 every：
+#   - 每 every 代把当前种群（各个体的决策变量和目标函数值）、individuals 表中已完成的各代、
+#     算法对象（包括其随机数发生器的状态）和种群的随机数种子写入一个 numpy .npz 压缩文件；
+#     先写临时文件再替换，写入过程中被中断也不会损坏已有的检查点；
+#   - 检查点文件存在时，run 从其中记录的代数继续，恢复的种群不重新计算目标函数；
+#   - 优化结束后写入最后一代，用同一个检查点再次运行时只重新整理结果。
+# 模型（TESPy 网络）由上一次求解的结果出发求解下一个个体，恢复后个别个体的迭代过程可能与
+# 不中断时不同，收敛的结果相同。
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pygmo as pg
+from tespy.tools.optimization import OptimizationProblem
+
+
+class CheckpointedOptimizationProblem(OptimizationProblem):
+    r"""
+    带检查点的 OptimizationProblem，参数与 OptimizationProblem 相同。
+
+    Note
+    ----
+    :code:`problem.run(algo, pop, num_ind, num_gen, checkpoint='_checkpoint.npz', every=10)`
+    每 10 代写入一次检查点；进程中断后以相同的参数再次运行即可从检查点继续。
+    """
+
+    def run(self, algo, pop, num_ind, num_gen, checkpoint=None, every=10):
+        r"""
+        运行优化算法，定期写入检查点。
+
+        Parameters
+        ----------
+        algo : pygmo.core.algorithm
+            PyGMO optimization algorithm.
+
+        pop : pygmo.core.population
+            PyGMO population. 从检查点继续时只使用其中的优化问题。
+
+        num_ind : int
+            Number of individuals.
+
+        num_gen : int
+            Number of generations.
+
+        checkpoint : str
+            检查点文件路径，None 时不写入检查点，与 OptimizationProblem.run 相同。
+
+        every : int
+            每隔多少代写入一次检查点。
+
+        Returns
+        -------
+        pop : pygmo.core.population
+            最后一代种群。
+        """
+        self._create_individuals(num_ind, num_gen)
+        start = 0
+        if checkpoint is not None and os.path.exists(checkpoint):
+            start, algo, pop = self._load_checkpoint(
+                checkpoint, pop, num_ind, num_gen
+            )
+
+        for gen in range(start, num_gen - 1):
+            if checkpoint is not None and gen > start and gen % every == 0:
+                self._save_checkpoint(checkpoint, gen, algo, pop)
+            self._process_generation_data(gen, pop)
+            self._print_champion(f'Evolution: {gen}', pop)
+            pop = algo.evolve(pop)
+
+        gen = max(num_gen - 1, 0)
+        self._process_generation_data(gen, pop)
+        self._print_champion(f'Final evolution: {gen}', pop)
+        if checkpoint is not None:
+            self._save_checkpoint(checkpoint, gen, algo, pop)
+        return pop
+
+    def _create_individuals(self, num_ind, num_gen):
+        """创建 individuals 表（与 OptimizationProblem.run 相同）。"""
+        self.individuals = pd.DataFrame(index=range(num_gen * num_ind))
+        self.individuals["gen"] = [
+            gen for gen in range(num_gen) for ind in range(num_ind)
+        ]
+        self.individuals["ind"] = [
+            ind for gen in range(num_gen) for ind in range(num_ind)
+        ]
+        self.individuals.set_index(["gen", "ind"], inplace=True)
+        self._num_ind = num_ind
+
+    def _print_champion(self, title, pop):
+        """打印当前最优个体（与 OptimizationProblem.run 相同）。"""
+        print(title)
+        for i, objective in enumerate(self.objective_list):
+            print(objective + ': {}'.format(round(pop.champion_f[i], 4)))
+        for i, variable in enumerate(self.variable_list):
+            print(variable + ': {}'.format(round(pop.champion_x[i], 4)))
+
+    def _columns(self):
+        return self.variable_list + self.objective_list + self.constraint_list
+
+    def _save_checkpoint(self, path, gen, algo, pop):
+        r"""
+        写入检查点。
+
+        Parameters
+        ----------
+        path : str
+            检查点文件路径。
+
+        gen : int
+            种群 pop 的代数，individuals 表中只保存在它之前的各代。
+        """
+        columns = self._columns()
+        values = self.individuals.reindex(columns=columns).to_numpy(float)
+        data = {
+            'gen': gen,
+            'x': pop.get_x(),
+            'f': pop.get_f(),
+            'seed': pop.get_seed(),
+            'individuals': values[:gen * self._num_ind],
+            'algorithm': np.frombuffer(pickle.dumps(algo), dtype=np.uint8),
+        }
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, **data)
+        os.replace(tmp, path)
+
+    def _load_checkpoint(self, path, pop, num_ind, num_gen):
+        r"""
+        读取检查点，恢复 individuals 表。
+
+        Returns
+        -------
+        checkpoint : tuple
+            (种群的代数, 算法, 种群)。
+        """
+        with np.load(path) as data:
+            gen = int(data['gen'])
+            x, f = data['x'], data['f']
+            seed = int(data['seed'])
+            values = data['individuals']
+            algo = pickle.loads(data['algorithm'].tobytes())
+
+        if len(x) != num_ind or gen > num_gen - 1:
+            msg = (
+                f'Checkpoint {path} holds {len(x)} individuals at generation '
+                f'{gen}, which does not match num_ind={num_ind} and '
+                f'num_gen={num_gen}.'
+            )
+            raise ValueError(msg)
+
+        restored = pg.population(pop.problem, seed=seed)
+        for xi, fi in zip(x, f):
+            restored.push_back(xi, fi)
+
+        columns = self._columns()
+        table = np.full((len(self.individuals), len(columns)), np.nan)
+        table[:len(values)] = values
+        self.individuals[columns] = table
+        print(f'Resuming from checkpoint {path} at evolution {gen}')
+        return gen, algo, restored
@@ -0,0 +1,283 @@
+# 使用 __slots__ 的 组件/连接 参数容器
+# 在生成含有成千上万个 Pipe 和 SimpleHeatExchanger 的区域供热管网时，
+# 每个参数对象自带的 __dict__ 会占用大量内存。
+# 这里的容器只保存 set_attr 所需的参数（pr, zeta, Q, kA, ks, L, D, Tamb 等），
+# 需要时再生成 TESPy 组件和连接。
+# ParameterTable 则采用 "数组结构"（struct-of-arrays）布局，每个参数一列 NumPy 数组。
+# 注意：build 生成的是普通的 TESPy 组件，生成之后的内存占用与直接创建组件相同，
+# 容器只在生成组件之前（例如批量生成、筛选和修改大量管网方案时）节省内存。
+
+import numpy as np
+
+from tespy.components import Pipe, SimpleHeatExchanger
+from tespy.connections import Connection
+
+
+class ComponentSpec:
+    """组件参数容器的基类，子类通过 __slots__ 声明可用参数。"""
+    __slots__ = ("label",)
+    component = None
+
+    def __init__(self, label, **kwargs):
+        self.label = label
+        for key in self.params():
+            setattr(self, key, kwargs.pop(key, None))
+        if kwargs:
+            msg = f"{self.__class__.__name__} 不支持参数: {', '.join(kwargs)}"
+            raise KeyError(msg)
+
+    @classmethod
+    def params(cls):
+        """返回该容器支持的全部参数名（不含 label）。"""
+        return [
+            key for klass in reversed(cls.__mro__)
+            for key in getattr(klass, "__slots__", ()) if key != "label"
+        ]
+
+    def set_attr_kwargs(self):
+        """返回所有已设置参数的字典，可直接传入 set_attr。
+
+        Returns
+        -------
+        kwargs : dict
+            参数名到参数值的映射，未设置（None）的参数不包含在内。
+        """
+        return {
+            key: getattr(self, key) for key in self.params()
+            if getattr(self, key) is not None
+        }
+
+    def build(self):
+        """生成对应的 TESPy 组件并设置参数。
+
+        Returns
+        -------
+        component : tespy.components.component.Component
+            已参数化的 TESPy 组件。
+        """
+        comp = self.component(self.label)
+        comp.set_attr(**self.set_attr_kwargs())
+        return comp
+
+
+class SimpleHeatExchangerSpec(ComponentSpec):
+    """SimpleHeatExchanger 的参数容器（参数含义见 heat_exchangers_simple.py）。"""
+    __slots__ = ("Q", "pr", "zeta", "D", "L", "ks", "kA", "Tamb")
+    component = SimpleHeatExchanger
+
+
+class PipeSpec(SimpleHeatExchangerSpec):
+    """Pipe 的参数容器（参数含义见 pipe.py）。"""
+    __slots__ = ()
+    component = Pipe
+
+
+class ConnectionSpec:
+    """连接参数容器，保存端口信息和 set_attr 所需的状态参数。"""
+    __slots__ = (
+        "label", "source", "outlet", "target", "inlet",
+        "m", "p", "h", "T", "fluid"
+    )
+
+    def __init__(self, source, outlet, target, inlet, label=None, **kwargs):
+        self.label = label
+        self.source = source
+        self.outlet = outlet
+        self.target = target
+        self.inlet = inlet
+        for key in ("m", "p", "h", "T", "fluid"):
+            setattr(self, key, kwargs.pop(key, None))
+        if kwargs:
+            msg = f"ConnectionSpec 不支持参数: {', '.join(kwargs)}"
+            raise KeyError(msg)
+
+    def set_attr_kwargs(self):
+        """返回所有已设置状态参数的字典，可直接传入 set_attr。"""
+        return {
+            key: getattr(self, key) for key in ("m", "p", "h", "T", "fluid")
+            if getattr(self, key) is not None
+        }
+
+    def build(self, comps):
+        """生成 TESPy 连接。
+
+        Parameters
+        ----------
+        comps : dict
+            组件标签到 TESPy 组件对象的映射。
+
+        Returns
+        -------
+        conn : tespy.connections.connection.Connection
+            已参数化的 TESPy 连接。
+        """
+        kwargs = {} if self.label is None else {"label": self.label}
+        conn = Connection(
+            comps[self.source], self.outlet, comps[self.target], self.inlet,
+            **kwargs
+        )
+        conn.set_attr(**self.set_attr_kwargs())
+        return conn
+
+
+class ParameterTable:
+    """同类组件参数的数组结构（struct-of-arrays）存储。
+
+    数值参数每个一列 float64 数组，未设置的参数用 NaN 表示，
+    5000 个组件只需要少量几个 NumPy 数组，而不是 5000 个 Python 对象。
+    含有非数值（例如 D="var"）的参数保存为 object 数组，未设置的参数为 None。
+
+    Parameters
+    ----------
+    spec : type
+        参数容器类，例如 PipeSpec 或 SimpleHeatExchangerSpec。
+
+    labels : list
+        组件标签列表。
+
+    kwargs : dict
+        参数名到数值序列（长度与 labels 相同）或标量的映射。
+    """
+
+    def __init__(self, spec, labels, **kwargs):
+        self.spec = spec
+        self.labels = list(labels)
+        n = len(self.labels)
+        self.columns = {}
+        for key in spec.params():
+            values = kwargs.pop(key, np.nan)
+            if np.asarray(values).dtype.kind in "biuf":
+                column = np.empty(n, dtype=float)
+            else:
+                column = np.full(n, None, dtype=object)
+            column[:] = values
+            self.columns[key] = column
+        if kwargs:
+            msg = f"{spec.__name__} 不支持参数: {', '.join(kwargs)}"
+            raise KeyError(msg)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def set_attr_kwargs(self, i):
+        """返回第 i 个组件已设置参数的字典。"""
+        kwargs = {}
+        for key, column in self.columns.items():
+            value = column[i]
+            if column.dtype == object:
+                if value is not None and not _is_nan(value):
+                    kwargs[key] = value
+            elif not np.isnan(value):
+                kwargs[key] = float(value)
+        return kwargs
+
+    def spec_at(self, i):
+        """返回第 i 个组件对应的 __slots__ 参数容器。"""
+        return self.spec(self.labels[i], **self.set_attr_kwargs(i))
+
+    def build(self):
+        """生成所有组件。
+
+        Returns
+        -------
+        comps : dict
+            组件标签到已参数化 TESPy 组件的映射。
+        """
+        comps = {}
+        for i, label in enumerate(self.labels):
+            comp = self.spec.component(label)
+            comp.set_attr(**self.set_attr_kwargs(i))
+            comps[label] = comp
+        return comps
+
+
+def _is_nan(value):
+    """object 数组中的数值 NaN 同样表示未设置。"""
+    return isinstance(value, float) and np.isnan(value)
+
+
+class _DictSpec:
+    """对照组：使用普通 __dict__ 保存参数的容器。"""
+
+    def __init__(self, label, **kwargs):
+        self.label = label
+        for key in PipeSpec.params():
+            setattr(self, key, kwargs.get(key))
+
+
+def _measure(factory):
+    """返回 factory 创建的对象所占用的内存（字节）。"""
+    import tracemalloc
+
+    tracemalloc.start()
+    obj = factory()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+if __name__ == "__main__":
+    # 内存基准测试：5000 个组件的区域供热管网参数
+    # 一半为管道（进水管/回水管），一半为用户换热器
+    n = 5000
+    half = n // 2
+    rng = np.random.default_rng(42)
+    L = rng.uniform(50, 500, half)
+    Q = -rng.uniform(5e3, 5e4, n - half)
+
+    def dict_based():
+        return (
+            [_DictSpec(f"pipe {i}", L=L[i], D="var", ks=5e-5, Tamb=0, kA=500)
+             for i in range(half)]
+            + [_DictSpec(f"consumer {i}", Q=Q[i], pr=0.98)
+               for i in range(n - half)]
+        )
+
+    def slots_based():
+        return (
+            [PipeSpec(f"pipe {i}", L=L[i], D="var", ks=5e-5, Tamb=0, kA=500)
+             for i in range(half)]
+            + [SimpleHeatExchangerSpec(f"consumer {i}", Q=Q[i], pr=0.98)
+               for i in range(n - half)]
+        )
+
+    def table_based():
+        # 直径为变量 "var" 的管道保存在 object 数组中
+        return (
+            ParameterTable(
+                PipeSpec, [f"pipe {i}" for i in range(half)],
+                L=L, D="var", ks=5e-5, Tamb=0, kA=500
+            ),
+            ParameterTable(
+                SimpleHeatExchangerSpec,
+                [f"consumer {i}" for i in range(n - half)], Q=Q, pr=0.98
+            )
+        )
+
+    def tespy_based():
+        # 对照组：直接创建 TESPy 组件
+        comps = []
+        for i in range(half):
+            comp = Pipe(f"pipe {i}")
+            comp.set_attr(L=L[i], D="var", ks=5e-5, Tamb=0, kA=500)
+            comps += [comp]
+        for i in range(n - half):
+            comp = SimpleHeatExchanger(f"consumer {i}")
+            comp.set_attr(Q=Q[i], pr=0.98)
+            comps += [comp]
+        return comps
+
+    tables = table_based()
+
+    def table_built():
+        return [table.build() for table in tables]
+
+    print(f"参数容器内存占用（{n} 个组件）:")
+    for name, factory in [
+            ("__dict__", dict_based), ("__slots__", slots_based),
+            ("struct-of-arrays", table_based), ("TESPy", tespy_based),
+            ("table.build()", table_built)]:
+        size = _measure(factory)
+        print(f"  {name:<18} {size / 1024:10.1f} KiB  {size / n:8.1f} B/组件")
+    # 生成的组件与直接创建的组件相同，内存节省只存在于生成组件之前
@@ -0,0 +1,241 @@
+# 由完整离设计模型生成的部分负荷代理模型
+# 在试验设计（DoE）网格上逐点求解完整的离设计网络，记录 COP、压缩机功率、出口温度等结果，
+# 再用多元多项式（输入缩放到 [-1, 1]，最小二乘拟合）建立降阶模型。
+# 代理模型只包含系数数组，一次可计算数百万个工况点，适合调度优化；
+# 可保存为 JSON，在不安装 TESPy 的进程中直接加载使用。
+
+import itertools
+import json
+
+import numpy as np
+import pandas as pd
+
+
+def run_doe(nw, inputs, outputs, design_path, init_path=None):
+    """在全因子网格上求解离设计工况。
+
+    网格按蛇形顺序遍历，相邻两次求解的工况只差一个网格步长。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        已完成设计计算的网络。
+
+    inputs : dict
+        输入名称到 (设置函数, 取值数组) 的映射，设置函数接收一个数值并修改网络参数，
+        例如 :code:`{'Q': (lambda Q: cons.set_attr(Q=Q), Q_range)}`。
+
+    outputs : dict
+        输出名称到函数的映射，函数在求解后调用并返回一个数值。
+
+    design_path : str
+        设计工况文件路径。
+
+    init_path : str
+        第一次求解的初值文件路径（可选），之后以上一个收敛工况的结果作为初值。
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        每个网格点一行，列为各输入和输出；未收敛的工况输出为 NaN。
+    """
+    # 只在求解时需要 TESPy，代理模型本身可以在不安装 TESPy 的进程中加载
+    from tespy.tools.helpers import TESPyNetworkError
+
+    names = list(inputs)
+    axes = [np.asarray(inputs[name][1], dtype=float) for name in names]
+
+    rows = []
+    state = None
+    for point in _serpentine(axes):
+        for name, value in zip(names, point):
+            inputs[name][0](value)
+        row = dict(zip(names, point))
+        try:
+            nw.solve("offdesign", design_path=design_path, init_path=init_path)
+            converged = nw.converged
+        except (ValueError, ZeroDivisionError, TESPyNetworkError):
+            # 求解中断时 TESPy 不会撤销拓扑简化，需要手动恢复
+            nw.reset_topology_reduction_specifications()
+            converged = False
+        init_path = None
+
+        if converged:
+            state = save_state(nw)
+        elif state is not None:
+            # 下一个工况从上一个收敛工况开始，而不是从发散的结果开始
+            restore_state(state)
+
+        for key, func in outputs.items():
+            row[key] = func() if converged else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def save_state(nw):
+    """保存各连接的质量流量、压力和比焓（SI 单位）。"""
+    return [
+        (c, c.m.val_SI, c.p.val_SI, c.h.val_SI) for c in nw.conns["object"]
+    ]
+
+
+def restore_state(state):
+    """恢复 save_state 保存的连接参数，作为下一次求解的初值。"""
+    for c, m, p, h in state:
+        c.m.val_SI, c.p.val_SI, c.h.val_SI = m, p, h
+
+
+def _serpentine(axes):
+    """按蛇形顺序返回全因子网格上的所有点。"""
+    if len(axes) == 1:
+        return [(value,) for value in axes[0]]
+    points = []
+    inner = _serpentine(axes[1:])
+    for i, value in enumerate(axes[0]):
+        order = inner if i % 2 == 0 else inner[::-1]
+        points += [(value,) + rest for rest in order]
+    return points
+
+
+class PolynomialSurrogate:
+    """多元多项式代理模型。
+
+    Parameters
+    ----------
+    inputs : list
+        输入名称。
+
+    outputs : list
+        输出名称。
+
+    lower, upper : ndarray
+        各输入的拟合范围，用于缩放到 [-1, 1]。
+
+    exponents : ndarray
+        多项式各项的指数，形状为 (项数, 输入数)。
+
+    coefficients : ndarray
+        多项式系数，形状为 (项数, 输出数)。
+    """
+
+    def __init__(self, inputs, outputs, lower, upper, exponents, coefficients):
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.exponents = np.asarray(exponents, dtype=int)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+
+    @classmethod
+    def fit(cls, df, inputs, outputs, degree=3):
+        """用 DoE 结果拟合代理模型，未收敛（含 NaN）的行被忽略。
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            run_doe 的结果。
+
+        inputs : list
+            输入列名。
+
+        outputs : list
+            输出列名。
+
+        degree : int
+            多项式总次数，项数不能超过有效数据点数。
+
+        Returns
+        -------
+        surrogate : PolynomialSurrogate
+            拟合好的代理模型，拟合残差的均方根保存在 rmse 中。
+        """
+        data = df[list(inputs) + list(outputs)].dropna()
+        X = data[list(inputs)].to_numpy(dtype=float)
+        Y = data[list(outputs)].to_numpy(dtype=float)
+
+        exponents = np.array([
+            e for e in itertools.product(range(degree + 1), repeat=len(inputs))
+            if sum(e) <= degree
+        ])
+        if len(exponents) > len(X):
+            msg = (
+                f"{degree} 次多项式有 {len(exponents)} 项，"
+                f"但只有 {len(X)} 个收敛的工况点，请降低次数或加密网格。"
+            )
+            raise ValueError(msg)
+
+        surrogate = cls(
+            inputs, outputs, X.min(axis=0), X.max(axis=0), exponents,
+            np.zeros((len(exponents), len(outputs)))
+        )
+        A = surrogate._basis(X)
+        surrogate.coefficients = np.linalg.lstsq(A, Y, rcond=None)[0]
+        residual = A @ surrogate.coefficients - Y
+        surrogate.rmse = {
+            name: float(value) for name, value
+            in zip(outputs, np.sqrt((residual ** 2).mean(axis=0)))
+        }
+        return surrogate
+
+    def _basis(self, X):
+        """计算多项式各项在缩放后输入上的值，返回形状为 (点数, 项数) 的数组。"""
+        span = np.where(self.upper > self.lower, self.upper - self.lower, 1.0)
+        Xs = 2 * (X - self.lower) / span - 1
+        degree = self.exponents.max()
+        # 每个输入的 0..degree 次幂只计算一次
+        powers = []
+        for j in range(len(self.inputs)):
+            power = [np.ones(len(X))]
+            for _ in range(degree):
+                power.append(power[-1] * Xs[:, j])
+            powers.append(power)
+        # 按列存储，逐项相乘时访问连续内存
+        A = np.empty((len(X), len(self.exponents)), order="F")
+        for k, exponent in enumerate(self.exponents):
+            column = powers[0][exponent[0]]
+            for j in range(1, len(self.inputs)):
+                column = column * powers[j][exponent[j]]
+            A[:, k] = column
+        return A
+
+    def __call__(self, **inputs):
+        """计算代理模型。
+
+        Parameters
+        ----------
+        inputs : float, ndarray
+            各输入的值，按名称传入，可以是标量或相同形状的数组。
+
+        Returns
+        -------
+        result : dict
+            输出名称到数组（与输入形状相同）的映射。
+        """
+        values = np.broadcast_arrays(
+            *[np.asarray(inputs[name], dtype=float) for name in self.inputs]
+        )
+        shape = values[0].shape
+        X = np.column_stack([v.ravel() for v in values])
+        Y = self._basis(X) @ self.coefficients
+        return {
+            name: Y[:, k].reshape(shape) for k, name in enumerate(self.outputs)
+        }
+
+    def to_json(self, path):
+        """保存代理模型。"""
+        data = {
+            "inputs": self.inputs,
+            "outputs": self.outputs,
+            "lower": self.lower.tolist(),
+            "upper": self.upper.tolist(),
+            "exponents": self.exponents.tolist(),
+            "coefficients": self.coefficients.tolist(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def from_json(cls, path):
+        """加载 to_json 保存的代理模型。"""
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
@@ -7,17 +7,22 @@ import pygmo as pg
 
 from tespy.components import CycleCloser, Sink, Source, Condenser, Desuperheater, SimpleHeatExchanger, Merge, Splitter, Pump, Turbine
 from tespy.connections import Bus, Connection
-from tespy.networks import Network
-from tespy.tools.optimization import OptimizationProblem
+
+from property_cache import CachedCoolPropWrapper
+from optimization_checkpoint import CheckpointedOptimizationProblem
+from screening import ScreeningNetwork, bus_value, objective_bounds
 
 class SamplePlant:
     """Class template for TESPy model usage in optimization module."""
     def __init__(self):
         # 创建一个新的网络实例，并设置单位为巴(bar)、摄氏度(Celsius)、千焦耳每千克(kJ/kg)，关闭迭代信息显示
-        self.nw = Network()
+        self.nw = ScreeningNetwork()
         self.nw.set_attr(
             p_unit="bar", T_unit="C", h_unit="kJ / kg", iterinfo=False
         )
+        # 筛选计算的回调函数和宽松的收敛判据（见 screening.py），默认与 Network 相同
+        self.callback = None
+        self.tol = None
         
         # 定义组件
         # 主循环
@@ -113,11 +118,19 @@ class SamplePlant:
         dsh.set_attr(pr1=0.99, pr2=0.99)
 
         # 设置初始条件
-        c1.set_attr(m=200, T=650, p=100, fluid={"water": 1})  # 流量200kg/s，温度650°C，压力100bar，纯水
+        # 流量200kg/s，温度650°C，压力100bar，纯水；性质调用结果由 CachedCoolPropWrapper 缓存
+        c1.set_attr(
+            m=200, T=650, p=100, fluid={"water": 1},
+            fluid_engines={"water": CachedCoolPropWrapper}
+        )
         c2.set_attr(p=20)                                     # 压力20bar
         c4.set_attr(p=3)                                      # 压力3bar
 
-        c41.set_attr(T=20, p=3, fluid={"INCOMP::Water": 1})     # 温度20°C，压力3bar，不可压缩水
+        # 温度20°C，压力3bar，不可压缩水
+        c41.set_attr(
+            T=20, p=3, fluid={"INCOMP::Water": 1},
+            fluid_engines={"Water": CachedCoolPropWrapper}
+        )
         c42.set_attr(T=28, p0=3, h0=100)                     # 温度28°C，初始压力3bar，初始比焓100kJ/kg
 
         # 参数化
@@ -184,9 +197,11 @@ class SamplePlant:
     
         self.solved = False
         try:
-            self.nw.solve("design")
+            self.nw.solve("design", callback=self.callback, tol=self.tol)
             if not self.nw.converged:
-                self.nw.solve("design", init_only=True, init_path=self.stable)
+                # 被筛选终止的候选点已接近收敛，直接作为下一个候选点的初值
+                if not self.nw.stopped:
+                    self.nw.solve("design", init_only=True, init_path=self.stable)
             else:
                 # 可能需要更多的检查！
                 if (
@@ -231,6 +246,11 @@ class SamplePlant:
 
 plant = SamplePlant()
 plant.get_objective("efficiency")
+# 筛选：目标函数 1/η 大于 2.28（约为可行候选点的中位数，设计点为 2.234）的候选点进入牛顿法的
+# 二次收敛范围后即停止迭代，目标函数记为 nan；设置 plant.tol = 1e-4 可进一步放宽收敛判据
+plant.callback = objective_bounds(
+    lambda nw: bus_value(nw, "heat") / bus_value(nw, "power"), upper=2.28
+)
 variables = {
     "Connections": {
         "2": {"p": {"min": 1, "max": 40}},  # 连接2的压力范围：1到40 bar
@@ -246,7 +266,7 @@ constraints = {
     "ref1": ["Connections", "4", "p"]     # 引用值 ref1 是连接4的压力
 }
 
-optimize = OptimizationProblem(
+optimize = CheckpointedOptimizationProblem(
     plant, variables, constraints, objective="efficiency"
 )
 
@@ -260,7 +280,10 @@ algo = pg.algorithm(pg.ihs(gen=3, seed=42))
 # 创建初始种群
 pop = pg.population(pg.problem(optimize), size=num_ind, seed=42)
 
-optimize.run(algo, pop, num_ind, num_gen)
+# 每 10 代写入一次检查点，中断后再次运行本脚本即从检查点继续；重新开始优化时删除该文件
+pop = optimize.run(
+    algo, pop, num_ind, num_gen, checkpoint="_checkpoint.npz", every=10
+)
 
 # %%[sec_5]
 # 访问结果
@@ -0,0 +1,230 @@
+# 批量报告渲染：在多个进程中用 Agg 后端无界面地绘制参数扫描结果
+# 每个绘图任务由一个字典描述：
+#   kind   : 'parametric'（参数散点图）、'logph' / 'Ts'（工质性质图）或 'sankey'（㶲桑基图）
+#   data   : 扫描结果文件（parametric 为 CSV，其余为 JSON）
+#   output : 输出文件路径
+#   其余键作为绘图选项传给对应的渲染函数
+# 输入数据和选项的哈希值保存在清单文件中，未发生变化的图不会重新绘制。
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+MANIFEST = ".report_manifest.json"
+
+
+def _init_worker():
+    """工作进程初始化：在导入 pyplot 之前切换到无界面的 Agg 后端。"""
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_parametric(data, output, x, y, xlabel=None, ylabel=None,
+                       colors=None, figsize=(16, 8), fontsize=18):
+    """绘制参数扫描散点图（参见 gas_turbine.py 的 gas_turbine_parametric.svg）。
+
+    图为 len(y) 行、len(x) 列的网格，第 i 行第 j 列为 y[i] 随 x[j] 的变化，
+    只使用两列均不为 NaN 的行，因此多个扫描可以保存在同一个 CSV 文件中。
+    """
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    df = pd.read_csv(data)
+    xlabel = xlabel or x
+    ylabel = ylabel or y
+    colors = colors or ["#1f567d", "#18a999", "#b54036", "#ffc107"]
+
+    plt.rc("font", **{"size": fontsize})
+    fig, ax = plt.subplots(
+        len(y), len(x), figsize=figsize, sharex="col", sharey="row",
+        squeeze=False
+    )
+    for i, ycol in enumerate(y):
+        for j, xcol in enumerate(x):
+            valid = df[[xcol, ycol]].dropna()
+            ax[i, j].scatter(
+                valid[xcol], valid[ycol], s=100, color=colors[i % len(colors)]
+            )
+            ax[i, j].grid()
+            ax[i, j].set_axisbelow(True)
+        ax[i, 0].set_ylabel(ylabel[i])
+    for j in range(len(x)):
+        ax[-1, j].set_xlabel(xlabel[j])
+
+    plt.tight_layout()
+    fig.savefig(output)
+    plt.close(fig)
+
+
+def _render_diagram(data, output, kind, x_min, x_max, y_min, y_max,
+                    figsize=(16, 10)):
+    """绘制 h-log(p) 图或 T-s 图及各组件的状态变化曲线。
+
+    JSON 数据包含 'fluid'、'units'、可选的 'isolines' 以及
+    'components'（标签到 get_plotting_data() 参数字典的映射）。
+    """
+    import matplotlib.pyplot as plt
+
+    from isoline_cache import cached_diagram, calc_component_isolines
+
+    with open(data, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    diagram = cached_diagram(
+        spec["fluid"], spec["units"], spec.get("isolines")
+    )
+    result_dict = calc_component_isolines(diagram, spec["components"])
+
+    xprop, yprop = ("h", "p") if kind == "logph" else ("s", "T")
+    fig, ax = plt.subplots(1, figsize=figsize)
+    diagram.draw_isolines(
+        fig, ax, kind, x_min=x_min, x_max=x_max, y_min=y_min, y_max=y_max
+    )
+    for values in result_dict.values():
+        datapoints = values["datapoints"]
+        ax.plot(datapoints[xprop], datapoints[yprop], color="#ff0000")
+        ax.scatter(datapoints[xprop][0], datapoints[yprop][0], color="#ff0000")
+
+    plt.tight_layout()
+    fig.savefig(output)
+    plt.close(fig)
+
+
+def _render_sankey(data, output, node_color="orange", pad=11):
+    """由 generate_plotly_sankey_input() 的结果（JSON: links, nodes）生成 HTML 桑基图。"""
+    import plotly.graph_objects as go
+
+    with open(data, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    fig = go.Figure(go.Sankey(
+        arrangement="snap",
+        node={"label": spec["nodes"], "pad": pad, "color": node_color},
+        link=spec["links"]
+    ))
+    fig.write_html(output)
+
+
+RENDERERS = {
+    "parametric": _render_parametric,
+    "logph": _render_diagram,
+    "Ts": _render_diagram,
+    "sankey": _render_sankey,
+}
+
+
+def _render(job):
+    """在工作进程中渲染单个任务。"""
+    job = dict(job)
+    kind = job.pop("kind")
+    if kind in ["logph", "Ts"]:
+        job["kind"] = kind
+    directory = os.path.dirname(job["output"])
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    RENDERERS[kind](**job)
+    return job["output"]
+
+
+def job_hash(job):
+    """返回任务输入数据和绘图选项的哈希值。"""
+    digest = hashlib.sha256()
+    with open(job["data"], "rb") as f:
+        digest.update(f.read())
+    options = {k: v for k, v in job.items() if k not in ["data", "output"]}
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render_reports(jobs, workers=None, manifest=MANIFEST, force=False):
+    """并行渲染所有绘图任务，跳过输入未变化的图。
+
+    Parameters
+    ----------
+    jobs : list
+        绘图任务字典的列表。
+
+    workers : int
+        工作进程数，默认为 CPU 核数。
+
+    manifest : str
+        保存各输出文件输入哈希值的清单文件。
+
+    force : boolean
+        为 True 时忽略清单，重新绘制所有图。
+
+    Returns
+    -------
+    summary : dict
+        'rendered' 和 'skipped' 输出文件列表。
+
+    Note
+    ----
+    某个任务出错时其余任务照常完成，已完成的图写入清单后再抛出第一个错误，
+    下次运行只重新绘制出错和未完成的图。
+    """
+    known = {}
+    if os.path.isfile(manifest) and not force:
+        with open(manifest, encoding="utf-8") as f:
+            known = json.load(f)
+
+    pending = []
+    hashes = {}
+    skipped = []
+    for job in jobs:
+        if job["kind"] not in RENDERERS:
+            msg = (
+                f"未知的绘图类型 '{job['kind']}'，"
+                f"可选: {', '.join(RENDERERS)}。"
+            )
+            raise ValueError(msg)
+        hashes[job["output"]] = job_hash(job)
+        if (
+                known.get(job["output"]) == hashes[job["output"]]
+                and os.path.isfile(job["output"])):
+            skipped.append(job["output"])
+        else:
+            pending.append(job)
+
+    done = set()
+    errors = []
+    if pending:
+        try:
+            with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker) as pool:
+                futures = [pool.submit(_render, job) for job in pending]
+                for future in as_completed(futures):
+                    try:
+                        output = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    known[output] = hashes[output]
+                    done.add(output)
+        finally:
+            # 中断或出错时也记录已完成的图
+            with open(manifest, "w", encoding="utf-8") as f:
+                json.dump(known, f, indent=2)
+
+    if errors:
+        raise errors[0]
+
+    rendered = [job["output"] for job in pending if job["output"] in done]
+    return {"rendered": rendered, "skipped": skipped}
+
+
+if __name__ == "__main__":
+    # 用法: python report_renderer.py report.json
+    # report.json 为绘图任务列表
+    import sys
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        jobs = json.load(f)
+
+    summary = render_reports(jobs)
+    print(
+        f"已绘制 {len(summary['rendered'])} 张图，"
+        f"跳过 {len(summary['skipped'])} 张未变化的图。"
+    )
@@ -0,0 +1,197 @@
+# 筛选计算：按目标函数提前终止迭代和宽松的收敛判据
+# 优化和粗扫描（例如 power_optimization.py 的 OptimizationProblem）中的大多数候选点只需要判断
+# 目标函数是否落在感兴趣的范围内，但 Network 总是迭代到残差范数小于 ERR ** 0.5，
+# 热效率明显偏低的候选点也要完整求解。ScreeningNetwork 的方程和步长控制与 GlobalizedNetwork 相同，
+# solve 另外接受两个参数：
+#   - callback：每次迭代后以网络为参数调用，返回 True 时停止迭代；
+#     objective_bounds 生成按目标函数范围提前终止的回调函数，
+#     bus_value 在迭代过程中计算总线的功率（总线的 P.val 只在求解结束后更新）；
+#   - tol：宽松的收敛判据，牛顿步使各变量的相对变化都小于 tol 时即认为收敛，
+#     不再要求残差范数小于 ERR ** 0.5（牛顿法在解附近二次收敛，此时变量的相对误差约为 tol 的平方）。
+# 提前终止的求解 converged 为 False、stopped 为 True，不计算结果表。
+
+from time import time
+
+import numpy as np
+from numpy.linalg import norm
+from tespy.tools.logger import logger
+
+from globalization import GlobalizedNetwork
+
+
+class ScreeningNetwork(GlobalizedNetwork):
+    r"""
+    可以提前终止迭代的 GlobalizedNetwork，用法与 Network 相同。
+
+    Note
+    ----
+    :code:`nw.solve(mode, ..., callback=None, tol=None)` 的其他参数与 Network.solve 相同，
+    callback 和 tol 只对本次求解有效。
+
+    - :code:`nw.stopped`：最近一次求解是否被 callback 终止；
+    - :code:`nw.relative_step`：最近一次迭代的牛顿步中各变量相对变化的最大值。
+    """
+
+    def set_defaults(self):
+        """设置网络默认属性和筛选参数。"""
+        super().set_defaults()
+        self._set_screening_defaults()
+
+    def _set_screening_defaults(self):
+        self.callback = None
+        self.tol = None
+        self.stopped = False
+        self.relative_step = np.inf
+
+    @classmethod
+    def from_network(cls, nw, globalization=None):
+        """复制一个已有的网络，见 GlobalizedNetwork.from_network。"""
+        copy = super().from_network(nw, globalization)
+        copy._set_screening_defaults()
+        return copy
+
+    def solve(self, mode, *args, callback=None, tol=None, **kwargs):
+        r"""
+        求解网络。
+
+        Parameters
+        ----------
+        callback : function
+            每次迭代后调用 :code:`callback(nw)`，返回 True 时停止迭代。
+
+        tol : float
+            宽松的收敛判据：牛顿步中各变量的相对变化都小于 tol 时认为收敛，
+            默认（None）与 Network 相同。
+
+        Note
+        ----
+        其他参数与 Network.solve 相同。
+        """
+        self.callback = callback
+        self.tol = tol
+        self.stopped = False
+        self.relative_step = np.inf
+        try:
+            return super().solve(mode, *args, **kwargs)
+        finally:
+            self.callback = None
+            self.tol = None
+
+    def solve_loop(self, print_results=True):
+        """牛顿迭代，solve_control 判定收敛或被 callback 终止时提前结束。"""
+        try:
+            super().solve_loop(print_results)
+        except _Finished:
+            # Network.solve_loop 在 solve_control 之后记录的残差
+            self.residual_history = np.append(
+                self.residual_history, norm(self.residual)
+            )
+            self.end_time = time()
+            if self.iterinfo:
+                self.iterinfo_body(print_results)
+                self.iterinfo_tail(print_results)
+
+    def solve_control(self):
+        """一次牛顿迭代，之后检查宽松的收敛判据和 callback。"""
+        super().solve_control()
+        if self.lin_dep:
+            return
+
+        if (self.tol is not None and self.iter >= self.min_iter - 1
+                and self.relative_step < self.tol):
+            self.converged = True
+            raise _Finished
+
+        if self.callback is not None and self.callback(self):
+            self.stopped = True
+            msg = (
+                f'Calculation stopped by callback after {self.iter + 1} '
+                'iterations.'
+            )
+            logger.info(msg)
+            raise _Finished
+
+    def matrix_inversion(self):
+        """求解牛顿步，并记录各变量的最大相对变化。"""
+        super().matrix_inversion()
+        screening = self.tol is not None or self.callback is not None
+        if screening and not self.lin_dep:
+            scale = self._scale()
+            self.relative_step = np.abs(self.increment / scale).max()
+
+    def postprocessing(self):
+        """计算结果表，提前终止的求解不计算。"""
+        if not self.stopped:
+            super().postprocessing()
+
+
+class _Finished(Exception):
+    """在 Network.solve_loop 中提前结束迭代。"""
+
+
+def bus_value(nw, label):
+    r"""
+    由当前的变量值计算总线的功率，迭代过程中也可以使用。
+
+    Parameters
+    ----------
+    nw : tespy.networks.network.Network
+        网络。
+
+    label : str
+        总线标签。
+
+    Returns
+    -------
+    value : float
+        总线上各组件的功率之和（与求解后总线的 P.val 相同）。
+    """
+    bus = nw.busses[label]
+    return sum(cp.calc_bus_value(bus) for cp in bus.comps.index)
+
+
+def objective_bounds(objective, lower=-np.inf, upper=np.inf, local=1e-2):
+    r"""
+    生成按目标函数范围提前终止迭代的回调函数。
+
+    Parameters
+    ----------
+    objective : function
+        由网络计算目标函数，例如
+        :code:`lambda nw: bus_value(nw, 'heat') / bus_value(nw, 'power')`。
+
+    lower, upper : float
+        感兴趣的目标函数范围。
+
+    local : float
+        牛顿步中各变量的相对变化小于该值时，认为迭代已进入牛顿法的二次收敛范围。
+
+    Returns
+    -------
+    callback : function
+        ScreeningNetwork.solve 的 callback 参数。
+
+    Note
+    ----
+    进入二次收敛范围后，目标函数剩余的变化小于最近一次迭代中的变化量，
+    因此目标函数超出范围的距离大于这个变化量时即可判定收敛值在范围之外。
+    目标函数无法计算（例如工质性质超出范围）时继续迭代。
+    """
+    previous = {}
+
+    def callback(nw):
+        if nw.iter == 0:
+            previous.clear()
+        try:
+            value = objective(nw)
+        except (ValueError, ZeroDivisionError):
+            previous.clear()
+            return False
+        last = previous.get('value', np.nan)
+        previous['value'] = value
+        if nw.relative_step > local:
+            return False
+        change = abs(value - last)
+        return bool(value < lower - change or value > upper + change)
+
+    return callback
@@ -0,0 +1,174 @@
+# 工质状态对象池和混合物组成缓存
+# TESPy 为每个连接上的每种工质各创建一个 CoolPropWrapper（包含一个 AbstractState），
+# gas_turbine.py 中空气、燃料和烟气的每个连接都有 N2、O2、Ar、CO2、H2O、CH4、H2 各一个状态对象，
+# 每次创建都要重新查询工质的常数和别名。混合物的性质按各组分的分压逐个计算，
+# 每次调用都要把质量分数换算为摩尔分数，"ideal-cond" 混合规则还会每次查询水的别名列表，
+# 这一步在燃气轮机算例中占了求解时间的 40%。
+#   - PooledCoolPropWrapper：每个 (后端, 工质) 只创建一个状态对象，所有连接和网络共用，
+#     同时共用 CachedCoolPropWrapper 的结果缓存；
+#   - "ideal-cond-cached" 混合规则：与 "ideal-cond" 的计算相同，按组成缓存摩尔分数、
+#     有效组分和水的别名，只有水实际冷凝时才回到 TESPy 的原始计算。
+# 使用方法：在设定工质的连接上设置
+# :code:`fluid_engines={f: PooledCoolPropWrapper for f in fluids}` 和 :code:`mixing_rule=MIXING_RULE`。
+
+import CoolProp as CP
+from tespy.tools.fluid_properties import mixtures
+from tespy.tools.fluid_properties.wrappers import wrapper_registry
+from tespy.tools.global_vars import ERR
+
+from property_cache import CachedCoolPropWrapper
+
+MIXING_RULE = "ideal-cond-cached"
+
+# 水的所有别名，用于判断混合物中是否含水
+_WATER_ALIASES = frozenset(CP.CoolProp.get_aliases("H2O"))
+
+# 组成缓存：(工质, 质量分数, 摩尔质量) 元组 -> (有效组分, 水)
+_compositions = {}
+_stats = {'composition_hits': 0, 'composition_misses': 0}
+_MAX_COMPOSITIONS = 10000
+
+
+@wrapper_registry
+class PooledCoolPropWrapper(CachedCoolPropWrapper):
+    r"""
+    按 (后端, 工质) 共用的 CachedCoolPropWrapper。
+
+    Parameters
+    ----------
+    fluid : str
+        工质名称。
+
+    back_end : str
+        CoolProp 后端，默认为 "HEOS"。
+
+    Note
+    ----
+    相同参数的构造调用返回同一个对象；序列化（例如 pickle）后在新进程中恢复为该进程池中的对象，
+    结果缓存不随对象保存。
+    """
+
+    _pool = {}
+
+    def __new__(cls, fluid, back_end=None):
+        key = (cls, fluid, back_end)
+        wrapper = cls._pool.get(key)
+        if wrapper is None:
+            wrapper = super().__new__(cls)
+            wrapper._pool_key = None
+            cls._pool[key] = wrapper
+        return wrapper
+
+    def __init__(self, fluid, back_end=None) -> None:
+        if self._pool_key is not None:
+            return
+        super().__init__(fluid, back_end)
+        self._pool_key = (fluid, back_end)
+
+    def __reduce__(self):
+        return (self.__class__, self._pool_key)
+
+
+def _composition(fluid_data):
+    """按组成返回有效组分 [(工质, 质量分数, 摩尔分数)] 和水 (工质, 摩尔分数)。"""
+    key = tuple(
+        (fluid, data["mass_fraction"], data["wrapper"]._molar_mass)
+        for fluid, data in fluid_data.items()
+    )
+    try:
+        composition = _compositions[key]
+    except KeyError:
+        _stats['composition_misses'] += 1
+        if len(_compositions) >= _MAX_COMPOSITIONS:
+            _compositions.clear()
+        molar = {fluid: y / M for fluid, y, M in key}
+        total = sum(molar.values())
+        active = [
+            (fluid, y, molar[fluid] / total) for fluid, y, _ in key if y > ERR
+        ]
+        water = [(fluid, x) for fluid, _, x in active if fluid in _WATER_ALIASES]
+        composition = (active, water[0] if water else None)
+        _compositions[key] = composition
+        return composition
+    _stats['composition_hits'] += 1
+    return composition
+
+
+def _condensing(p, T, fluid_data, water):
+    """混合物中的水是否部分冷凝，判断条件与 TESPy 的 cond_check 相同。"""
+    wrapper = fluid_data[water[0]]["wrapper"]
+    if not wrapper._is_below_T_critical(T):
+        return False
+    return wrapper.p_sat(T) < p * water[1]
+
+
+def h_mix_pT_ideal_cond_cached(p=None, T=None, fluid_data=None, **kwargs):
+    active, water = _composition(fluid_data)
+    if water is not None and _condensing(p, T, fluid_data, water):
+        return mixtures.h_mix_pT_ideal_cond(p, T, fluid_data, **kwargs)
+
+    h = 0
+    for fluid, y, x in active:
+        h += fluid_data[fluid]["wrapper"].h_pT(p * x, T) * y
+    return h
+
+
+def s_mix_pT_ideal_cond_cached(p=None, T=None, fluid_data=None, **kwargs):
+    active, water = _composition(fluid_data)
+    if water is not None and _condensing(p, T, fluid_data, water):
+        return mixtures.s_mix_pT_ideal_cond(p, T, fluid_data, **kwargs)
+
+    s = 0
+    for fluid, y, x in active:
+        s += fluid_data[fluid]["wrapper"].s_pT(p * x, T) * y
+    return s
+
+
+def v_mix_pT_ideal_cond_cached(p=None, T=None, fluid_data=None, **kwargs):
+    active, water = _composition(fluid_data)
+    if water is not None and _condensing(p, T, fluid_data, water):
+        return mixtures.v_mix_pT_ideal_cond(p, T, fluid_data, **kwargs)
+
+    d = 0
+    for fluid, _, x in active:
+        d += fluid_data[fluid]["wrapper"].d_pT(p * x, T)
+    return 1 / d
+
+
+def viscosity_mix_pT_ideal_cached(p=None, T=None, fluid_data=None, **kwargs):
+    active, _ = _composition(fluid_data)
+    a = 0
+    b = 0
+    for fluid, _, x in active:
+        wrapper = fluid_data[fluid]["wrapper"]
+        bi = x * wrapper._molar_mass ** 0.5
+        b += bi
+        a += bi * wrapper.viscosity_pT(p, T)
+    return a / b
+
+
+# 注册到 TESPy 的混合规则表，连接的 mixing_rule 参数即可选择
+mixtures.T_MIX_PH_REVERSE[MIXING_RULE] = h_mix_pT_ideal_cond_cached
+mixtures.T_MIX_PS_REVERSE[MIXING_RULE] = s_mix_pT_ideal_cond_cached
+mixtures.H_MIX_PT_DIRECT[MIXING_RULE] = h_mix_pT_ideal_cond_cached
+mixtures.S_MIX_PT_DIRECT[MIXING_RULE] = s_mix_pT_ideal_cond_cached
+mixtures.V_MIX_PT_DIRECT[MIXING_RULE] = v_mix_pT_ideal_cond_cached
+mixtures.VISCOSITY_MIX_PT_DIRECT[MIXING_RULE] = viscosity_mix_pT_ideal_cached
+mixtures.EXERGY_CHEMICAL[MIXING_RULE] = mixtures.exergy_chemical_ideal_cond
+
+
+def pool_stats():
+    r"""
+    状态对象池和组成缓存的统计。
+
+    Returns
+    -------
+    stats : dict
+        'states'（池中的状态对象数）、'compositions'（缓存的组成数）、
+        'composition_hits' 和 'composition_misses'（组成缓存的命中和未命中次数）。
+    """
+    return {
+        'states': len(PooledCoolPropWrapper._pool),
+        'compositions': len(_compositions),
+        **_stats,
+    }
@@ -0,0 +1,51 @@
+import numpy as np
+from tespy.components import Compressor
+from tespy.components import Sink
+from tespy.components import Source
+from tespy.connections import Connection
+from tespy.networks import Network
+
+import char_registry
+from fast_chars import FastCharMap
+
+
+def test_shared_map_outside_range(tmp_path, monkeypatch):
+    """特性图共享只读数组时，超出 x 范围的离设计工况可以求解且不改写特性图。"""
+    from tespy.components import component
+
+    # 测试结束后恢复 TESPy 原来的 load_default_char
+    monkeypatch.setattr(component, "ldc", component.ldc)
+    char_registry.install()
+
+    nw = Network(T_unit="C", p_unit="bar", iterinfo=False)
+    so = Source("inlet")
+    si = Sink("outlet")
+    cp = Compressor("compressor")
+    c1 = Connection(so, "out1", cp, "in1")
+    c2 = Connection(cp, "out1", si, "in1")
+    nw.add_conns(c1, c2)
+
+    cp.set_attr(
+        pr=5, eta_s=0.85, design=["pr", "eta_s"],
+        offdesign=["char_map_pr", "char_map_eta_s"]
+    )
+    c1.set_attr(fluid={"air": 1}, p=1, T=20, m=1)
+    nw.solve("design")
+    design_path = str(tmp_path / "design")
+    nw.save(design_path)
+
+    char_map = char_registry.load_default_char(
+        "compressor", "char_map_pr", "DEFAULT", FastCharMap
+    )
+    eta_map = char_registry.load_default_char(
+        "compressor", "char_map_eta_s", "DEFAULT", FastCharMap
+    )
+    y = char_map.y.copy()
+    cp.set_attr(char_map_pr=char_map, char_map_eta_s=eta_map, igva=10)
+    # X = 1.173，超出特性图的最大值 1.062
+    c1.set_attr(T=-60)
+    nw.solve("offdesign", design_path=design_path)
+
+    assert nw.converged
+    assert not char_map.y.flags.writeable
+    np.testing.assert_array_equal(char_map.y, y)
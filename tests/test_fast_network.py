@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from tespy.components import Compressor
+from tespy.components import SimpleHeatExchanger
+from tespy.components import Sink
+from tespy.components import Source
+from tespy.connections import Connection
+from tespy.networks import Network
+
+from fast_network import FastNetwork
+
+
+def _build(network_class):
+    nw = network_class(T_unit="C", p_unit="bar", iterinfo=False)
+    so = Source("inlet")
+    si = Sink("outlet")
+    cp = Compressor("compressor")
+    hx = SimpleHeatExchanger("cooler")
+    c1 = Connection(so, "out1", cp, "in1", label="1")
+    c2 = Connection(cp, "out1", hx, "in1", label="2")
+    c3 = Connection(hx, "out1", si, "in1", label="3")
+    nw.add_conns(c1, c2, c3)
+
+    cp.set_attr(pr=5, eta_s=0.85, design=["eta_s"], offdesign=["eta_s_char"])
+    hx.set_attr(pr=0.98, Tamb=20, design=["pr"], offdesign=["zeta"])
+    c1.set_attr(fluid={"air": 1}, p=1, T=20, m=1)
+    c3.set_attr(T=40)
+    return nw, cp, hx, c1, c3
+
+
+def _results(nw):
+    return nw.results["Connection"][["m", "p", "h", "T"]].to_numpy(dtype=float)
+
+
+def test_value_changes_match_network(tmp_path):
+    """只修改数值的设计和离设计扫描，FastNetwork 与 Network 的结果相同。"""
+    networks = [_build(Network), _build(FastNetwork)]
+    results = [[], []]
+    for k, (nw, cp, hx, c1, c3) in enumerate(networks):
+        nw.solve("design")
+        nw.save(str(tmp_path / f"design{k}"))
+        for T in [10, 25, 40]:
+            c1.set_attr(T=T)
+            hx.set_attr(Tamb=T)
+            nw.solve("design")
+            results[k] += [_results(nw)]
+
+        # 结构变化：出口温度改为热量
+        c3.set_attr(T=None)
+        hx.set_attr(Q=-1e5)
+        nw.solve("design")
+        results[k] += [_results(nw)]
+
+        c1.set_attr(T=20)
+        for m in [0.8, 1.1]:
+            c1.set_attr(m=m)
+            nw.solve("offdesign", design_path=str(tmp_path / f"design{k}"))
+            assert nw.converged
+            results[k] += [_results(nw), [cp.eta_s.val, hx.zeta.val]]
+
+    for expected, actual in zip(*results):
+        np.testing.assert_allclose(actual, expected, rtol=1e-9)
+
+    stats = networks[1][0].cache_stats
+    assert stats["fast_path_hits"] == 4
+    assert stats["fast_path_misses"] == 3
+
+
+def test_failed_solve_falls_back():
+    """求解失败后下一次求解完整初始化。"""
+    nw, cp, hx, c1, c3 = _build(FastNetwork)
+    nw.solve("design")
+    c3.set_attr(T=-300)
+    nw.solve("design")
+    assert not nw.converged
+    c3.set_attr(T=40)
+    nw.solve("design")
+    assert nw.converged
+    assert nw.cache_stats["fast_path_misses"] == 2
+    assert c3.T.val == pytest.approx(40)